@@ -0,0 +1,2 @@
+# __init__.py
+# AYTIN AFRICA Insurance Platform
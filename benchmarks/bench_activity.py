@@ -0,0 +1,47 @@
+# benchmarks/bench_activity.py
+import os
+import sys
+import tempfile
+import time
+import zlib
+from datetime import date, timedelta
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.activity_service import ActivityService
+
+def run_benchmark(member_count=1000000, days=90, active_share=0.6, seed=42):
+    rng = np.random.default_rng(seed)
+    service = ActivityService(snapshot_dir=tempfile.mkdtemp())
+    today = date.today()
+
+    active = rng.random(member_count) < active_share
+    sizes = []
+    for offset in range(days - 1, -1, -1):
+        # Roughly 3% of members flip status each day
+        flips = rng.random(member_count) < 0.03
+        active = active ^ flips
+        bitmap = service._to_bitmap(np.nonzero(active)[0])
+        service._bitmaps[today - timedelta(days=offset)] = bitmap
+        sizes.append(len(zlib.compress(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'))))
+
+    print(f"{member_count:,} members x {days} days, "
+          f"avg compressed bitmap {sum(sizes) / len(sizes) / 1024:.0f} KiB")
+
+    started = time.perf_counter()
+    counts = service.daily_active_counts(days=days, end=today)
+    print(f"daily_active_counts({days}): {(time.perf_counter() - started) * 1000:.1f} ms "
+          f"(today {counts[-1][1]:,} active)")
+
+    started = time.perf_counter()
+    retention = service.retention(today - timedelta(days=30), today)
+    print(f"retention(30d): {(time.perf_counter() - started) * 1000:.2f} ms "
+          f"({retention['retention_rate']:.1%})")
+
+    started = time.perf_counter()
+    moves = service.reactivations(today, lookback_days=days - 1)
+    print(f"reactivations({days - 1}d lookback): {(time.perf_counter() - started) * 1000:.1f} ms {moves}")
+
+if __name__ == "__main__":
+    run_benchmark()
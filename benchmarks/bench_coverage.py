@@ -0,0 +1,65 @@
+# benchmarks/bench_coverage.py
+import os
+import sys
+import random
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.coverage_service import CoverageIndex
+
+def generate_transactions(member_count, payments_per_member, seed=42):
+    """Generate synthetic M-Pesa style payment transactions"""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=365)
+    transactions = []
+
+    for m in range(member_count):
+        member_id = f"M{m:08d}"
+        day = start + timedelta(days=rng.randint(0, 30))
+        for _ in range(payments_per_member):
+            days_paid = rng.choice([1, 1, 1, 7, 30])
+            transactions.append({
+                "member_id": member_id,
+                "transaction_date": day,
+                "days_paid": days_paid,
+                "amount": days_paid * 200
+            })
+            day += timedelta(days=rng.randint(0, days_paid + 5))
+
+    return transactions
+
+def run_benchmark(member_count=20000, payments_per_member=30, queries=200000):
+    transactions = generate_transactions(member_count, payments_per_member)
+    print(f"Transactions: {len(transactions):,}")
+
+    started = time.perf_counter()
+    index = CoverageIndex.build(transactions)
+    build_time = time.perf_counter() - started
+    print(f"Build: {build_time:.2f}s for {len(index):,} members, {index.interval_count:,} intervals")
+
+    rng = random.Random(7)
+    base = date.today() - timedelta(days=365)
+    member_ids = [f"M{rng.randrange(member_count):08d}" for _ in range(queries)]
+    query_dates = [base + timedelta(days=rng.randrange(365)) for _ in range(queries)]
+
+    started = time.perf_counter()
+    for member_id, on_date in zip(member_ids, query_dates):
+        index.is_covered(member_id, on_date)
+    single_time = time.perf_counter() - started
+    print(f"Single is_covered: {single_time / queries * 1e6:.2f} us/query")
+
+    started = time.perf_counter()
+    covered = index.bulk_is_covered(member_ids, query_dates)
+    bulk_time = time.perf_counter() - started
+    print(f"Bulk is_covered: {bulk_time / queries * 1e6:.3f} us/query "
+          f"({covered.sum():,} of {queries:,} covered)")
+
+    started = time.perf_counter()
+    covered_today = index.members_covered_on(date.today() - timedelta(days=30))
+    scan_time = time.perf_counter() - started
+    print(f"members_covered_on: {scan_time * 1000:.2f} ms ({len(covered_today):,} members)")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,66 @@
+# benchmarks/bench_eligibility.py
+import os
+import sys
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.blind_index_service import BlindIndexService
+from services.eligibility_service import EligibilityService
+
+class _SyntheticDatabase:
+    """In-memory stand-in for SimpleDatabase with generated members"""
+
+    def __init__(self, member_count, seed=42):
+        rng = random.Random(seed)
+        today = date.today()
+        self.members = []
+        self.payments = []
+        for m in range(member_count):
+            member_id = f"M{m:08d}"
+            self.members.append({
+                "public_id": member_id,
+                "phone_number": f"07{m:08d}",
+                "cover_type": rng.choice(["basic", "standard", "premium"]),
+                "status": "Active"
+            })
+            day = today - timedelta(days=rng.randint(0, 60))
+            while day <= today:
+                days_paid = rng.choice([1, 7, 30])
+                self.payments.append({"member_id": member_id, "transaction_date": day, "days_paid": days_paid})
+                day += timedelta(days=days_paid + rng.randint(0, 4))
+
+    def get_all_members(self):
+        return self.members
+
+    def get_all_payments(self):
+        return self.payments
+
+def run_benchmark(member_count=100000, batch_size=1000, batches=100):
+    db = _SyntheticDatabase(member_count)
+    snapshot_dir = tempfile.mkdtemp()
+    blind_index = BlindIndexService(os.path.join(snapshot_dir, "blind_index"), key=b"benchmark-key")
+    service = EligibilityService(snapshot_dir=snapshot_dir, blind_index=blind_index)
+
+    started = time.perf_counter()
+    service.run_daily_status_job(db)
+    print(f"Daily snapshot: {time.perf_counter() - started:.2f}s for {member_count:,} members")
+
+    rng = random.Random(7)
+    queries = [
+        f"M{rng.randrange(member_count):08d}" if i % 2 else f"+2547{rng.randrange(member_count):08d}"
+        for i in range(batch_size)
+    ]
+
+    started = time.perf_counter()
+    for _ in range(batches):
+        service.verify_batch(queries)
+    elapsed = time.perf_counter() - started
+    checks = batch_size * batches
+    print(f"verify_batch: {checks / elapsed:,.0f} checks/s ({elapsed / checks * 1e6:.2f} us/check)")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,40 @@
+# benchmarks/bench_encryption.py
+import os
+import sys
+import time
+from cryptography.fernet import Fernet
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.encryption_service import EncryptionService, Keyring, set_keyring
+
+def _rate(label, func, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {iterations / elapsed:>12,.0f} ops/s  {elapsed / iterations * 1e6:>8.2f} us/op")
+
+def run_benchmark(iterations=50000):
+    value = "12345678"
+    keyring = Keyring.from_spec(f"v2={Fernet.generate_key().decode()},v1={Fernet.generate_key().decode()}")
+    set_keyring(keyring)
+    service = EncryptionService(keyring)
+    token = service.encrypt(value)
+
+    # Previous behaviour: a fresh key and cipher for every call
+    def fresh_service_encrypt():
+        cipher = Fernet(Fernet.generate_key())
+        cipher.encrypt(value.encode())
+
+    _rate("encrypt, new service per call (old)", fresh_service_encrypt, iterations)
+    _rate("EncryptionService() construction", EncryptionService, iterations)
+    _rate("encrypt, shared keyring", lambda: service.encrypt(value), iterations)
+    _rate("decrypt, shared keyring (versioned)", lambda: service.decrypt(token), iterations)
+
+    legacy_token = Fernet(keyring.keys["v1"]).encrypt(value.encode()).decode()
+    _rate("decrypt, unversioned legacy token", lambda: service.decrypt(legacy_token), iterations)
+    _rate("rotate v1 -> v2", lambda: service.rotate(legacy_token), iterations)
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,72 @@
+# benchmarks/bench_envelope.py
+import os
+import sys
+import tempfile
+import time
+from cryptography.fernet import Fernet
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Synthetic records only, so a per-run key is enough
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+
+from config.database import SimpleDatabase
+from services.envelope_service import EnvelopeService
+import services.envelope_service as envelope_module
+
+def _sample_record(i):
+    return {
+        "public_id": f"M{i:08d}",
+        "name_encrypted": "v1:" + "x" * 120,
+        "id_number_encrypted": "v1:" + "y" * 120,
+        "dob_encrypted": "v1:" + "z" * 120,
+        "phone_number": f"+2547{i % 100000000:08d}",
+        "cover_type": "Family",
+        "status": "Active",
+        "agent_id": f"AG{i % 50:03d}",
+        "family_members": [{"relationship": "Spouse", "name_encrypted": "v1:" + "w" * 120}],
+        "saved_at": "2026-01-17T17:05:46"
+    }
+
+def _scan(paths):
+    started = time.perf_counter()
+    for path in paths:
+        SimpleDatabase.read_record(path)
+    return time.perf_counter() - started
+
+def run_benchmark(record_count=100000):
+    workdir = tempfile.mkdtemp()
+    envelope_module.envelope_service = EnvelopeService(key_file=os.path.join(workdir, "keys.json"))
+
+    plain_dir = os.path.join(workdir, "plain")
+    sealed_dir = os.path.join(workdir, "sealed")
+    os.makedirs(plain_dir)
+    os.makedirs(sealed_dir)
+
+    plain_paths, sealed_paths = [], []
+    for i in range(record_count):
+        record = _sample_record(i)
+        plain_path = os.path.join(plain_dir, f"member_{record['public_id']}.json")
+        sealed_path = os.path.join(sealed_dir, f"member_{record['public_id']}.enc")
+        SimpleDatabase.write_record(plain_path, record)
+        SimpleDatabase.write_record(sealed_path, record)
+        plain_paths.append(plain_path)
+        sealed_paths.append(sealed_path)
+
+    plain_bytes = sum(os.path.getsize(p) for p in plain_paths)
+    sealed_bytes = sum(os.path.getsize(p) for p in sealed_paths)
+    print(f"{record_count:,} member records, plaintext {plain_bytes / 2**20:.1f} MiB, "
+          f"encrypted {sealed_bytes / 2**20:.1f} MiB")
+
+    # Warm the page cache and the unwrapped segment keys before timing
+    _scan(plain_paths)
+    _scan(sealed_paths)
+
+    plain = _scan(plain_paths)
+    sealed = _scan(sealed_paths)
+    print(f"{'plaintext JSON scan':<32} {plain:>7.2f}s  {record_count / plain:>10,.0f} records/s")
+    print(f"{'envelope-encrypted scan':<32} {sealed:>7.2f}s  {record_count / sealed:>10,.0f} records/s")
+    print(f"{'encryption overhead':<32} {(sealed / plain - 1) * 100:>7.1f}%")
+
+if __name__ == "__main__":
+    run_benchmark()
\ No newline at end of file
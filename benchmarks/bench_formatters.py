@@ -0,0 +1,54 @@
+# benchmarks/bench_formatters.py
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from cryptography.fernet import Fernet
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.encryption_service import EncryptionService, Keyring
+from utils import formatters
+
+def run_benchmark(rows=100000, seed=42):
+    rng = np.random.default_rng(seed)
+    base = datetime.now()
+    df = pd.DataFrame({
+        "id_number": rng.integers(10000000, 9999999999, rows).astype(str),
+        "phone_number": [f"+2547{n:08d}" for n in rng.integers(0, 10**8, rows)],
+        "amount_due": rng.integers(-7, 4, rows).clip(max=0) * -200,
+        "registration_date": [base - timedelta(days=int(d), minutes=int(m))
+                              for d, m in zip(rng.integers(0, 365, rows), rng.integers(0, 1440, rows))]
+    })
+    enc_service = EncryptionService(Keyring.from_spec(Fernet.generate_key().decode()))
+
+    started = time.perf_counter()
+    looped = [
+        (enc_service.mask_id_number(r.id_number),
+         r.phone_number[:5] + "*" * (len(r.phone_number) - 8) + r.phone_number[-3:],
+         f"KES {r.amount_due:,.2f}" if r.amount_due > 0 else "Paid",
+         r.registration_date.strftime("%Y-%m-%d"))
+        for r in df.itertuples()
+    ]
+    loop_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ids = formatters.mask_id_numbers(df["id_number"])
+    phones = formatters.mask_phone_numbers(df["phone_number"])
+    amounts = formatters.format_kes(df["amount_due"], zero_label="Paid")
+    dates = formatters.format_dates(df["registration_date"])
+    vector_time = time.perf_counter() - started
+
+    assert ids.tolist() == [row[0] for row in looped]
+    assert phones.tolist() == [row[1] for row in looped]
+    assert amounts.tolist() == [row[2] for row in looped]
+    assert dates.tolist() == [row[3] for row in looped]
+
+    print(f"{rows:,} rows")
+    print(f"Row loop (ID, phone, amount, date):   {loop_time * 1000:8.1f} ms")
+    print(f"Vectorized (ID, phone, amount, date): {vector_time * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,86 @@
+# benchmarks/bench_id_parser.py
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ocr_text_corpus import text_corpus
+from utils.id_parser import id_text_parser
+
+FIELDS = ("id_number", "name", "dob", "gender")
+
+def legacy_parse(text):
+    """OCRService._parse_id_text before utils/id_parser.py"""
+    details = {"name": "", "id_number": "", "dob": None, "gender": "", "extraction_confidence": 0.5}
+    if not text:
+        return details
+    id_matches = re.findall(r'\b\d{8,10}\b', text)
+    if id_matches:
+        details["id_number"] = id_matches[0]
+        details["extraction_confidence"] = 0.7
+    name_match = re.search(r'Name[:\s]+([A-Z][A-Z\s]+[A-Z])', text, re.IGNORECASE)
+    if name_match:
+        details["name"] = name_match.group(1).strip()
+    else:
+        for pattern in (r'Name\s*[:]?\s*([A-Z][a-z]+\s+[A-Z][a-z]+)', r'([A-Z][A-Z\s]{3,}[A-Z])'):
+            match = re.search(pattern, text)
+            if match:
+                details["name"] = match.group(1).strip()
+                break
+    dob_match = re.search(r'(?:DOB|Date of Birth)[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{4})', text, re.IGNORECASE)
+    if dob_match:
+        for fmt in ("%d/%m/%Y", "%d-%m-%Y"):
+            try:
+                details["dob"] = datetime.strptime(dob_match.group(1), fmt)
+                break
+            except ValueError:
+                pass
+    gender_match = re.search(r'(Male|Female|M|F)', text, re.IGNORECASE)
+    if gender_match:
+        gender = gender_match.group(1).upper()
+        details["gender"] = "Male" if gender in ("MALE", "M") else "Female"
+    return details
+
+def _correct(expected, parsed, field):
+    if field == "dob":
+        return parsed["dob"] is not None and parsed["dob"].date() == expected["dob"]
+    return parsed[field] == expected[field]
+
+def _accuracy(parse, items):
+    """Per-layout, per-field share of documents parsed correctly"""
+    scores = {}
+    for expected, text, layout in items:
+        parsed = parse(text)
+        row = scores.setdefault(layout, {field: 0 for field in FIELDS})
+        for field in FIELDS:
+            row[field] += _correct(expected, parsed, field)
+    counts = {layout: sum(1 for _, _, l in items if l == layout) for layout in scores}
+    return {layout: {f: n / counts[layout] for f, n in row.items()} for layout, row in scores.items()}
+
+def _time(parse, texts, repeat=9):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            parse(text)
+        best = min(best, time.perf_counter() - started)
+    return best / len(texts)
+
+def run_benchmark(count=3000):
+    items = text_corpus(count)
+    texts = [text for _, text, _ in items]
+    print(f"{count:,} synthetic OCR texts (zone reads, national IDs, driving licences)")
+
+    per_doc = {}
+    for label, parse in (("Legacy regex parser", legacy_parse), ("IDTextParser", id_text_parser.parse)):
+        per_doc[label] = _time(parse, texts)
+        print(f"\n{label}: {per_doc[label] * 1e6:.1f} µs/document, {1 / per_doc[label]:,.0f} documents/s")
+        for layout, row in _accuracy(parse, items).items():
+            print(f"  {layout:<12} " + "  ".join(f"{f} {row[f]:6.1%}" for f in FIELDS))
+    print(f"\nIDTextParser speedup: {per_doc['Legacy regex parser'] / per_doc['IDTextParser']:.2f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,81 @@
+# benchmarks/bench_id_preprocessing.py
+import os
+import sys
+import time
+import cv2
+import numpy as np
+import pytesseract
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.id_corpus import photo_corpus
+from services.id_preprocessing import id_preprocessor
+from services.ocr_service import OCRService
+
+def _old_preprocess(photo):
+    """What extract_id_details did before: full-frame BGR, gray, Otsu"""
+    bgr = cv2.cvtColor(photo, cv2.COLOR_RGB2BGR)
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    return [cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]]
+
+def _new_preprocess(photo):
+    card, found = id_preprocessor.normalize(photo)
+    if found:
+        return list(id_preprocessor.crop_zones(card).values())
+    return [id_preprocessor.binarize(card)]
+
+def _time(label, func, photos):
+    started = time.perf_counter()
+    outputs = [func(photo) for photo in photos]
+    elapsed = time.perf_counter() - started
+    pixels = np.mean([sum(o.size for o in output) for output in outputs])
+    print(f"{label:<36} {elapsed / len(photos) * 1000:>8.1f} ms/photo  {pixels / 1e6:>6.2f} MP to OCR")
+
+def _corner_error(photo, corners):
+    found = id_preprocessor.find_card(id_preprocessor.to_gray(photo))
+    if found is None:
+        return None
+    return float(np.abs(found - corners).max() / photo.shape[1] * 100)
+
+def _accuracy(photos, fields_list):
+    service = OCRService()
+    scores = {"name": 0, "id_number": 0, "dob": 0}
+    tiers = {}
+    started = time.perf_counter()
+    for photo, fields in zip(photos, fields_list):
+        details = service.extract_from_image(Image.fromarray(photo))
+        scores["name"] += details["name"] == fields["name"]
+        scores["id_number"] += details["id_number"] == fields["id_number"]
+        dob = details["dob"]
+        scores["dob"] += bool(dob) and dob.date() == fields["dob"]
+        tier = details.get("ocr_tier", "rejected")
+        tiers[tier] = tiers.get(tier, 0) + 1
+    elapsed = time.perf_counter() - started
+    print(f"end-to-end OCR {elapsed / len(photos) * 1000:.0f} ms/photo, accuracy: " +
+          ", ".join(f"{k} {v / len(photos):.0%}" for k, v in scores.items()))
+    print("highest OCR tier used: " + ", ".join(f"{k}: {v}" for k, v in sorted(tiers.items(), key=str)))
+
+def run_benchmark(count=20):
+    items = photo_corpus(count)
+    fields_list = [fields for fields, _, _ in items]
+    photos = [photo for _, photo, _ in items]
+    print(f"{count} synthetic {photos[0].shape[1]}x{photos[0].shape[0]} ID photos")
+
+    _time("full-frame Otsu (old)", _old_preprocess, photos)
+    _time("detect, deskew, crop zones", _new_preprocess, photos)
+
+    errors = [_corner_error(photo, corners) for _, photo, corners in items]
+    detected = [e for e in errors if e is not None]
+    print(f"card detected in {len(detected)}/{count} photos, "
+          f"worst corner error {max(detected, default=0):.2f}% of frame width")
+
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        print("tesseract is not installed; skipping extraction accuracy")
+        return
+    _accuracy(photos, fields_list)
+
+if __name__ == "__main__":
+    run_benchmark()
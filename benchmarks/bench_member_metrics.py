@@ -0,0 +1,75 @@
+# benchmarks/bench_member_metrics.py
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from cryptography.fernet import Fernet
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Synthetic records only, so a per-run key is enough
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+
+from services.member_data_service import member_metrics, prepare_members_frame
+
+def legacy_metrics(members):
+    """Admin Dashboard calculate_metrics before vectorization (four passes)"""
+    total_members = len(members)
+    total_premium = sum(m.get('total_paid', 0) for m in members)
+    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    today_registrations = sum(1 for m in members
+                              if m.get('registration_date', datetime.now()) >= today_start)
+    pending_count = sum(1 for m in members if m.get('balance_days', 0) < 0)
+    active_members = sum(1 for m in members if m.get('status') == "Active")
+    return {
+        "total_members": total_members,
+        "total_premium": total_premium,
+        "today_registrations": today_registrations,
+        "pending_count": pending_count,
+        "active_members": active_members
+    }
+
+def member_records(count, seed=42):
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    statuses = np.array(["Active", "Inactive", "Suspended"])[rng.integers(0, 3, count)]
+    minutes = rng.integers(0, 60 * 24 * 365, count)
+    balances = rng.integers(-7, 8, count)
+    paid = rng.integers(0, 20000, count)
+    return [
+        {"public_id": f"M{i:08d}", "status": str(statuses[i]), "cover_type": "basic",
+         "registration_date": now - timedelta(minutes=int(minutes[i])),
+         "balance_days": int(balances[i]), "total_paid": int(paid[i])}
+        for i in range(count)
+    ]
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def _compare(count):
+    """Time both versions on one book size; records are freed on return"""
+    members = member_records(count)
+    started = time.perf_counter()
+    frame = prepare_members_frame(members)
+    prepare_time = time.perf_counter() - started
+
+    legacy_time, expected = _best(lambda: legacy_metrics(members), 3)
+    vector_time, result = _best(lambda: member_metrics(frame), 5)
+    assert result == expected, (result, expected)
+
+    print(f"{count:>9,} members  legacy {legacy_time * 1000:8.1f} ms  "
+          f"vectorized {vector_time * 1000:6.2f} ms  ({legacy_time / vector_time:,.0f}x)  "
+          f"frame build, once per cache refresh {prepare_time * 1000:,.0f} ms")
+
+def run_benchmark(counts=(100000, 1000000)):
+    for count in counts:
+        _compare(count)
+
+if __name__ == "__main__":
+    run_benchmark()
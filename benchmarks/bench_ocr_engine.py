@@ -0,0 +1,41 @@
+# benchmarks/bench_ocr_engine.py
+import os
+import random
+import sys
+import time
+import numpy as np
+import pytesseract
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.id_corpus import random_fields, render_crop
+from services.ocr_service import TESSEROCR_AVAILABLE, TesseractEngine
+
+def _time(label, func, images):
+    func(images[0])  # Warm up (and load the model for the persistent engine)
+    started = time.perf_counter()
+    for image in images:
+        func(image)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<44} {elapsed / len(images) * 1000:>8.1f} ms/image")
+
+def run_benchmark(count=30, seed=3):
+    try:
+        version = pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        print("tesseract is not installed; nothing to benchmark")
+        return
+    print(f"tesseract {version}, tesserocr {'available' if TESSEROCR_AVAILABLE else 'not installed'}")
+
+    rng = random.Random(seed)
+    images = [np.array(render_crop(random_fields(rng)).convert("L")) for _ in range(count)]
+
+    # Previous behaviour: default settings, one tesseract process per image
+    _time("pytesseract, default config (old)", pytesseract.image_to_string, images)
+
+    engine = TesseractEngine()
+    label = "persistent engine (tesserocr)" if engine.persistent else "pytesseract, whitelist + PSM"
+    _time(label, engine.image_to_string, images)
+
+if __name__ == "__main__":
+    run_benchmark()
\ No newline at end of file
@@ -0,0 +1,139 @@
+# benchmarks/bench_pdf_render.py
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from fpdf import FPDF
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.id_corpus import random_fields
+from services.pdf_service import PDFService
+
+def legacy_render(member_data, family_members=None):
+    """PDFService.render_proposal_form before ProposalLayout"""
+    pdf = FPDF()
+    pdf.add_page()
+    
+    # Header
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, 'AYTIN AFRICA INSURANCE AGENCY', 0, 1, 'C')
+    pdf.set_font('Arial', '', 12)
+    pdf.cell(0, 10, 'Insurance Proposal Form - Medical Cover', 0, 1, 'C')
+    pdf.ln(5)
+    
+    # Member Information
+    pdf.set_font('Arial', 'B', 14)
+    pdf.cell(0, 10, '1. Member Information', 0, 1)
+    pdf.set_font('Arial', '', 12)
+    
+    pdf.cell(50, 10, 'Full Name:', 0, 0)
+    pdf.cell(0, 10, member_data.get('name', 'N/A'), 0, 1)
+    
+    pdf.cell(50, 10, 'Member ID:', 0, 0)
+    pdf.cell(0, 10, member_data.get('public_id', 'N/A'), 0, 1)
+    
+    pdf.cell(50, 10, 'Phone Number:', 0, 0)
+    pdf.cell(0, 10, member_data.get('phone_number', 'N/A'), 0, 1)
+    
+    pdf.cell(50, 10, 'Cover Type:', 0, 0)
+    pdf.cell(0, 10, member_data.get('cover_type', 'N/A'), 0, 1)
+    
+    pdf.cell(50, 10, 'Registration Date:', 0, 0)
+    reg_date = member_data.get('registration_date', datetime.now())
+    if hasattr(reg_date, 'strftime'):
+        pdf.cell(0, 10, reg_date.strftime('%d/%m/%Y'), 0, 1)
+    else:
+        pdf.cell(0, 10, str(reg_date), 0, 1)
+    
+    pdf.ln(5)
+    
+    # Family Information
+    if family_members and len(family_members) > 0:
+        pdf.set_font('Arial', 'B', 14)
+        pdf.cell(0, 10, '2. Family Members Covered', 0, 1)
+        pdf.set_font('Arial', '', 12)
+        
+        for i, member in enumerate(family_members, 1):
+            pdf.cell(0, 10, f'{i}. {member.get("relationship", "").title()}: {member.get("name", "N/A")}', 0, 1)
+            pdf.cell(20, 10, '', 0, 0)
+            
+            dob = member.get('dob')
+            if hasattr(dob, 'strftime'):
+                dob_str = dob.strftime('%d/%m/%Y')
+            else:
+                dob_str = str(dob)
+            
+            pdf.cell(50, 10, f'DOB: {dob_str}', 0, 0)
+            pdf.cell(50, 10, f'Gender: {member.get("gender", "N/A")}', 0, 1)
+            pdf.ln(2)
+    
+    # Terms and Conditions
+    pdf.ln(10)
+    pdf.set_font('Arial', 'B', 14)
+    pdf.cell(0, 10, '3. Terms & Conditions', 0, 1)
+    pdf.set_font('Arial', '', 10)
+    
+    terms = [
+        "1. This is a daily premium medical cover policy.",
+        "2. Coverage is active only when premium payments are up to date.",
+        "3. Premium rates vary by cover type (KES 150-500 per day).",
+        "4. Grace period: 7 days of non-payment allowed before suspension.",
+        "5. Hospital access requires active policy status.",
+        "6. Claims must be submitted within 30 days of treatment.",
+        "7. Policy can be cancelled with 30 days written notice."
+    ]
+    
+    for term in terms:
+        pdf.multi_cell(0, 8, term, new_x="LMARGIN", new_y="NEXT")
+    
+    # Footer
+    pdf.ln(20)
+    pdf.set_font('Arial', 'I', 10)
+    pdf.cell(0, 10, f'Generated on: {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}', 0, 1, 'C')
+    pdf.cell(0, 10, 'AYTIN AFRICA Insurance - https://aytinafrica.co.ke', 0, 1, 'C')
+    
+    return bytes(pdf.output())
+
+def member_corpus(count, seed=3):
+    """Deterministic (member, family) pairs with 0-4 family members"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        fields = random_fields(rng)
+        member = {
+            "public_id": f"M{i:08d}",
+            "name": fields["name"],
+            "phone_number": f"+2547{rng.randrange(10**8):08d}",
+            "cover_type": rng.choice(["basic", "standard", "premium", "family", "corporate"]),
+            "registration_date": datetime(2026, 1, 1) + timedelta(minutes=rng.randrange(400000))
+        }
+        family = []
+        for relationship in ("spouse", "child", "child", "child")[:rng.randrange(5)]:
+            relative = random_fields(rng)
+            family.append({"name": relative["name"], "relationship": relationship,
+                           "dob": datetime.combine(relative["dob"], datetime.min.time()),
+                           "gender": relative["gender"]})
+        items.append((member, family))
+    return items
+
+def _time(render, items):
+    started = time.perf_counter()
+    size = sum(len(render(member, family)) for member, family in items)
+    return time.perf_counter() - started, size
+
+def run_benchmark(counts=(100, 1000, 5000)):
+    pdf_service = PDFService()
+    pdf_service.render_proposal_form(*member_corpus(1)[0])  # compile the layout
+    for count in counts:
+        items = member_corpus(count)
+        legacy_time, legacy_size = _time(legacy_render, items)
+        layout_time, layout_size = _time(pdf_service.render_proposal_form, items)
+        print(f"{count:>6,} proposals  "
+              f"legacy {legacy_time / count * 1000:5.2f} ms/doc ({count / legacy_time:5.0f} docs/s)  "
+              f"compiled layout {layout_time / count * 1000:5.2f} ms/doc ({count / layout_time:5.0f} docs/s)  "
+              f"{legacy_time / layout_time:.1f}x, {layout_size / count / 1024:.1f} KiB/doc")
+
+if __name__ == "__main__":
+    run_benchmark()
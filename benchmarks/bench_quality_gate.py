@@ -0,0 +1,48 @@
+# benchmarks/bench_quality_gate.py
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.id_corpus import photo_corpus
+from services.id_preprocessing import id_preprocessor
+
+def _variants(photo):
+    """Good photo plus the failure modes the gate should catch"""
+    gray = id_preprocessor.to_gray(photo)
+    return {
+        "good": gray,
+        "blurry": cv2.GaussianBlur(gray, (0, 0), 8),
+        "dark": (gray * 0.2).astype(np.uint8),
+        "glare": np.clip(gray.astype(np.int16) + 120, 0, 255).astype(np.uint8),
+        "no card": cv2.GaussianBlur(gray[:600, :1600], (0, 0), 2)
+    }
+
+def run_benchmark(count=10):
+    photos = [photo for _, photo, _ in photo_corpus(count)]
+    print(f"{count} synthetic {photos[0].shape[1]}x{photos[0].shape[0]} ID photos per variant")
+
+    results = {}
+    timings = []
+    for photo in photos:
+        for label, gray in _variants(photo).items():
+            started = time.perf_counter()
+            report, _ = id_preprocessor.assess_quality(gray)
+            timings.append(time.perf_counter() - started)
+            results.setdefault(label, []).append(report)
+
+    print(f"assess_quality: {np.mean(timings) * 1000:.1f} ms mean, {np.max(timings) * 1000:.1f} ms max")
+    for label, reports in results.items():
+        accepted = sum(r["ok"] for r in reports)
+        issues = sorted({r["issues"][0] for r in reports if r["issues"]})
+        print(f"{label:<10} accepted {accepted:>2}/{len(reports)}  "
+              f"blur {np.median([r['blur'] for r in reports]):>6.0f}  "
+              f"brightness {np.median([r['brightness'] for r in reports]):>4.0f}  "
+              f"glare {np.median([r['glare'] for r in reports]):.2f}  "
+              f"first issue: {', '.join(issues) or '-'}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,60 @@
+# benchmarks/bench_registration_rollups.py
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.registration_rollup_service import RegistrationRollupService
+
+COVER_TYPES = ["basic", "standard", "premium"]
+
+def legacy_trend(members, days, end):
+    """Admin Dashboard trend chart before rollups (one member scan per day)"""
+    dates = [end - timedelta(days=i) for i in range(days - 1, -1, -1)]
+    return [(d, sum(1 for m in members if m['registration_date'].date() == d)) for d in dates]
+
+def member_records(count, seed=42):
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    minutes = rng.integers(0, 60 * 24 * 730, count)
+    agents = rng.integers(1, 4, count)
+    covers = rng.integers(0, len(COVER_TYPES), count)
+    return [
+        {"registration_date": now - timedelta(minutes=int(minutes[i])),
+         "agent_id": int(agents[i]), "cover_type": COVER_TYPES[covers[i]]}
+        for i in range(count)
+    ]
+
+def run_benchmark(counts=(10000, 100000), windows=(30, 90, 365)):
+    end = date.today()
+    for count in counts:
+        members = member_records(count)
+        with tempfile.TemporaryDirectory() as tmp:
+            rollups = RegistrationRollupService(tmp)
+            started = time.perf_counter()
+            rollups.rebuild(members)
+            rebuild_time = time.perf_counter() - started
+
+            for days in windows:
+                # The per-day scan is quadratic; time the 30-day window and scale
+                scan_days = min(days, 30)
+                started = time.perf_counter()
+                expected = legacy_trend(members, scan_days, end)
+                legacy_time = (time.perf_counter() - started) * days / scan_days
+
+                started = time.perf_counter()
+                result = rollups.daily_counts(days, end=end)
+                rollup_time = time.perf_counter() - started
+                assert result[-scan_days:] == expected
+
+                print(f"{count:>8,} members  {days:>3} days  scan {legacy_time * 1000:9.1f} ms  "
+                      f"rollup {rollup_time * 1000:6.2f} ms  ({legacy_time / rollup_time:,.0f}x)  "
+                      f"rows {len(rollups._load()):,}")
+            print(f"{count:>8,} members  rebuild, once when the table is missing {rebuild_time * 1000:,.0f} ms")
+
+if __name__ == "__main__":
+    run_benchmark()
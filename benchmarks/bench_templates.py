@@ -0,0 +1,49 @@
+# benchmarks/bench_templates.py
+import os
+import sys
+import time
+from datetime import datetime
+from jinja2 import Environment, select_autoescape
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pdf_render import member_corpus
+from config.settings import APP_CONFIG
+from utils.templates import TEMPLATE_DIR, format_date, format_kes, member_context, template_renderer
+
+def _compile_each_time(name, contexts, shared):
+    """Read and compile the template for every document"""
+    for context in contexts:
+        with open(os.path.join(TEMPLATE_DIR, name), 'r', encoding='utf-8') as f:
+            env = Environment(autoescape=select_autoescape(['html']), trim_blocks=True, lstrip_blocks=True)
+            env.filters.update(date=format_date, kes=format_kes)
+            yield env.from_string(f.read()).render({**shared, **context})
+
+def _cached_per_document(name, contexts, shared):
+    """Cached template, looked up (and mtime-checked) for every document"""
+    for context in contexts:
+        yield template_renderer.render(name, {**shared, **context})
+
+def run_benchmark(count=10000, naive_count=500):
+    members = [dict(m, family_members=f) for m, f in member_corpus(count)]
+    contexts = [member_context(m, APP_CONFIG.COVER_OPTIONS) for m in members]
+    shared = {"sent_on": datetime.now(), "generated_on": datetime.now(),
+              "terms": ["Term one.", "Term two."]}
+    print(f"{count:,} members (compile-every-time timed on the first {naive_count:,})")
+
+    for name in ("email_template.html", "proposal_template.html"):
+        runs = [
+            ("compile every time", _compile_each_time, contexts[:naive_count]),
+            ("cached, per document", _cached_per_document, contexts),
+            ("cached, render_many", template_renderer.render_many, contexts)
+        ]
+        print(f"\n{name}")
+        for label, render, items in runs:
+            started = time.perf_counter()
+            size = sum(len(html) for html in render(name, items, shared))
+            elapsed = time.perf_counter() - started
+            print(f"  {label:<22} {elapsed / len(items) * 1e6:8.1f} µs/doc  "
+                  f"{len(items) / elapsed:8,.0f} docs/s  {size / len(items) / 1024:.1f} KiB/doc")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,103 @@
+# benchmarks/id_corpus.py
+import math
+import random
+from datetime import date, timedelta
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+FIRST_NAMES = ["JOHN", "MARY", "PETER", "GRACE", "JAMES", "FAITH", "DAVID", "MERCY", "BRIAN", "JOY"]
+LAST_NAMES = ["KAMAU", "OTIENO", "WANJIKU", "MUTUA", "ACHIENG", "KIPROP", "NJERI", "OMONDI"]
+
+def _font(size):
+    for name in ("DejaVuSans-Bold.ttf", "DejaVuSans.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+def random_fields(rng: random.Random) -> dict:
+    dob = date(1960, 1, 1) + timedelta(days=rng.randrange(365 * 45))
+    return {
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "id_number": str(rng.randrange(10000000, 40000000)),
+        "dob": dob,
+        "gender": rng.choice(["Male", "Female"])
+    }
+
+def render_card(fields: dict, width=1011) -> Image.Image:
+    """A flat, front-on ID card image at roughly 300 DPI (ID-1 size)"""
+    height = int(width * 54 / 85.6)
+    card = Image.new("RGB", (width, height), (236, 240, 228))
+    draw = ImageDraw.Draw(card)
+    scale = width / 1011
+
+    draw.rectangle([int(15 * scale), int(15 * scale), width - int(15 * scale), int(95 * scale)], fill=(20, 90, 50))
+    draw.text((int(30 * scale), int(25 * scale)), "REPUBLIC OF KENYA", fill="white", font=_font(int(40 * scale)))
+    draw.rectangle([int(30 * scale), int(120 * scale), int(280 * scale), int(450 * scale)], fill=(180, 180, 180))
+
+    font = _font(int(34 * scale))
+    lines = [
+        f"ID No: {fields['id_number']}",
+        f"Name: {fields['name']}",
+        f"DOB: {fields['dob'].strftime('%d/%m/%Y')}",
+        f"Sex: {fields['gender']}"
+    ]
+    for i, line in enumerate(lines):
+        draw.text((int(320 * scale), int((140 + i * 80) * scale)), line, fill=(10, 10, 10), font=font)
+    return card
+
+def render_crop(fields: dict) -> Image.Image:
+    """Just the text block of a card, the size of a typical ID field crop"""
+    card = render_card(fields)
+    return card.crop((300, 120, card.width - 20, 470))
+
+def render_photo(fields: dict, rng: random.Random, size=(4032, 3024)):
+    """A 12MP 'phone photo' of the card on a desk: scaled, rotated and in
+    perspective. Returns (RGB array, true card corners tl/tr/br/bl)"""
+    width, height = size
+    card = np.array(render_card(fields))
+
+    # Textured, unevenly lit background
+    noise = np.random.default_rng(rng.randrange(2**32)).normal(0, 12, (height // 8, width // 8, 3))
+    base = np.array([rng.randrange(60, 120), rng.randrange(50, 100), rng.randrange(40, 90)], dtype=float)
+    background = cv2.resize(np.clip(base + noise, 0, 255).astype(np.uint8), (width, height),
+                            interpolation=cv2.INTER_LINEAR)
+
+    card_width = rng.uniform(0.45, 0.7) * width
+    card_height = card_width * card.shape[0] / card.shape[1]
+    angle = math.radians(rng.uniform(-12, 12))
+    cx = width / 2 + rng.uniform(-0.1, 0.1) * width
+    cy = height / 2 + rng.uniform(-0.1, 0.1) * height
+
+    corners = []
+    for dx, dy in ((-1, -1), (1, -1), (1, 1), (-1, 1)):
+        x = dx * card_width / 2 * rng.uniform(0.96, 1.04)
+        y = dy * card_height / 2 * rng.uniform(0.96, 1.04)
+        corners.append((cx + x * math.cos(angle) - y * math.sin(angle),
+                        cy + x * math.sin(angle) + y * math.cos(angle)))
+    corners = np.array(corners, dtype=np.float32)
+
+    source = np.array([[0, 0], [card.shape[1] - 1, 0], [card.shape[1] - 1, card.shape[0] - 1],
+                       [0, card.shape[0] - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(source, corners)
+    warped = cv2.warpPerspective(card, matrix, (width, height))
+    mask = cv2.warpPerspective(np.full(card.shape[:2], 255, np.uint8), matrix, (width, height))
+    photo = np.where(mask[..., None] > 0, warped, background)
+    return photo, corners
+
+def photo_corpus(count=20, seed=11):
+    """Deterministic (fields, photo, corners) triples"""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        fields = random_fields(rng)
+        photo, corners = render_photo(fields, rng)
+        items.append((fields, photo, corners))
+    return items
+
+def corpus(count=50, seed=7):
+    """Deterministic (fields, card image) pairs"""
+    rng = random.Random(seed)
+    return [(fields, render_card(fields)) for fields in (random_fields(rng) for _ in range(count))]
\ No newline at end of file
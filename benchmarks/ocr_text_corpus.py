@@ -0,0 +1,83 @@
+# benchmarks/ocr_text_corpus.py
+import random
+from benchmarks.id_corpus import FIRST_NAMES, random_fields
+
+# Typical Tesseract confusions on ID fonts
+_CONFUSIONS = {"O": "0", "I": "1", "S": "5", "B": "8", ":": ";", "/": "1"}
+
+def _noisy(line: str, rng: random.Random, rate: float) -> str:
+    """Swap look-alike characters in label text, never in the value"""
+    label, sep, value = line.partition(" ")
+    label = "".join(_CONFUSIONS.get(c, c) if rng.random() < rate else c for c in label)
+    return f"{label}{sep}{value}"
+
+def _zone_text(fields, rng, rate):
+    """Text as read from the field zones of the card (one line per zone)"""
+    lines = [
+        f"ID No: {fields['id_number']}",
+        f"Name: {fields['name']}",
+        f"DOB: {fields['dob'].strftime('%d/%m/%Y')}",
+        f"Sex: {fields['gender']}"
+    ]
+    return "\n".join(_noisy(line, rng, rate) for line in lines)
+
+def _national_id_text(fields, rng, rate):
+    """Full-card text of a national ID, labels above their values"""
+    serial = str(rng.randrange(100000000, 999999999))
+    separator = rng.choice([".", "/", "-"])
+    lines = [
+        "JAMHURI YA KENYA",
+        "REPUBLIC OF KENYA",
+        f"SERIAL NUMBER: {serial}",
+        f"ID NUMBER: {fields['id_number']}",
+        "FULL NAMES",
+        fields["name"],
+        "DATE OF BIRTH",
+        fields["dob"].strftime(f"%d{separator}%m{separator}%Y"),
+        "SEX",
+        fields["gender"].upper(),
+        "DISTRICT OF BIRTH",
+        rng.choice(["NAIROBI", "KISUMU", "NAKURU", "MOMBASA"]),
+        f"{rng.choice(['~', '|', '.'])} {rng.choice(['HOLDER', 'SIGN'])}'S SIGNATURE"
+    ]
+    return "\n".join(lines)
+
+def _licence_text(fields, rng, rate):
+    """Full-card text of a driving licence with its numbered fields"""
+    first, surname = fields["name"].split(" ", 1)
+    other = f"{first} {rng.choice(FIRST_NAMES)}" if rng.random() < 0.5 else first
+    # Licences do not print the holder's sex
+    fields = dict(fields, name=f"{other} {surname}", gender="", licence_number=f"DL{rng.randrange(1000000, 9999999)}")
+    lines = [
+        "REPUBLIC OF KENYA",
+        "DRIVING LICENCE",
+        f"1. {surname}",
+        f"2. {other}",
+        f"3. {fields['dob'].strftime('%d.%m.%Y')} KENYA",
+        f"4a. {rng.randrange(1, 28):02d}.01.2021 4b. {rng.randrange(1, 28):02d}.01.2024",
+        f"5. {fields['licence_number']}",
+        f"ID {fields['id_number']}",
+        "9. B C1"
+    ]
+    return fields, "\n".join(lines)
+
+def text_corpus(count=300, seed=5, noise=0.1):
+    """Deterministic (expected fields, OCR text, layout) triples
+
+    A third each of zone reads, full national ID reads and driving
+    licence reads; noise is the chance of a look-alike swap per label
+    character.
+    """
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        fields = random_fields(rng)
+        layout = ("zones", "national_id", "licence")[i % 3]
+        if layout == "zones":
+            text = _zone_text(fields, rng, noise)
+        elif layout == "national_id":
+            text = _national_id_text(fields, rng, noise)
+        else:
+            fields, text = _licence_text(fields, rng, noise)
+        items.append((fields, text, layout))
+    return items
@@ -2,47 +2,274 @@
 import pandas as pd
 from datetime import datetime
 import json
+import logging
 import os
+import threading
+from cryptography.exceptions import InvalidTag
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Member files are sealed with envelope encryption unless this is switched off
+ENCRYPT_AT_REST = os.getenv("ENCRYPT_AT_REST", "true").lower() not in ("0", "false", "no")
+ENCRYPTED_RECORD_EXT = ".enc"
+
+# PII fields stored encrypted at rest, mapped to their stored field names
+MEMBER_ENCRYPTED_FIELDS = {
+    'name': 'name_encrypted',
+    'id_number': 'id_number_encrypted',
+    'dob': 'dob_encrypted'
+}
+FAMILY_ENCRYPTED_FIELDS = {
+    'name': 'name_encrypted',
+    'dob': 'dob_encrypted'
+}
+
+def _encrypt_fields(record, fields, encryption):
+    """Replace plaintext PII fields with their encrypted counterparts"""
+    encrypted = dict(record)
+    for plain_field, encrypted_field in fields.items():
+        value = encrypted.pop(plain_field, None)
+        if value is not None and value != "":
+            encrypted[encrypted_field] = encryption.encrypt(str(value))
+    return encrypted
+
+def _decrypt_fields(record, fields, encryption, cache=None):
+    """Restore PII fields from their encrypted counterparts
+
+    With a cache the fields become lazy EncryptedValue proxies that only
+    decrypt when read; without one they are decrypted immediately.
+    """
+    decrypted = dict(record)
+    for plain_field, encrypted_field in fields.items():
+        if encrypted_field in decrypted:
+            token = decrypted.pop(encrypted_field)
+            if cache is not None:
+                decrypted[plain_field] = encryption.lazy(token, cache)
+            else:
+                decrypted[plain_field] = encryption.decrypt(token)
+    return decrypted
+
+def encrypt_member_record(member_data, encryption):
+    """Member record as stored: PII encrypted, including family members"""
+    record = _encrypt_fields(member_data, MEMBER_ENCRYPTED_FIELDS, encryption)
+    if record.get('family_members'):
+        record['family_members'] = [
+            _encrypt_fields(fm, FAMILY_ENCRYPTED_FIELDS, encryption)
+            for fm in record['family_members']
+        ]
+    return record
+
+def decrypt_member_record(record, encryption, cache=None):
+    """Member record as used by the app: PII decrypted (lazily with a cache)"""
+    member = _decrypt_fields(record, MEMBER_ENCRYPTED_FIELDS, encryption, cache)
+    if member.get('family_members'):
+        member['family_members'] = [
+            _decrypt_fields(fm, FAMILY_ENCRYPTED_FIELDS, encryption, cache)
+            for fm in member['family_members']
+        ]
+    return member
 
 class SimpleDatabase:
     """Simple file-based database for testing"""
     
     def __init__(self):
+        # No key check here: this runs at import, and pages fall back on
+        # ImportError only. The keyring raises MissingEncryptionKeyError on
+        # the first encrypt or decrypt instead.
         self.data_dir = "data"
         os.makedirs(self.data_dir, exist_ok=True)
+        self._encryption = None
+        self._blind_index = None
+        self._rollups = None
+        # Bumped on every member write so cached views know to rebuild
+        self.version = 0
+        self._version_lock = threading.Lock()
+    
+    @property
+    def encryption(self):
+        # Imported lazily so config does not depend on services at import time
+        if self._encryption is None:
+            from services.encryption_service import EncryptionService
+            self._encryption = EncryptionService()
+        return self._encryption
+    
+    @property
+    def blind_index(self):
+        if self._blind_index is None:
+            from services.blind_index_service import blind_index_service
+            if not blind_index_service.exists():
+                blind_index_service.rebuild(self.get_all_members(lazy=False))
+            self._blind_index = blind_index_service
+        return self._blind_index
+    
+    @property
+    def rollups(self):
+        if self._rollups is None:
+            from services.registration_rollup_service import registration_rollups
+            if not registration_rollups.exists():
+                registration_rollups.rebuild(self.get_all_members())
+            self._rollups = registration_rollups
+        return self._rollups
+    
+    @staticmethod
+    def read_record(filepath):
+        """Read a stored record file, plaintext (.json) or encrypted (.enc)"""
+        if filepath.endswith(ENCRYPTED_RECORD_EXT):
+            from services.envelope_service import envelope_service
+            return json.loads(envelope_service.read_file(os.path.basename(filepath), filepath))
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @staticmethod
+    def write_record(filepath, record):
+        """Write a record file atomically (temp file + rename)"""
+        if filepath.endswith(ENCRYPTED_RECORD_EXT):
+            from services.envelope_service import envelope_service
+            payload = json.dumps(record, default=str).encode('utf-8')
+            envelope_service.write_file(os.path.basename(filepath), filepath, payload)
+            return
+        tmp_path = f"{filepath}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, indent=2, default=str)
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def member_path(self, member_id, encrypted=None):
+        """Where a member record is stored, encrypted at rest by default"""
+        if encrypted is None:
+            encrypted = ENCRYPT_AT_REST
+        ext = ENCRYPTED_RECORD_EXT if encrypted else ".json"
+        return os.path.join(self.data_dir, f"member_{member_id}{ext}")
+    
+    def member_files(self):
+        """Paths of all stored member records, in a stable order"""
+        if not os.path.exists(self.data_dir):
+            return []
+        return [
+            os.path.join(self.data_dir, filename)
+            for filename in sorted(os.listdir(self.data_dir))
+            if filename.startswith('member_') and filename.endswith(('.json', ENCRYPTED_RECORD_EXT))
+        ]
         
     def save_member(self, member_data):
         """Save member to JSON file"""
         member_id = member_data.get('public_id', f"M{datetime.now().strftime('%Y%m%d%H%M%S')}")
         
-        # Add timestamp
-        member_data['saved_at'] = datetime.now().isoformat()
+        # Reserve the ID number, rejecting one already registered to another member
+        id_number = member_data.get('id_number')
+        claimed = bool(id_number) and self.blind_index.claim_id(id_number, member_id)
         
-        # Save to file
-        filename = os.path.join(self.data_dir, f"member_{member_id}.json")
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(member_data, f, indent=2, default=str)
+        try:
+            # Count first saves only in the registration rollups; the table is
+            # built (from existing members) before this one is written
+            is_new = not any(os.path.exists(self.member_path(member_id, enc)) for enc in (True, False))
+            rollups = self.rollups if is_new else None
+            
+            # Add timestamp
+            member_data['saved_at'] = datetime.now().isoformat()
+            
+            # Save to file with PII encrypted and a keyed hash for lookups
+            record = encrypt_member_record(member_data, self.encryption)
+            if id_number:
+                record['id_number_hash'] = self.blind_index.id_token(id_number)
+            self.write_record(self.member_path(member_id), record)
+        except Exception:
+            if claimed:
+                self.blind_index.release_id(id_number, member_id)
+            raise
+        
+        # Drop the copy in the other format, e.g. after enabling encryption at rest
+        stale = self.member_path(member_id, encrypted=not ENCRYPT_AT_REST)
+        if os.path.exists(stale):
+            os.remove(stale)
+        
+        self.blind_index.add_member(member_id, id_number, member_data.get('phone_number'))
+        if rollups is not None:
+            rollups.record(member_data)
+        with self._version_lock:
+            self.version += 1
         
         return member_id
     
-    def get_all_members(self):
-        """Get all members from files"""
+    def get_member(self, member_id):
+        """Get one member by public ID, or None"""
+        for encrypted in (True, False):
+            filepath = self.member_path(member_id, encrypted)
+            if os.path.exists(filepath):
+                return decrypt_member_record(self.read_record(filepath), self.encryption)
+        return None
+    
+    def find_member_by_id_number(self, id_number):
+        """Look up a member by national ID via the blind index"""
+        member_id = self.blind_index.lookup_id(id_number)
+        return self.get_member(member_id) if member_id else None
+    
+    def find_member_by_phone(self, phone):
+        """Look up a member by phone number via the blind index"""
+        member_id = self.blind_index.lookup_phone(phone)
+        return self.get_member(member_id) if member_id else None
+    
+    def get_all_members(self, lazy=True, cache=None):
+        """Get all members from files
+        
+        By default PII fields are lazy proxies sharing one decryption cache
+        for this call, so only the values a page actually shows are decrypted.
+        Pass a DecryptionCache to control how long decrypted values are kept,
+        or lazy=False to decrypt everything up front (exports, re-indexing).
+        
+        A corrupt or tampered record file is logged and skipped. Segment
+        keys that the configured ENCRYPTION_KEY cannot unwrap raise
+        EnvelopeKeyError, since every record would be unreadable.
+        """
+        from services.encryption_service import DecryptionCache
+        if not lazy:
+            cache = None
+        elif cache is None:
+            cache = DecryptionCache(self.encryption)
+        
         members = []
-        if os.path.exists(self.data_dir):
-            for filename in os.listdir(self.data_dir):
-                if filename.startswith('member_') and filename.endswith('.json'):
-                    filepath = os.path.join(self.data_dir, filename)
+        for filepath in self.member_files():
+            try:
+                record = self.read_record(filepath)
+            except (OSError, ValueError, InvalidTag) as e:
+                logger.warning("Skipping unreadable member record %s: %r", filepath, e)
+                continue
+            members.append(decrypt_member_record(record, self.encryption, cache))
+        return members
+
+    def save_payment(self, payment_data):
+        """Append a payment transaction to the payments log"""
+        record = dict(payment_data)
+        record.setdefault('transaction_date', datetime.now().isoformat())
+
+        filename = os.path.join(self.data_dir, "payments.jsonl")
+        with open(filename, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+        return record
+
+    def get_all_payments(self):
+        """Get all payment transactions from the payments log"""
+        payments = []
+        filename = os.path.join(self.data_dir, "payments.jsonl")
+        if os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                for line in f:
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            member_data = json.load(f)
-                            members.append(member_data)
-                    except:
+                        payments.append(json.loads(line))
+                    except ValueError:
                         continue
-        return members
-    
+        return payments
+
     def export_to_excel(self, date_filter=None):
         """Export to Excel for testing"""
-        members = self.get_all_members()
+        members = self.get_all_members(lazy=False)
         
         if not members:
             return None
@@ -5,6 +5,7 @@ from datetime import datetime
 import os
 import sys
 import io
+import logging
 from PIL import Image
 import tempfile
 
@@ -14,13 +15,32 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import local modules
 try:
     from services.ocr_service import OCRService
-    from services.encryption_service import EncryptionService
+    from services.encryption_service import EncryptionService, InvalidEncryptionKeyError, MissingEncryptionKeyError
     from services.pdf_service import PDFService
     from config.settings import APP_CONFIG
     from config.database import db
+    from services.blind_index_service import DuplicateMemberError
+    from services.ocr_job_service import OCRQueueFullError, ocr_job_service
+    from utils.templates import proposal_html, welcome_email_html
     MODULES_AVAILABLE = True
 except ImportError as e:
     MODULES_AVAILABLE = False
+    ocr_job_service = None
+    proposal_html = None
+    welcome_email_html = None
+    
+    class DuplicateMemberError(ValueError):
+        pass
+    
+    class MissingEncryptionKeyError(RuntimeError):
+        pass
+    
+    class InvalidEncryptionKeyError(ValueError):
+        pass
+    
+    class OCRQueueFullError(RuntimeError):
+        pass
+    
     # Create minimal fallbacks
     class OCRService:
         def extract_id_details(self, image_file):
@@ -34,14 +54,10 @@ except ImportError as e:
             return id_number[:3] + "****" + id_number[-1] if len(id_number) > 4 else id_number
     
     class PDFService:
-        def generate_proposal_form(self, member_data, family_members=None):
-            # Create a simple text file as fallback
-            import tempfile
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.txt', mode='w')
-            temp_file.write(f"Insurance Proposal for {member_data.get('name', 'Member')}\n")
-            temp_file.write(f"Member ID: {member_data.get('public_id', 'N/A')}\n")
-            temp_file.close()
-            return temp_file.name
+        def get_proposal_form(self, member_data, family_members=None):
+            # Plain text stand-in when the PDF service is unavailable
+            return (f"Insurance Proposal for {member_data.get('name', 'Member')}\n"
+                    f"Member ID: {member_data.get('public_id', 'N/A')}\n").encode('utf-8')
     
     class Config:
         COVER_OPTIONS = {
@@ -60,6 +76,8 @@ st.set_page_config(
     layout="wide"
 )
 
+logger = logging.getLogger(__name__)
+
 # Initialize services
 ocr_service = OCRService()
 encryption_service = EncryptionService()
@@ -81,6 +99,23 @@ def initialize_session_state():
         if key not in st.session_state:
             st.session_state[key] = value
 
+def run_id_ocr(uploaded_file):
+    """OCR an ID photo on the worker pool, waiting up to the job's timeout"""
+    if ocr_job_service is None:
+        return ocr_service.extract_id_details(uploaded_file)
+    
+    try:
+        job_id = ocr_job_service.submit(uploaded_file)
+        return ocr_job_service.result(job_id)
+    except OCRQueueFullError as e:
+        st.warning(str(e))
+    except TimeoutError:
+        st.warning("Reading the ID took too long. Try a clearer photo or enter details manually.")
+    except Exception:
+        logger.exception("ID OCR failed")
+        st.error("Could not read the ID photo. Please enter details manually.")
+    return None
+
 def show_id_photo_upload():
     """Step 1: ID Photo Upload with OCR"""
     st.header("📸 Step 1: Upload ID Photo")
@@ -100,7 +135,7 @@ def show_id_photo_upload():
         with col2:
             if st.button("🔍 Extract ID Details", type="primary"):
                 with st.spinner("Extracting details from ID..."):
-                    extracted_data = ocr_service.extract_id_details(uploaded_file)
+                    extracted_data = run_id_ocr(uploaded_file)
                     
                     if extracted_data and extracted_data.get("name"):
                         st.success("✅ Details extracted successfully!")
@@ -131,6 +166,9 @@ def show_id_photo_upload():
                         if col_no.button("❌ No, Edit Manually"):
                             st.session_state.edit_manual = True
                             st.rerun()
+                    elif extracted_data and extracted_data.get("retake_hint"):
+                        # Failed the quality check before OCR; a retake will do better
+                        st.warning(f"📷 {extracted_data['retake_hint']}")
                     else:
                         st.error("Could not extract details automatically. Please enter manually.")
                         st.session_state.edit_manual = True
@@ -325,6 +363,14 @@ def process_registration(family_members):
                     saved_id = db.save_member(complete_record)
                     st.success(f"✅ Saved to database with ID: {saved_id}")
                     database_saved = True
+                except DuplicateMemberError as dup_error:
+                    st.error(f"❌ This ID number is already registered (Member ID: {dup_error.member_id}).")
+                    st.info("Please check the member's existing policy instead of registering again.")
+                    return
+                except (MissingEncryptionKeyError, InvalidEncryptionKeyError) as key_error:
+                    # Nothing is stored without a usable key
+                    st.error(f"❌ Registration cannot be saved: {key_error}")
+                    return
                 except Exception as db_error:
                     st.warning(f"⚠️ Database save skipped: {db_error}")
             
@@ -332,36 +378,23 @@ def process_registration(family_members):
             pdf_generated = False
             pdf_content = None
             pdf_filename = f"insurance_proposal_{member_id}.pdf"
+            pdf_mime = "application/pdf"
             
             try:
-                pdf_path = pdf_service.generate_proposal_form(complete_record, family_members)
-                
-                # Read the PDF file
-                if os.path.exists(pdf_path):
-                    with open(pdf_path, "rb") as f:
-                        pdf_content = f.read()
-                    pdf_generated = True
-                else:
-                    # Create a simple text PDF as fallback
-                    pdf_content = f"""
-                    AYTIN AFRICA INSURANCE PROPOSAL
-                    
-                    Member ID: {member_id}
-                    Name: {member_data['name']}
-                    ID Number: {member_data['id_number']}
-                    Phone: {member_data['phone']}
-                    Cover: {APP_CONFIG.COVER_OPTIONS[selected_cover]['name']}
-                    Daily Premium: KES {APP_CONFIG.COVER_OPTIONS[selected_cover]['daily']}
-                    Registration Date: {datetime.now().strftime('%Y-%m-%d')}
-                    
-                    Family Members:
-                    {chr(10).join(f"- {fm['name']} ({fm['relationship']})" for fm in family_members) if family_members else "None"}
-                    
-                    Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-                    """.encode('utf-8')
-                    
-            except Exception as pdf_error:
-                # Create minimal PDF content
+                # Served from the PDF cache when these details were rendered before
+                pdf_content = pdf_service.get_proposal_form(complete_record, family_members)
+                pdf_generated = MODULES_AVAILABLE
+            except Exception:
+                logger.exception("Proposal PDF for %s could not be rendered", member_id)
+            
+            if not pdf_generated and proposal_html:
+                # The HTML proposal has the same sections as the PDF
+                pdf_content = proposal_html(complete_record, APP_CONFIG.COVER_OPTIONS).encode('utf-8')
+                pdf_filename = f"insurance_proposal_{member_id}.html"
+                pdf_mime = "text/html"
+            elif not pdf_generated:
+                pdf_mime = "text/plain"
+            if not pdf_content:
                 pdf_content = f"Insurance Proposal for {member_data['name']}\nMember ID: {member_id}".encode('utf-8')
             
             # Show success message
@@ -395,7 +428,15 @@ def process_registration(family_members):
                         "📄 Download Insurance Proposal",
                         pdf_content,
                         file_name=pdf_filename,
-                        mime="application/pdf" if pdf_generated else "text/plain"
+                        mime=pdf_mime
+                    )
+                
+                if welcome_email_html:
+                    st.download_button(
+                        "✉️ Download Welcome Email",
+                        welcome_email_html(complete_record, APP_CONFIG.COVER_OPTIONS),
+                        file_name=f"welcome_{member_id}.html",
+                        mime="text/html"
                     )
             
             with col2:
@@ -17,6 +17,7 @@ st.set_page_config(
 # Try to import database modules
 try:
     from config.database import db
+    from services.registration_rollup_service import registration_day
     from models.member import Member
     from models.agent import Agent
     DATABASE_AVAILABLE = True
@@ -86,10 +87,12 @@ def get_todays_registrations(agent_id=1):
         try:
             # Get members from database
             members_data = db.get_all_members()
-            # Filter for today and this agent
+            # Filter for today and this agent, by the same registration day
+            # as the rollups (registration_date, falling back to saved_at)
+            today = datetime.now().date()
             today_members = [
                 m for m in members_data 
-                if datetime.fromisoformat(m.get('saved_at', '')).date() == datetime.now().date()
+                if registration_day(m) == today
                 and m.get('agent_id') == agent_id
             ]
             return today_members
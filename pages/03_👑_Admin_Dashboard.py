@@ -5,10 +5,13 @@ from datetime import datetime, timedelta
 import os
 import sys
 import io
+import tempfile
 
 # Add path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from utils import formatters
+
 st.set_page_config(
     page_title="Admin Dashboard - AYTIN AFRICA",
     page_icon="👑",
@@ -24,12 +27,21 @@ except ImportError:
     PLOTLY_AVAILABLE = False
 
 try:
-    from services.encryption_service import EncryptionService
+    from services.encryption_service import EncryptionService, InvalidEncryptionKeyError, MissingEncryptionKeyError
+    from services.envelope_service import EnvelopeKeyError
+    from services.activity_service import activity_service
+    from services.pdf_batch_service import ProposalBatchJob, matching_members
+    from services.pdf_service import pdf_cache
+    from services.member_data_service import member_frame_cache, member_metrics, prepare_members_frame
     from config.database import db
     from config.settings import APP_CONFIG
+    from utils.templates import write_welcome_emails_zip
     MODULES_AVAILABLE = True
+    # Stored members that cannot be read: shown as errors, never replaced by demo data
+    MEMBER_DATA_ERRORS = (EnvelopeKeyError, MissingEncryptionKeyError, InvalidEncryptionKeyError, OSError)
 except ImportError:
     MODULES_AVAILABLE = False
+    MEMBER_DATA_ERRORS = ()
     
     # Fallback classes
     class EncryptionService:
@@ -41,6 +53,14 @@ except ImportError:
             return f"{id_number[:3]}****{id_number[-1]}"
     
     db = None
+    activity_service = None
+    ProposalBatchJob = None
+    matching_members = None
+    write_welcome_emails_zip = None
+    pdf_cache = None
+    member_frame_cache = None
+    prepare_members_frame = None
+    member_metrics = None
 
 def generate_demo_data():
     """Generate demo data for admin dashboard"""
@@ -73,32 +93,26 @@ def generate_demo_data():
     
     return members, agents
 
-def calculate_metrics(members):
-    """Calculate key metrics from member data"""
-    total_members = len(members)
-    
-    # Total premiums (simulated)
-    total_premium = sum(m.get('total_paid', 0) for m in members)
+def calculate_metrics(members_df):
+    """Calculate key metrics from the members frame"""
+    if member_metrics:
+        return member_metrics(members_df)
     
-    # Today's registrations
     today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_registrations = sum(1 for m in members 
-                             if m.get('registration_date', datetime.now()) >= today_start)
-    
-    # Pending payments (negative balances)
-    pending_count = sum(1 for m in members if m.get('balance_days', 0) < 0)
-    
-    # Active members
-    active_members = sum(1 for m in members if m.get('status') == "Active")
-    
     return {
-        "total_members": total_members,
-        "total_premium": total_premium,
-        "today_registrations": today_registrations,
-        "pending_count": pending_count,
-        "active_members": active_members
+        "total_members": len(members_df),
+        "total_premium": members_df['total_paid'].sum(),
+        "today_registrations": int((members_df['registration_date'] >= today_start).sum()),
+        "pending_count": int((members_df['balance_days'] < 0).sum()),
+        "active_members": int((members_df['status'] == "Active").sum())
     }
 
+def discard_export_zip(key):
+    """Delete the last ZIP generated under this session key from disk"""
+    path = st.session_state.pop(key, None)
+    if path and os.path.exists(path):
+        os.remove(path)
+
 def main():
     st.title("👑 Admin Dashboard")
     st.markdown("### The Big Picture - Total Control & Visibility")
@@ -107,9 +121,6 @@ def main():
     if not MODULES_AVAILABLE:
         st.info("ℹ️ Using demo data - Some modules not fully configured")
     
-    # Initialize encryption service
-    enc_service = EncryptionService()
-    
     # Authentication
     if 'admin_authenticated' not in st.session_state:
         st.session_state.admin_authenticated = False
@@ -136,21 +147,22 @@ def main():
             st.caption("Default: admin / admin123")
         return
     
-    # Get data
-    if db:
+    # Get data: a typed members frame shared across sessions, rebuilt after
+    # new registrations or when its TTL expires
+    members_df = None
+    if member_frame_cache:
         try:
-            members_data = db.get_all_members()
-            # Convert string dates to datetime
-            for member in members_data:
-                if 'saved_at' in member:
-                    member['registration_date'] = datetime.fromisoformat(member['saved_at'])
-        except:
-            members_data, agents_data = generate_demo_data()
-    else:
+            members_df = member_frame_cache.frame()
+        except MEMBER_DATA_ERRORS as e:
+            st.error(f"❌ Member records could not be read: {e}")
+            return
+    using_database = members_df is not None
+    if members_df is None:
         members_data, agents_data = generate_demo_data()
+        members_df = prepare_members_frame(members_data) if prepare_members_frame else pd.DataFrame(members_data)
     
     # Calculate metrics
-    metrics = calculate_metrics(members_data)
+    metrics = calculate_metrics(members_df)
     
     # Header Metrics
     st.markdown("---")
@@ -196,64 +208,64 @@ def main():
             ["All", "Basic", "Standard", "Premium", "Family", "Corporate"]
         )
     
-    # Filter data
-    filtered_members = members_data.copy()
+    # Search by national ID (keyed blind index, no decryption of other records)
+    if db:
+        search_id = st.text_input("🔎 Search by National ID", placeholder="12345678")
+        if search_id:
+            found = db.find_member_by_id_number(search_id)
+            if found:
+                st.success(f"Found: {found.get('name', '')} — Member ID {found.get('public_id', '')}, "
+                           f"{found.get('cover_type', '').title()} cover, {found.get('status', '')}")
+            else:
+                st.warning("No member registered with that ID number")
+    
+    # Filter data on the cached frame (boolean masks, no copies of the records)
+    mask = pd.Series(True, index=members_df.index)
     
     if date_filter:
-        filtered_members = [
-            m for m in filtered_members 
-            if m.get('registration_date', datetime.now()).date() == date_filter
-        ]
+        mask &= members_df['registration_date'].dt.normalize() == pd.Timestamp(date_filter)
     
     if agent_filter != "All":
         agent_id = agent_options.index(agent_filter)
-        filtered_members = [
-            m for m in filtered_members 
-            if m.get('agent_id', 0) == agent_id
-        ]
+        mask &= members_df['agent_id'] == agent_id
     
     if status_filter != "All":
-        filtered_members = [
-            m for m in filtered_members 
-            if m.get('status', '').lower() == status_filter.lower()
-        ]
+        mask &= members_df['status'].str.lower() == status_filter.lower()
     
     if cover_filter != "All":
-        filtered_members = [
-            m for m in filtered_members 
-            if m.get('cover_type', '').lower() == cover_filter.lower()
-        ]
+        mask &= members_df['cover_type'].str.lower() == cover_filter.lower()
+    
+    filtered_df = members_df[mask.fillna(False).astype(bool)]
     
     # Payment Details Section
     st.markdown("---")
     st.subheader("💰 Payment Status Details")
     
-    # Create payment status table
-    payment_data = []
-    for member in filtered_members[:50]:  # Limit for display
-        days_balance = member.get('balance_days', 0)
-        amount_due = abs(days_balance) * 200 if days_balance < 0 else 0
-        
-        # Mask ID
-        masked_id = enc_service.mask_id_number(
-            member.get('id_number', ''),
-            is_super_admin=st.session_state.get('is_super_admin', False)
-        )
+    # Create payment status table, building display columns column-wise
+    is_super_admin = st.session_state.get('is_super_admin', False)
+    page_members = filtered_df.head(50)  # Limit for display
+    
+    def column(name, default=''):
+        if name in page_members.columns:
+            return page_members[name].fillna(default)
+        return pd.Series(default, index=page_members.index)
+    
+    if not page_members.empty:
+        balance_days = pd.to_numeric(column('balance_days', 0), errors='coerce').fillna(0).astype(int)
+        amount_due = (-balance_days).clip(lower=0) * 200
+        phones = column('phone_number').astype(str)
         
-        payment_data.append({
-            "Member ID": member.get('public_id', ''),
-            "Name": member.get('name', ''),
-            "ID Number": masked_id,
-            "Phone": member.get('phone_number', ''),
-            "Cover": member.get('cover_type', '').title(),
-            "Balance Days": days_balance,
-            "Amount Due": f"KES {amount_due:,.2f}" if amount_due > 0 else "Paid",
-            "Status": member.get('status', ''),
-            "Registration Date": member.get('registration_date', datetime.now()).strftime("%Y-%m-%d")
+        df_payments = pd.DataFrame({
+            "Member ID": column('public_id'),
+            "Name": column('name').astype(str),  # Decrypts only the rows shown
+            "ID Number": formatters.mask_id_numbers(column('id_number'), is_super_admin),
+            "Phone": phones if is_super_admin else formatters.mask_phone_numbers(phones),
+            "Cover": column('cover_type').astype(str).str.title(),
+            "Balance Days": balance_days,
+            "Amount Due": formatters.format_kes(amount_due, zero_label="Paid"),
+            "Status": column('status'),
+            "Registration Date": formatters.format_dates(column('registration_date', datetime.now()))
         })
-    
-    if payment_data:
-        df_payments = pd.DataFrame(payment_data)
         
         # Color code balance days
         def color_balance(val):
@@ -300,32 +312,40 @@ def main():
         st.info("No data matching the selected filters")
     
     # Visualizations
-    if PLOTLY_AVAILABLE and filtered_members:
+    if PLOTLY_AVAILABLE and not filtered_df.empty:
         st.markdown("---")
         st.subheader("📈 Analytics & Charts")
         
         viz_col1, viz_col2 = st.columns(2)
         
         with viz_col1:
-            # Registration trend (last 7 days)
-            dates = [(datetime.now() - timedelta(days=i)).date() for i in range(7, -1, -1)]
-            reg_counts = []
+            # Registration trend from the daily rollups (day x agent x cover)
+            trend_periods = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last 365 days": 365}
+            trend_days = trend_periods[st.selectbox("Trend Period", list(trend_periods))]
+            trend_agent = agent_options.index(agent_filter) if agent_filter != "All" else None
+            trend_cover = cover_filter.lower() if cover_filter != "All" else None
             
-            for date in dates:
-                count = sum(1 for m in members_data 
-                           if m.get('registration_date', datetime.now()).date() == date)
-                reg_counts.append(count)
+            if db and using_database:
+                trend = db.rollups.daily_counts(trend_days, agent_id=trend_agent, cover_type=trend_cover)
+            else:
+                # Demo data: count the frame's registrations per day
+                start = pd.Timestamp(datetime.now().date() - timedelta(days=trend_days - 1))
+                trend_mask = members_df['registration_date'] >= start
+                if trend_agent is not None:
+                    trend_mask &= members_df['agent_id'] == trend_agent
+                if trend_cover is not None:
+                    trend_mask &= members_df['cover_type'].str.lower() == trend_cover
+                per_day = members_df.loc[trend_mask.fillna(False).astype(bool), 'registration_date'].dt.normalize().value_counts()
+                days_index = pd.date_range(start, periods=trend_days, freq='D')
+                trend = list(zip(days_index.date, per_day.reindex(days_index, fill_value=0)))
             
-            trend_df = pd.DataFrame({
-                "Date": [d.strftime("%b %d") for d in dates],
-                "Registrations": reg_counts
-            })
+            trend_df = pd.DataFrame(trend, columns=["Date", "Registrations"])
             
             fig1 = px.bar(
                 trend_df, 
                 x="Date", 
                 y="Registrations",
-                title="📅 Daily Registrations (Last 7 Days)",
+                title=f"📅 Daily Registrations (Last {trend_days} Days)",
                 color="Registrations",
                 color_continuous_scale="Blues"
             )
@@ -333,15 +353,12 @@ def main():
         
         with viz_col2:
             # Cover type distribution
-            cover_counts = {}
-            for member in filtered_members:
-                cover = member.get('cover_type', 'unknown').title()
-                cover_counts[cover] = cover_counts.get(cover, 0) + 1
+            cover_counts = filtered_df['cover_type'].astype(str).replace('', 'unknown').str.title().value_counts(sort=False)
             
-            if cover_counts:
+            if not cover_counts.empty:
                 covers_df = pd.DataFrame({
-                    "Cover": list(cover_counts.keys()),
-                    "Count": list(cover_counts.values())
+                    "Cover": cover_counts.index,
+                    "Count": cover_counts.values
                 })
                 
                 fig2 = px.pie(
@@ -353,6 +370,49 @@ def main():
                 )
                 st.plotly_chart(fig2, use_container_width=True)
     
+    # Retention & Churn (from daily active-member bitmaps)
+    if activity_service:
+        st.markdown("---")
+        st.subheader("🔁 Retention & Churn")
+        
+        today = datetime.now().date()
+        if not activity_service.has_day(today):
+            st.info("No active-member snapshot for today yet. The daily status job writes one each day.")
+            if db and st.button("📥 Backfill Last 90 Days", use_container_width=True):
+                with st.spinner("Building daily active-member bitmaps..."):
+                    activity_service.backfill(db, days=90)
+                st.rerun()
+        else:
+            ret_col1, ret_col2, ret_col3, ret_col4 = st.columns(4)
+            
+            week = activity_service.retention(today - timedelta(days=7), today)
+            month = activity_service.retention(today - timedelta(days=30), today)
+            moves = activity_service.reactivations(today)
+            
+            with ret_col1:
+                st.metric("7-Day Retention", f"{week['retention_rate']:.1%}", f"-{week['churned']} churned")
+            with ret_col2:
+                st.metric("30-Day Retention", f"{month['retention_rate']:.1%}", f"-{month['churned']} churned")
+            with ret_col3:
+                st.metric("Reactivated Today", moves['reactivated'], f"+{moves['new']} new")
+            with ret_col4:
+                st.metric("Lapsed Today", moves['lapsed'])
+            
+            active_df = pd.DataFrame(
+                activity_service.daily_active_counts(days=90, end=today),
+                columns=["Date", "Active Members"]
+            )
+            if PLOTLY_AVAILABLE:
+                fig_active = px.line(
+                    active_df,
+                    x="Date",
+                    y="Active Members",
+                    title="📈 Active Members (Last 90 Days)"
+                )
+                st.plotly_chart(fig_active, use_container_width=True)
+            else:
+                st.line_chart(active_df.set_index("Date"))
+    
     # Agent Performance
     st.markdown("---")
     st.subheader("👥 Agent Performance")
@@ -390,10 +450,102 @@ def main():
             st.success(f"Super Admin Mode: {status}")
             st.rerun()
     
+    # Bulk proposal reissue
+    if db and ProposalBatchJob:
+        with st.expander("📄 Reissue Proposals & Welcome Emails"):
+            reissue_col1, reissue_col2 = st.columns(2)
+            with reissue_col1:
+                reissue_agent = st.selectbox("Agent's Book", agent_options, key="reissue_agent")
+            with reissue_col2:
+                reissue_dates = st.date_input(
+                    "Registration Date Range",
+                    value=(datetime.now().date() - timedelta(days=30), datetime.now().date()),
+                    key="reissue_dates"
+                )
+            
+            start_date, end_date = (tuple(reissue_dates) + (None, None))[:2]
+            reissue_query = {
+                "agent_id": agent_options.index(reissue_agent) if reissue_agent != "All" else None,
+                "start_date": start_date,
+                "end_date": end_date or start_date
+            }
+            
+            if st.button("🗂️ Generate Proposal ZIP", use_container_width=True):
+                job = ProposalBatchJob(db, **reissue_query)
+                progress_bar = st.progress(0.0)
+                
+                def show_progress(stats):
+                    progress_bar.progress(stats['percent_complete'] / 100,
+                                          text=f"{stats['documents']:,} proposals, "
+                                               f"{stats['documents_per_second']:,.1f} docs/s")
+                
+                # Built on disk (private temp file) rather than held in session state
+                discard_export_zip('reissue_zip_path')
+                archive = tempfile.NamedTemporaryFile(prefix="aytin_proposals_", suffix=".zip", delete=False)
+                try:
+                    with archive:
+                        stats = job.run(archive, progress_callback=show_progress)
+                except Exception:
+                    os.remove(archive.name)
+                    raise
+                st.session_state.reissue_zip_path = archive.name
+                st.success(f"{stats['documents']:,} proposals in {stats['elapsed_seconds']:.1f}s "
+                           f"({stats['documents_per_second']:,.1f} docs/s)")
+                if stats['errors']:
+                    failed = ', '.join(map(str, stats['failed'][:20]))
+                    if len(stats['failed']) > 20:
+                        failed += f" and {len(stats['failed']) - 20:,} more"
+                    st.warning(f"{stats['documents']:,} of {stats['documents'] + stats['errors']:,} "
+                               f"proposals rendered; failed: {failed}")
+            
+            zip_path = st.session_state.get('reissue_zip_path')
+            if zip_path and os.path.exists(zip_path):
+                with open(zip_path, 'rb') as zip_file:
+                    st.download_button(
+                        "📥 Download Proposals (ZIP)",
+                        zip_file,
+                        file_name=f"aytin_proposals_{datetime.now().strftime('%Y%m%d')}.zip",
+                        mime="application/zip",
+                        use_container_width=True
+                    )
+            
+            if write_welcome_emails_zip and st.button("✉️ Generate Welcome Emails ZIP", use_container_width=True):
+                discard_export_zip('welcome_zip_path')
+                archive = tempfile.NamedTemporaryFile(prefix="aytin_welcome_", suffix=".zip", delete=False)
+                try:
+                    with archive:
+                        emails = write_welcome_emails_zip(matching_members(db, **reissue_query), archive,
+                                                          APP_CONFIG.COVER_OPTIONS)
+                except Exception:
+                    os.remove(archive.name)
+                    raise
+                st.session_state.welcome_zip_path = archive.name
+                st.success(f"{emails:,} welcome emails rendered")
+            
+            welcome_path = st.session_state.get('welcome_zip_path')
+            if welcome_path and os.path.exists(welcome_path):
+                with open(welcome_path, 'rb') as zip_file:
+                    st.download_button(
+                        "📥 Download Welcome Emails (ZIP)",
+                        zip_file,
+                        file_name=f"aytin_welcome_emails_{datetime.now().strftime('%Y%m%d')}.zip",
+                        mime="application/zip",
+                        use_container_width=True
+                    )
+            
+            if pdf_cache:
+                cache_stats = pdf_cache.stats()
+                st.caption(f"Proposal PDF cache: {cache_stats['entries']:,} files, "
+                           f"{cache_stats['bytes'] / 1024 / 1024:.1f} of {cache_stats['max_bytes'] / 1024 / 1024:.0f} MB, "
+                           f"{cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses "
+                           f"({cache_stats['hit_rate']:.0%}), {cache_stats['evictions']:,} evicted")
+    
     # Logout
     st.markdown("---")
     if st.button("🚪 Logout", type="secondary", use_container_width=True):
         st.session_state.admin_authenticated = False
+        discard_export_zip('reissue_zip_path')
+        discard_export_zip('welcome_zip_path')
         st.rerun()
 
 if __name__ == "__main__":
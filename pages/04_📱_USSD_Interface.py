@@ -14,6 +14,16 @@ st.set_page_config(
     layout="wide"
 )
 
+# Try to import modules
+try:
+    from services.eligibility_service import eligibility_service
+    from config.database import db
+    MODULES_AVAILABLE = True
+except ImportError:
+    MODULES_AVAILABLE = False
+    eligibility_service = None
+    db = None
+
 def main():
     st.title("📱 USSD/SMS Interface")
     st.markdown("### Access Insurance Services Without a Smartphone")
@@ -109,8 +119,18 @@ def main():
                 
                 if st.form_submit_button("Simulate Payment"):
                     total = amount * days
+                    member = db.find_member_by_phone(phone) if db else None
+                    if member:
+                        # No confirmed M-Pesa transaction, so the row buys no cover
+                        db.save_payment({
+                            "member_id": member['public_id'],
+                            "amount": total,
+                            "days_paid": days,
+                            "payment_method": "M-Pesa",
+                            "simulated": True
+                        })
                     st.success(f"✅ Payment of KES {total:,} simulated!")
-                    st.info(f"Covered for {days} day(s)")
+                    st.info("Demo only: cover is extended once M-Pesa confirms a real payment")
     
     with tab3:
         st.markdown("### Check Status via USSD")
@@ -120,19 +140,29 @@ def main():
             member_id = st.text_input("Member ID or Phone", placeholder="M001 or +254...")
             
             if st.form_submit_button("Check Status"):
-                # Simulate status check
-                import random
-                statuses = ["Active", "Active", "Active", "Inactive", "Suspended"]
-                balance = random.randint(-3, 5)
-                
-                st.success(f"📊 Status for {member_id}:")
-                st.write(f"**Coverage:** {random.choice(statuses)}")
-                st.write(f"**Balance Days:** {balance} {'overpaid' if balance > 0 else 'in arrears' if balance < 0 else 'current'}")
-                st.write(f"**Daily Premium:** KES 200")
-                
-                if balance < 0:
-                    amount_needed = abs(balance) * 200
-                    st.warning(f"⚠️ You need to pay KES {amount_needed} to restore coverage")
+                result = eligibility_service.verify(member_id) if eligibility_service else None
+                if result and result.get('found'):
+                    st.success(f"📊 Status for {member_id}:")
+                    st.write(f"**Coverage:** {result['status']}")
+                    if result.get('covered_until'):
+                        st.write(f"**Covered Until:** {result['covered_until']}")
+                    st.write(f"**As Of:** {result['as_of']}")
+                    if not result['covered']:
+                        st.warning("⚠️ Pay your daily premium to restore coverage")
+                else:
+                    # Simulate status check
+                    import random
+                    statuses = ["Active", "Active", "Active", "Inactive", "Suspended"]
+                    balance = random.randint(-3, 5)
+                    
+                    st.success(f"📊 Status for {member_id}:")
+                    st.write(f"**Coverage:** {random.choice(statuses)}")
+                    st.write(f"**Balance Days:** {balance} {'overpaid' if balance > 0 else 'in arrears' if balance < 0 else 'current'}")
+                    st.write(f"**Daily Premium:** KES 200")
+                    
+                    if balance < 0:
+                        amount_needed = abs(balance) * 200
+                        st.warning(f"⚠️ You need to pay KES {amount_needed} to restore coverage")
     
     st.markdown("---")
     
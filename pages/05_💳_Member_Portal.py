@@ -17,6 +17,7 @@ st.set_page_config(
 # Try to import modules
 try:
     from services.encryption_service import EncryptionService
+    from services.coverage_service import CoverageIndex, is_simulated
     from config.database import db
     MODULES_AVAILABLE = True
 except ImportError:
@@ -66,6 +67,26 @@ def generate_demo_member_data(member_id="M001"):
     
     return member_data, payment_history, balance_days
 
+def load_member_account(member_id):
+    """Payment history and day balance for a stored member, from the payments log
+
+    Simulated (demo) payments are left out: they are not confirmed by M-Pesa.
+    """
+    payments = [p for p in db.get_all_payments()
+                if p.get('member_id') == member_id and not is_simulated(p)]
+    payment_history = [
+        {
+            "date": datetime.fromisoformat(str(p['transaction_date'])),
+            "amount": p.get('amount', 0),
+            "days": p.get('days_paid', 0),
+            "method": p.get('payment_method', 'M-Pesa'),
+            "transaction_id": p.get('transaction_id', '')
+        }
+        for p in payments if p.get('transaction_date')
+    ]
+    balance_days = CoverageIndex.build(payments).balance_days(member_id, datetime.now())
+    return payment_history, balance_days
+
 def main():
     st.title("💳 Member Portal")
     st.markdown("### Manage Your Insurance Account")
@@ -97,8 +118,19 @@ def main():
             st.write("")
             if st.button("Login", type="primary", use_container_width=True):
                 if credential:
+                    # Resolve phone / national ID logins through the blind index
+                    found = None
+                    if db and MODULES_AVAILABLE:
+                        if login_method == "Phone Number":
+                            found = db.find_member_by_phone(credential)
+                        elif login_method == "ID Number":
+                            found = db.find_member_by_id_number(credential)
+                    
                     st.session_state.member_logged_in = True
-                    st.session_state.member_id = credential if "M" in credential else "M001"
+                    if found:
+                        st.session_state.member_id = found['public_id']
+                    else:
+                        st.session_state.member_id = credential if "M" in credential else "M001"
                     st.rerun()
                 else:
                     st.error("Please enter your credentials")
@@ -114,17 +146,24 @@ def main():
         return
     
     # Get member data
+    current_member = None
     if db and MODULES_AVAILABLE:
         try:
-            members = db.get_all_members()
-            current_member = next((m for m in members if m.get('public_id') == st.session_state.member_id), None)
-            if not current_member:
-                current_member, payment_history, balance_days = generate_demo_member_data(st.session_state.member_id)
+            current_member = db.get_member(st.session_state.member_id)
         except:
-            current_member, payment_history, balance_days = generate_demo_member_data(st.session_state.member_id)
+            current_member = None
+    
+    member_stored = current_member is not None
+    if member_stored:
+        payment_history, balance_days = load_member_account(current_member['public_id'])
+        current_member['status'] = "Active" if balance_days >= 0 else "Inactive"
     else:
         current_member, payment_history, balance_days = generate_demo_member_data(st.session_state.member_id)
     
+    reg_date = current_member.get('registration_date', datetime.now())
+    if isinstance(reg_date, str):
+        reg_date = datetime.fromisoformat(reg_date)
+    
     # Member Header
     st.markdown("---")
     col1, col2, col3 = st.columns([2, 1, 1])
@@ -154,11 +193,8 @@ def main():
         with summary_cols[0]:
             st.metric("Daily Premium", f"KES {current_member.get('daily_premium', 200)}")
         with summary_cols[1]:
-            st.metric("Family Covered", len(current_member.get('family_members', [])))
+            st.metric("Family Covered", len(current_member.get('family_members') or []))
         with summary_cols[2]:
-            reg_date = current_member.get('registration_date', datetime.now())
-            if isinstance(reg_date, str):
-                reg_date = datetime.fromisoformat(reg_date)
             days_member = (datetime.now() - reg_date).days
             st.metric("Member For", f"{days_member} days")
         with summary_cols[3]:
@@ -240,10 +276,18 @@ def main():
             days_to_pay = int(amount / current_member.get('daily_premium', 200))
             
             if st.button("💳 Process Payment", type="primary", use_container_width=True):
-                st.success(f"✅ Payment of KES {amount:,} processed!")
-                st.info(f"Coverage extended by {days_to_pay} day(s)")
-                new_balance = balance_days + days_to_pay
-                st.metric("New Balance Days", new_balance)
+                if member_stored:
+                    # No confirmed M-Pesa transaction, so the row buys no cover
+                    db.save_payment({
+                        "member_id": current_member['public_id'],
+                        "amount": amount,
+                        "days_paid": days_to_pay,
+                        "payment_method": payment_method,
+                        "simulated": True
+                    })
+                st.success(f"✅ Payment of KES {amount:,} simulated!")
+                st.info(f"Demo only: coverage is extended by {days_to_pay} day(s) "
+                        f"once M-Pesa confirms a real payment")
         
         with col2:
             st.write("**Payment Calculator**")
@@ -274,7 +318,7 @@ def main():
     with tab3:
         st.subheader("👨‍👩‍👧‍👦 Family Members")
         
-        family_members = current_member.get('family_members', [])
+        family_members = current_member.get('family_members') or []
         
         if family_members:
             for i, member in enumerate(family_members, 1):
@@ -284,7 +328,7 @@ def main():
                         st.write(f"**Date of Birth:** {member.get('dob', 'N/A')}")
                         st.write(f"**Coverage:** {'✅ Active' if current_member.get('status') == 'Active' else '❌ Inactive'}")
                     with col2:
-                        st.write(f"**Added:** {current_member.get('registration_date', datetime.now()).strftime('%Y-%m-%d')}")
+                        st.write(f"**Added:** {reg_date.strftime('%Y-%m-%d')}")
                         st.write(f"**Premium:** Included in family cover")
             
             st.metric("Total Family Members", len(family_members))
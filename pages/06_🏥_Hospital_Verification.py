@@ -0,0 +1,97 @@
+# pages/06_🏥_Hospital_Verification.py
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+import os
+import sys
+
+# Add path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+st.set_page_config(
+    page_title="Hospital Verification - AYTIN AFRICA",
+    page_icon="🏥",
+    layout="wide"
+)
+
+# Try to import modules
+try:
+    from services.eligibility_service import eligibility_service
+    from config.database import db
+    MODULES_AVAILABLE = True
+except ImportError:
+    MODULES_AVAILABLE = False
+    eligibility_service = None
+    db = None
+
+def main():
+    st.title("🏥 Hospital Eligibility Verification")
+    st.markdown("### Check patient cover at admission")
+
+    if not MODULES_AVAILABLE:
+        st.error("⚠️ Verification service is not available")
+        return
+
+    snapshot = eligibility_service.load_snapshot()
+    if snapshot:
+        st.caption(f"Coverage snapshot as of {snapshot['as_of']} "
+                   f"({len(snapshot['members']):,} members)")
+    else:
+        st.warning("No coverage snapshot found. Run the daily status job to build one.")
+
+    if st.button("🔄 Rebuild Today's Snapshot") and db:
+        with st.spinner("Building coverage snapshot..."):
+            eligibility_service.run_daily_status_job(db)
+        st.success("Snapshot rebuilt")
+        st.rerun()
+
+    st.markdown("---")
+
+    tab1, tab2 = st.tabs(["📝 Enter Patients", "📤 Upload List"])
+
+    identifiers = []
+
+    with tab1:
+        with st.form("verify_batch"):
+            raw_ids = st.text_area(
+                "Member IDs or phone numbers (one per line)",
+                placeholder="M20260117170546\n+254712345678",
+                height=200
+            )
+            if st.form_submit_button("Verify Coverage", type="primary"):
+                identifiers = [line for line in raw_ids.splitlines() if line.strip()]
+
+    with tab2:
+        uploaded = st.file_uploader("CSV with one identifier per row", type=['csv', 'txt'])
+        if uploaded and st.button("Verify Uploaded List", type="primary"):
+            df_upload = pd.read_csv(uploaded, header=None, dtype=str)
+            identifiers = df_upload.iloc[:, 0].dropna().tolist()
+
+    if identifiers:
+        started = datetime.now()
+        results = eligibility_service.verify_batch(identifiers)
+        elapsed_ms = (datetime.now() - started).total_seconds() * 1000
+
+        df_results = pd.DataFrame(results)
+        covered_count = int(df_results['covered'].sum()) if not df_results.empty else 0
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Checked", len(results))
+        col2.metric("Covered", covered_count)
+        col3.metric("Lookup Time", f"{elapsed_ms:.1f} ms")
+
+        st.dataframe(df_results, use_container_width=True)
+        st.download_button(
+            "📈 Download Results",
+            df_results.to_csv(index=False),
+            file_name=f"eligibility_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv"
+        )
+
+    st.markdown("---")
+    st.caption("ℹ️ Systems integration: POST {\"ids\": [...]} to /verify on the eligibility "
+               "endpoint (python -m services.eligibility_service serve) with "
+               "\"Authorization: Bearer <ELIGIBILITY_API_TOKEN>\", up to 1,000 ids per request.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# services/activity_service.py
+from datetime import date, timedelta
+import json
+import os
+import threading
+import zlib
+import numpy as np
+from services.coverage_service import CoverageIndex
+from utils.file_lock import file_lock
+
+class ActivityService:
+    """Daily active-member bitmaps for cohort and retention queries
+
+    Every member gets a stable ordinal the first time it is seen. Each day
+    the status job stores the set of active ordinals as a zlib-compressed
+    bitmap, held in memory as a Python int so unions, intersections and
+    differences across days are single big-integer operations.
+    """
+
+    def __init__(self, snapshot_dir="data/snapshots"):
+        self.snapshot_dir = snapshot_dir
+        self._lock = threading.Lock()
+        self._ordinals = None
+        self._bitmaps = {}
+
+    # Member ordinals
+
+    def _ordinals_file(self) -> str:
+        return os.path.join(self.snapshot_dir, "member_ordinals.json")
+
+    def _read_ordinals(self) -> dict:
+        if not os.path.exists(self._ordinals_file()):
+            return {}
+        with open(self._ordinals_file(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def ordinals_for(self, member_ids) -> np.ndarray:
+        """Ordinals for member IDs, assigning new ones to unseen members
+
+        Assigned ordinals never change, so known members are answered from
+        memory. New members are assigned under a file lock after reloading
+        the file, so processes sharing snapshot_dir never hand the same
+        ordinal to two members.
+        """
+        member_ids = list(member_ids)
+        with self._lock:
+            if self._ordinals is None:
+                self._ordinals = self._read_ordinals()
+            ordinals = self._ordinals
+
+            if any(member_id not in ordinals for member_id in member_ids):
+                with file_lock(f"{self._ordinals_file()}.lock"):
+                    ordinals = self._ordinals = self._read_ordinals()
+                    for member_id in member_ids:
+                        if member_id not in ordinals:
+                            ordinals[member_id] = len(ordinals)
+
+                    tmp_path = f"{self._ordinals_file()}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(ordinals, f)
+                    os.replace(tmp_path, self._ordinals_file())
+
+            result = [ordinals[member_id] for member_id in member_ids]
+
+        return np.asarray(result, dtype=np.int64)
+
+    # Bitmaps
+
+    def _bitmap_file(self, day: date) -> str:
+        return os.path.join(self.snapshot_dir, f"active_{day.strftime('%Y%m%d')}.bin")
+
+    @staticmethod
+    def _to_bitmap(ordinals) -> int:
+        """Pack ordinals into an int with bit i set for ordinal i"""
+        if len(ordinals) == 0:
+            return 0
+        bits = np.zeros(int(ordinals.max()) + 1, dtype=bool)
+        bits[ordinals] = True
+        return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+    def write_day(self, day: date, member_ids) -> int:
+        """Store the active-member bitmap for a day, returns the active count"""
+        bitmap = self._to_bitmap(self.ordinals_for(member_ids))
+        raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = self._bitmap_file(day)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(raw))
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._bitmaps[day] = bitmap
+        return bitmap.bit_count()
+
+    def bitmap(self, day: date) -> int:
+        """Active-member bitmap for a day (0 when no snapshot exists)"""
+        with self._lock:
+            if day in self._bitmaps:
+                return self._bitmaps[day]
+
+        path = self._bitmap_file(day)
+        if not os.path.exists(path):
+            return 0
+
+        with open(path, 'rb') as f:
+            bitmap = int.from_bytes(zlib.decompress(f.read()), 'little')
+        with self._lock:
+            self._bitmaps[day] = bitmap
+        return bitmap
+
+    def has_day(self, day: date) -> bool:
+        return day in self._bitmaps or os.path.exists(self._bitmap_file(day))
+
+    def backfill(self, db, days=90, end: date = None) -> int:
+        """Write bitmaps for past days from payment history, returns days written
+
+        Uses the daily status job's definition of active: registered
+        members inside a paid cover period (CoverageIndex.covered_members).
+        """
+        end = end or date.today()
+        index = CoverageIndex.from_database(db)
+        member_ids = [m['public_id'] for m in db.get_all_members() if m.get('public_id')]
+        written = 0
+        for offset in range(days - 1, -1, -1):
+            day = end - timedelta(days=offset)
+            self.write_day(day, index.covered_members(member_ids, day))
+            written += 1
+        return written
+
+    # Metrics
+
+    def daily_active_counts(self, days=90, end: date = None) -> list:
+        """(date, active count) for each of the last N days"""
+        end = end or date.today()
+        return [
+            (day, self.bitmap(day).bit_count())
+            for day in (end - timedelta(days=offset) for offset in range(days - 1, -1, -1))
+        ]
+
+    def retention(self, start: date, end: date) -> dict:
+        """Members active on start who are still / no longer active on end"""
+        before = self.bitmap(start)
+        after = self.bitmap(end)
+        cohort = before.bit_count()
+        retained = (before & after).bit_count()
+        return {
+            "cohort": cohort,
+            "retained": retained,
+            "churned": cohort - retained,
+            "retention_rate": retained / cohort if cohort else 0.0,
+            "churn_rate": (cohort - retained) / cohort if cohort else 0.0
+        }
+
+    def reactivations(self, day: date, lookback_days=90) -> dict:
+        """New and reactivated members on a day relative to the previous day
+
+        Reactivated members were active at some point in the lookback window
+        but not yesterday; new members were not active anywhere in it.
+        """
+        today = self.bitmap(day)
+        yesterday = self.bitmap(day - timedelta(days=1))
+
+        seen = 0
+        for offset in range(2, lookback_days + 1):
+            seen |= self.bitmap(day - timedelta(days=offset))
+
+        returning = today & ~yesterday
+        reactivated = returning & seen
+        return {
+            "reactivated": reactivated.bit_count(),
+            "new": (returning & ~seen).bit_count(),
+            "lapsed": (yesterday & ~today).bit_count()
+        }
+
+# Shared instance so bitmaps are decompressed once per process
+activity_service = ActivityService()
\ No newline at end of file
@@ -0,0 +1,233 @@
+# services/blind_index_service.py
+from contextlib import contextmanager
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+from services.encryption_service import get_keyring
+from utils.validators import Validators
+
+class DuplicateMemberError(ValueError):
+    """Raised when an ID number is already registered to another member"""
+
+    def __init__(self, member_id):
+        super().__init__(f"ID number is already registered to member {member_id}")
+        self.member_id = member_id
+
+class BlindIndexService:
+    """Keyed HMAC tokens for national ID and phone with a persistent lookup map
+
+    Tokens are HMAC-SHA256 over the normalized value, so they can be stored
+    next to encrypted PII and searched on without decrypting anything, but
+    cannot be brute-forced over the ID space without the key. The map from
+    token to member ID is a SQLite table keyed by token, opened once per
+    process; SQLite's file locking keeps writers in several app processes
+    consistent, and each save is one small transaction.
+
+    The HMAC key is BLIND_INDEX_KEY when set. Otherwise it is derived from
+    one version of the encryption keyring, pinned in <index>.key_version
+    when first used, so adding a new primary key changes no tokens.
+    KeyRotationJob calls rekey() to move the index to the new primary
+    before the old key is retired. Rebuilds bump the index generation
+    (PRAGMA user_version), and every process drops its cached key when it
+    sees a new one.
+    """
+
+    def __init__(self, index_path="data/blind_index", key: bytes = None):
+        self.index_path = index_path
+        self._fixed_key = key
+        self._key = key
+        self._lock = threading.RLock()
+        self._db = None
+        self._generation = None
+
+    def _pin_file(self) -> str:
+        return f"{self.index_path}.key_version"
+
+    def _read_pin(self):
+        if not os.path.exists(self._pin_file()):
+            return None
+        with open(self._pin_file(), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+
+    def _write_pin(self, version):
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self._pin_file()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(tmp_path, self._pin_file())
+
+    def derives_key(self) -> bool:
+        """True when the key comes from the encryption keyring"""
+        return self._fixed_key is None and not os.getenv("BLIND_INDEX_KEY")
+
+    @property
+    def key(self) -> bytes:
+        if self._key is None:
+            if not self.derives_key():
+                self._key = os.getenv("BLIND_INDEX_KEY").encode()
+            else:
+                keyring = get_keyring()
+                version = self._read_pin()
+                if version is None:
+                    version = keyring.primary_version
+                    self._write_pin(version)
+                if version not in keyring.keys:
+                    raise ValueError(
+                        f"The blind index is keyed from encryption key version {version!r}, "
+                        "which is not in ENCRYPTION_KEY. Keep it until key rotation has "
+                        "re-keyed the index, or set BLIND_INDEX_KEY and rebuild."
+                    )
+                self._key = hmac.new(keyring.keys[version], b"blind-index", hashlib.sha256).digest()
+        return self._key
+
+    def needs_rekey(self) -> bool:
+        """True when a derived key is pinned to a version other than the primary"""
+        if not self.derives_key():
+            return False
+        pinned = self._read_pin()
+        return pinned is not None and pinned != get_keyring().primary_version
+
+    def _db_file(self) -> str:
+        return f"{self.index_path}.sqlite3"
+
+    def _open(self):
+        """Connection to the index, with the cached key checked against the generation"""
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            index = sqlite3.connect(self._db_file(), timeout=30, isolation_level=None,
+                                    check_same_thread=False)
+            index.execute("PRAGMA journal_mode=WAL")
+            index.execute("CREATE TABLE IF NOT EXISTS tokens "
+                          "(token TEXT PRIMARY KEY, member_id TEXT NOT NULL) WITHOUT ROWID")
+            self._db = index
+        generation = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if generation != self._generation:
+            # Rebuilt (possibly re-keyed) since this process last looked
+            self._key = self._fixed_key
+            self._generation = generation
+        return self._db
+
+    @contextmanager
+    def _write(self):
+        """Write transaction, exclusive across threads and processes"""
+        with self._lock:
+            index = self._open()
+            index.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._open()
+            except BaseException:
+                index.execute("ROLLBACK")
+                raise
+            index.execute("COMMIT")
+
+    def exists(self) -> bool:
+        """True once the index has been built"""
+        if not os.path.exists(self._db_file()):
+            return False
+        with self._lock:
+            return self._open().execute("PRAGMA user_version").fetchone()[0] > 0
+
+    def token(self, kind: str, value: str) -> str:
+        """HMAC token for a value, domain-separated by field kind"""
+        return hmac.new(self.key, f"{kind}:{value}".encode(), hashlib.sha256).hexdigest()
+
+    def id_token(self, id_number: str) -> str:
+        return self.token("id", str(id_number).replace(" ", "").strip())
+
+    def phone_token(self, phone: str) -> str:
+        return self.token("phone", Validators.normalize_phone_number(phone))
+
+    def _get(self, make_token, value):
+        with self._lock:
+            index = self._open()
+            row = index.execute("SELECT member_id FROM tokens WHERE token = ?",
+                                (make_token(value),)).fetchone()
+        return row[0] if row else None
+
+    def lookup_id(self, id_number):
+        """Member ID registered with a national ID number, or None"""
+        if not id_number:
+            return None
+        return self._get(self.id_token, id_number)
+
+    def lookup_phone(self, phone):
+        """Member ID registered with a phone number, or None"""
+        if not phone:
+            return None
+        return self._get(self.phone_token, phone)
+
+    def check_duplicate(self, id_number, member_id=None):
+        """Raise DuplicateMemberError if the ID belongs to a different member"""
+        existing = self.lookup_id(id_number)
+        if existing and existing != member_id:
+            raise DuplicateMemberError(existing)
+
+    def claim_id(self, id_number, member_id) -> bool:
+        """Reserve an ID number for a member in one transaction
+
+        Raises DuplicateMemberError if another member holds it, so two
+        processes cannot register the same ID. Returns True if the ID was
+        newly reserved (release_id undoes that after a failed save).
+        """
+        with self._write() as index:
+            token = self.id_token(id_number)
+            row = index.execute("SELECT member_id FROM tokens WHERE token = ?", (token,)).fetchone()
+            if row and row[0] != member_id:
+                raise DuplicateMemberError(row[0])
+            if not row:
+                index.execute("INSERT INTO tokens VALUES (?, ?)", (token, member_id))
+            return not row
+
+    def release_id(self, id_number, member_id):
+        """Drop a reservation made by claim_id, if the member still holds it"""
+        with self._write() as index:
+            index.execute("DELETE FROM tokens WHERE token = ? AND member_id = ?",
+                          (self.id_token(id_number), member_id))
+
+    def _entries(self, member_id, id_number=None, phone=None):
+        entries = []
+        if id_number:
+            entries.append((self.id_token(id_number), member_id))
+        if phone:
+            entries.append((self.phone_token(phone), member_id))
+        return entries
+
+    def add_member(self, member_id, id_number=None, phone=None):
+        """Index a member's ID number and phone"""
+        with self._write() as index:
+            index.executemany("INSERT OR REPLACE INTO tokens VALUES (?, ?)",
+                              self._entries(member_id, id_number, phone))
+
+    def rekey(self, members) -> int:
+        """Rebuild the index from scratch, pinning a derived key to the primary version"""
+        with self._lock:
+            if self.derives_key():
+                self._write_pin(get_keyring().primary_version)
+            self._key = self._fixed_key
+            return self.rebuild(members, replace=True)
+
+    def rebuild(self, members, replace=False) -> int:
+        """Re-index every member record (plaintext fields) in one transaction
+
+        With replace, existing tokens are dropped first. Returns the count.
+        """
+        count = 0
+        with self._write() as index:
+            if replace:
+                index.execute("DELETE FROM tokens")
+            for member in members:
+                member_id = member.get('public_id')
+                if member_id:
+                    index.executemany("INSERT OR REPLACE INTO tokens VALUES (?, ?)",
+                                      self._entries(member_id, member.get('id_number'),
+                                                    member.get('phone_number')))
+                    count += 1
+            # New generation: other processes reload their key
+            self._generation = index.execute("PRAGMA user_version").fetchone()[0] + 1
+            index.execute(f"PRAGMA user_version = {self._generation}")
+        return count
+
+# Shared instance so the index file is opened once per process
+blind_index_service = BlindIndexService()
\ No newline at end of file
@@ -0,0 +1,272 @@
+# services/coverage_service.py
+from bisect import bisect_right
+from datetime import date, datetime
+import numpy as np
+from config.settings import APP_CONFIG
+
+def _to_ordinal(value) -> int:
+    """Convert a date, datetime or ISO string to a proleptic day ordinal"""
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).date().toordinal()
+    return int(value)
+
+def _field(record, name, default=None):
+    """Read a field from either a dict or a model object"""
+    if isinstance(record, dict):
+        return record.get(name, default)
+    return getattr(record, name, default)
+
+def is_simulated(payment) -> bool:
+    """Whether a payment row came from a demo button rather than M-Pesa"""
+    return bool(_field(payment, 'simulated', False))
+
+class CoverageIndex:
+    """Interval index of paid coverage periods per member
+
+    Each payment of N days made on day D covers the half-open day range
+    [D, D + N). Payments made while coverage is still running extend it
+    from its current end. Payments made after coverage has lapsed first
+    clear the arrears (capped at the grace period, as in
+    PaymentService.calculate_balance) and only the remainder buys cover.
+
+    Intervals are merged and kept sorted per member in flat arrays, so a
+    point-in-time check is a single bisect and bulk checks are one
+    vectorized searchsorted.
+
+    Simulated payments (demo buttons, no confirmed M-Pesa transaction)
+    buy no cover and are skipped.
+    """
+
+    def __init__(self, grace_period_days: int = None):
+        if grace_period_days is None:
+            grace_period_days = APP_CONFIG.GRACE_PERIOD_DAYS
+        self.grace_period_days = grace_period_days
+        self.daily_rate = APP_CONFIG.DAILY_PREMIUM_RATE
+
+        self._member_pos = {}
+        self._member_ids = []
+        self._offsets = [0]
+        self._starts = []
+        self._ends = []
+        self._build_arrays()
+
+    @classmethod
+    def build(cls, transactions, grace_period_days: int = None):
+        """Build an index from payment transactions (dicts or model objects)"""
+        index = cls(grace_period_days)
+
+        payments_by_member = {}
+        for txn in transactions:
+            member_id = _field(txn, 'member_id')
+            txn_date = _field(txn, 'transaction_date')
+            if member_id is None or txn_date is None or is_simulated(txn):
+                continue
+
+            days_paid = _field(txn, 'days_paid')
+            if days_paid is None:
+                days_paid = int(float(_field(txn, 'amount', 0) or 0) / index.daily_rate)
+            if days_paid <= 0:
+                continue
+
+            payments_by_member.setdefault(member_id, []).append(
+                (_to_ordinal(txn_date), int(days_paid))
+            )
+
+        for member_id, payments in payments_by_member.items():
+            intervals = index._paid_intervals(sorted(payments))
+            if not intervals:
+                continue
+            index._member_pos[member_id] = len(index._member_ids)
+            index._member_ids.append(member_id)
+            for start, end in intervals:
+                index._starts.append(start)
+                index._ends.append(end)
+            index._offsets.append(len(index._starts))
+
+        index._build_arrays()
+        return index
+
+    @classmethod
+    def from_database(cls, db, grace_period_days: int = None):
+        """Build an index from the payments stored in the database"""
+        return cls.build(db.get_all_payments(), grace_period_days)
+
+    def _paid_intervals(self, payments):
+        """Replay one member's payments into merged covered intervals"""
+        intervals = []
+        paid_until = None
+
+        for day, days_paid in payments:
+            if paid_until is None:
+                paid_until = day
+
+            if paid_until >= day:
+                start = paid_until
+                end = paid_until + days_paid
+            else:
+                arrears = min(day - paid_until, self.grace_period_days)
+                start = day
+                end = day - arrears + days_paid
+
+            if end > start:
+                if intervals and intervals[-1][1] >= start:
+                    intervals[-1][1] = max(intervals[-1][1], end)
+                else:
+                    intervals.append([start, end])
+            paid_until = end
+
+        return intervals
+
+    def _build_arrays(self):
+        """Build the vectorized views used by the bulk queries"""
+        self._starts_arr = np.asarray(self._starts, dtype=np.int64)
+        self._ends_arr = np.asarray(self._ends, dtype=np.int64)
+        self._offsets_arr = np.asarray(self._offsets, dtype=np.int64)
+
+        # Interval starts keyed by (member position, day) so a single sorted
+        # array serves searches across all members
+        counts = np.diff(self._offsets_arr)
+        owners = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+        self._keys_arr = (owners << 32) | self._starts_arr
+
+    def __len__(self):
+        return len(self._member_pos)
+
+    def __contains__(self, member_id):
+        return member_id in self._member_pos
+
+    @property
+    def interval_count(self) -> int:
+        return len(self._starts)
+
+    def member_ids(self):
+        """Member IDs that have at least one covered interval"""
+        return list(self._member_ids)
+
+    def intervals(self, member_id):
+        """All covered (start, end) date ranges for a member, end exclusive"""
+        pos = self._member_pos.get(member_id)
+        if pos is None:
+            return []
+        lo, hi = self._offsets[pos], self._offsets[pos + 1]
+        return [
+            (date.fromordinal(self._starts[i]), date.fromordinal(self._ends[i]))
+            for i in range(lo, hi)
+        ]
+
+    def coverage_interval(self, member_id, on_date):
+        """The covered (start, end) range containing on_date, or None"""
+        pos = self._member_pos.get(member_id)
+        if pos is None:
+            return None
+
+        day = _to_ordinal(on_date)
+        lo, hi = self._offsets[pos], self._offsets[pos + 1]
+        i = bisect_right(self._starts, day, lo, hi) - 1
+        if i >= lo and day < self._ends[i]:
+            return date.fromordinal(self._starts[i]), date.fromordinal(self._ends[i])
+        return None
+
+    def latest_interval(self, member_id, on_date):
+        """The last covered (start, end) range starting on or before on_date"""
+        pos = self._member_pos.get(member_id)
+        if pos is None:
+            return None
+
+        day = _to_ordinal(on_date)
+        lo, hi = self._offsets[pos], self._offsets[pos + 1]
+        i = bisect_right(self._starts, day, lo, hi) - 1
+        if i < lo:
+            return None
+        return date.fromordinal(self._starts[i]), date.fromordinal(self._ends[i])
+
+    def balance_days(self, member_id, on_date) -> int:
+        """Day balance as in PaymentService.calculate_balance
+
+        Paid days left after on_date while covered (0 on the last covered
+        day), otherwise days in arrears as a negative number capped at the
+        grace period. A member who never paid owes the first day (-1).
+        """
+        interval = self.latest_interval(member_id, on_date)
+        if interval is None:
+            return -1
+        day = _to_ordinal(on_date)
+        end = interval[1].toordinal()
+        if day < end:
+            return end - day - 1
+        return -min(day - end + 1, self.grace_period_days)
+
+    def is_covered(self, member_id, on_date) -> bool:
+        """Was the member covered on the given date?"""
+        pos = self._member_pos.get(member_id)
+        if pos is None:
+            return False
+
+        day = _to_ordinal(on_date)
+        lo, hi = self._offsets[pos], self._offsets[pos + 1]
+        i = bisect_right(self._starts, day, lo, hi) - 1
+        return i >= lo and day < self._ends[i]
+
+    def bulk_is_covered(self, member_ids, on_dates):
+        """Vectorized coverage check for many (member, date) pairs
+
+        on_dates may be a single date applied to every member or a sequence
+        of the same length as member_ids. Returns a boolean numpy array.
+        """
+        member_ids = list(member_ids)
+        positions = np.fromiter(
+            (self._member_pos.get(m, -1) for m in member_ids),
+            dtype=np.int64,
+            count=len(member_ids)
+        )
+
+        if isinstance(on_dates, (date, str)):
+            days = np.full(len(member_ids), _to_ordinal(on_dates), dtype=np.int64)
+        else:
+            days = np.fromiter(
+                (_to_ordinal(d) for d in on_dates),
+                dtype=np.int64,
+                count=len(member_ids)
+            )
+
+        return self._bulk_lookup(positions, days)
+
+    def _bulk_lookup(self, positions, days):
+        """Covered flags for arrays of member positions and day ordinals"""
+        covered = np.zeros(len(positions), dtype=bool)
+        known = positions >= 0
+        if not known.any() or len(self._keys_arr) == 0:
+            return covered
+
+        pos = positions[known]
+        day = days[known]
+        idx = np.searchsorted(self._keys_arr, (pos << 32) | day, side='right') - 1
+
+        valid = idx >= self._offsets_arr[pos]
+        idx = np.where(valid, idx, 0)
+        covered[known] = valid & (day < self._ends_arr[idx])
+        return covered
+
+    def covered_members(self, member_ids, on_date):
+        """Those of member_ids covered on the given date, in order
+
+        This is what counts as an active member, for the daily status job
+        and for bitmap backfills alike.
+        """
+        member_ids = list(member_ids)
+        covered = self.bulk_is_covered(member_ids, on_date)
+        return [member_id for member_id, hit in zip(member_ids, covered) if hit]
+
+    def members_covered_on(self, on_date):
+        """All member IDs covered on the given date"""
+        day = _to_ordinal(on_date)
+        hits = np.nonzero((self._starts_arr <= day) & (self._ends_arr > day))[0]
+        if len(hits) == 0:
+            return []
+
+        owners = np.searchsorted(self._offsets_arr, hits, side='right') - 1
+        return [self._member_ids[p] for p in owners]
\ No newline at end of file
@@ -0,0 +1,263 @@
+# services/eligibility_service.py
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import hmac
+import json
+import os
+import threading
+from config.settings import APP_CONFIG
+from services.activity_service import ActivityService, activity_service
+from services.blind_index_service import blind_index_service
+from services.coverage_service import CoverageIndex
+from utils.validators import Validators
+
+class EligibilityService:
+    """Hospital eligibility checks served from a daily active-member snapshot
+
+    The daily status job replays payments into a CoverageIndex once and
+    writes a flat snapshot keyed by member ID. Phone numbers are stored
+    only as blind-index tokens, so the snapshot holds no contact details;
+    a snapshot built before the blind index is re-keyed stops matching
+    phones until the next daily build. Members are covered only while a
+    paid period runs; members with no payments are not covered.
+    Verification requests only read that in-memory snapshot, so they
+    never touch the member store.
+    """
+
+    def __init__(self, snapshot_dir="data/snapshots", activity=None, blind_index=None):
+        self.snapshot_dir = snapshot_dir
+        self.activity = activity or ActivityService(snapshot_dir)
+        self.blind_index = blind_index or blind_index_service
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_path = None
+        self._snapshot_mtime = None
+
+    def _snapshot_file(self, as_of: date) -> str:
+        return os.path.join(self.snapshot_dir, f"eligibility_{as_of.strftime('%Y%m%d')}.json")
+
+    def build_snapshot(self, db, as_of: date = None) -> dict:
+        """Compute coverage status for every member as of a date"""
+        as_of = as_of or date.today()
+        index = CoverageIndex.from_database(db)
+        grace = APP_CONFIG.GRACE_PERIOD_DAYS
+
+        registered = [m for m in db.get_all_members() if m.get('public_id')]
+        active = set(index.covered_members([m['public_id'] for m in registered], as_of))
+
+        members = {}
+        phones = {}
+        for member in registered:
+            member_id = member['public_id']
+            interval = index.latest_interval(member_id, as_of)
+            if member_id in active:
+                status = "Active"
+                covered = True
+                covered_until = interval[1] - timedelta(days=1)
+            elif member_id not in index:
+                # Never paid: cover starts with the first premium, whatever
+                # status was set at registration
+                status = "Inactive"
+                covered = False
+                covered_until = None
+            else:
+                lapsed_days = (as_of - interval[1]).days + 1 if interval else grace + 1
+                status = "Inactive" if lapsed_days <= grace else "Suspended"
+                covered = False
+                covered_until = interval[1] - timedelta(days=1) if interval else None
+
+            members[member_id] = {
+                "member_id": member_id,
+                "covered": covered,
+                "status": status,
+                "cover_type": member.get('cover_type', ''),
+                "covered_until": covered_until.isoformat() if covered_until else None,
+                "family_count": len(member.get('family_members') or [])
+            }
+
+            phone = Validators.normalize_phone_number(member.get('phone_number', ''))
+            if phone:
+                phones[self.blind_index.phone_token(phone)] = member_id
+
+        return {
+            "as_of": as_of.isoformat(),
+            "generated_at": datetime.now().isoformat(),
+            "members": members,
+            "phone_tokens": phones
+        }
+
+    def run_daily_status_job(self, db, as_of: date = None) -> str:
+        """Build today's snapshot and active-member bitmap for the day"""
+        as_of = as_of or date.today()
+        snapshot = self.build_snapshot(db, as_of)
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = self._snapshot_file(as_of)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._snapshot_path = path
+            self._snapshot_mtime = os.path.getmtime(path)
+
+        # Record who was active today for retention and churn metrics
+        self.activity.write_day(
+            as_of,
+            [member_id for member_id, record in snapshot["members"].items() if record["covered"]]
+        )
+
+        return path
+
+    def _latest_snapshot_path(self):
+        if not os.path.isdir(self.snapshot_dir):
+            return None
+        files = sorted(
+            f for f in os.listdir(self.snapshot_dir)
+            if f.startswith('eligibility_') and f.endswith('.json')
+        )
+        return os.path.join(self.snapshot_dir, files[-1]) if files else None
+
+    def load_snapshot(self):
+        """Return the newest snapshot, reloading only when the file changes"""
+        path = self._latest_snapshot_path()
+        if path is None:
+            return None
+
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            if path != self._snapshot_path or mtime != self._snapshot_mtime:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._snapshot = json.load(f)
+                self._snapshot_path = path
+                self._snapshot_mtime = mtime
+            return self._snapshot
+
+    def verify(self, identifier, snapshot=None) -> dict:
+        """Coverage status for one member ID or phone number"""
+        snapshot = snapshot or self.load_snapshot()
+        query = str(identifier).strip()
+
+        if snapshot is None:
+            return {"query": query, "found": False, "covered": False, "status": "Unavailable"}
+
+        record = snapshot["members"].get(query)
+        if record is None:
+            phone = Validators.normalize_phone_number(query)
+            # Snapshots from before phone tokens have no usable phone map
+            member_id = snapshot.get("phone_tokens", {}).get(self.blind_index.phone_token(phone)) if phone else None
+            record = snapshot["members"].get(member_id) if member_id else None
+
+        if record is None:
+            return {"query": query, "found": False, "covered": False,
+                    "status": "Not Found", "as_of": snapshot["as_of"]}
+
+        return {"query": query, "found": True, **record, "as_of": snapshot["as_of"]}
+
+    def verify_batch(self, identifiers) -> list:
+        """Coverage status for a batch of member IDs or phone numbers"""
+        snapshot = self.load_snapshot()
+        return [self.verify(identifier, snapshot) for identifier in identifiers if str(identifier).strip()]
+
+# Limits for the verification endpoint
+MAX_REQUEST_BYTES = 256 * 1024
+MAX_BATCH_SIZE = 1000
+
+class _VerificationHandler(BaseHTTPRequestHandler):
+    """JSON endpoint: POST /verify {"ids": ["M2026...", "+2547..."]}
+
+    Requests must send "Authorization: Bearer <token>" with the shared
+    token the server was started with.
+    """
+
+    service = None
+    token = None
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/verify':
+            self._send(404, {"error": "Not found"})
+            return
+
+        supplied = self.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {self.token}".encode()):
+            self._send(401, {"error": "Unauthorized"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_REQUEST_BYTES:
+            self._send(413, {"error": f"Request body must be at most {MAX_REQUEST_BYTES} bytes"})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            identifiers = payload.get('ids', []) if isinstance(payload, dict) else None
+            if not isinstance(identifiers, list):
+                raise ValueError("ids must be a list")
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+
+        if len(identifiers) > MAX_BATCH_SIZE:
+            self._send(413, {"error": f"At most {MAX_BATCH_SIZE} ids per request"})
+            return
+
+        self._send(200, {"results": self.service.verify_batch(identifiers)})
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(host="127.0.0.1", port=8600, token=None, service=None):
+    """HTTP server for the verification endpoint, not yet serving
+
+    token defaults to ELIGIBILITY_API_TOKEN; there is no unauthenticated mode.
+    """
+    token = token or os.getenv("ELIGIBILITY_API_TOKEN")
+    if not token:
+        raise ValueError("Set ELIGIBILITY_API_TOKEN to serve the verification endpoint")
+
+    handler = type("VerificationHandler", (_VerificationHandler,), {
+        "service": service or eligibility_service,
+        "token": token
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+def serve(host="127.0.0.1", port=8600, token=None):
+    """Serve the verification endpoint until interrupted"""
+    server = make_server(host, port, token)
+    print(f"Eligibility endpoint listening on http://{host}:{port}/verify")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# Shared instance so every page and request reuses the loaded snapshot
+eligibility_service = EligibilityService(activity=activity_service)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hospital eligibility snapshot and endpoint")
+    parser.add_argument("command", choices=["build", "serve"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from config.database import db
+        print(f"Snapshot written to {eligibility_service.run_daily_status_job(db)}")
+    else:
+        serve(host=args.host, port=args.port)
\ No newline at end of file
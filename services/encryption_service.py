@@ -1,24 +1,259 @@
 # services/encryption_service.py - SIMPLIFIED VERSION
 import hashlib
-import base64
-from cryptography.fernet import Fernet
+import os
+import threading
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from config.settings import APP_CONFIG
 
+# Separates the key version from the Fernet token ("v2:gAAAAA...")
+VERSION_SEPARATOR = ":"
+
+# Generates a key in the required format
+KEYGEN_COMMAND = 'python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"'
+
+class MissingEncryptionKeyError(RuntimeError):
+    """ENCRYPTION_KEY is not configured"""
+
+class InvalidEncryptionKeyError(ValueError):
+    """An ENCRYPTION_KEY entry is not a Fernet key"""
+
+def _fernet_key(version: str, secret: str) -> bytes:
+    """Validate one key: urlsafe base64 of 32 random bytes, as Fernet makes
+
+    Passphrases and placeholders (such as the one in .env.example) are
+    rejected rather than hashed into a key anyone could recompute.
+    """
+    key = secret.strip().encode()
+    try:
+        Fernet(key)
+    except ValueError:
+        raise InvalidEncryptionKeyError(
+            f"ENCRYPTION_KEY version {version!r} is not a Fernet key (urlsafe base64 of "
+            f"32 bytes). Generate one with: {KEYGEN_COMMAND}"
+        ) from None
+    return key
+
+class Keyring:
+    """Versioned Fernet keys with one cached cipher per version
+
+    Tokens are written as "<version>:<fernet token>" under the primary key,
+    so decryption goes straight to the right cipher. Unversioned tokens from
+    before key versioning are tried against every key, MultiFernet style.
+    """
+
+    def __init__(self, keys: dict, primary_version: str):
+        if primary_version not in keys:
+            raise ValueError(f"Primary key version {primary_version!r} not in keyring")
+
+        self.keys = dict(keys)
+        self.primary_version = primary_version
+        self.ciphers = {version: Fernet(key) for version, key in self.keys.items()}
+        self.primary = self.ciphers[primary_version]
+        self.multi = MultiFernet(
+            [self.primary] + [c for v, c in self.ciphers.items() if v != primary_version]
+        )
+
+    @classmethod
+    def from_spec(cls, spec: str):
+        """Parse "v2=<key>,v1=<key>" (first entry is primary) or a single key"""
+        keys = {}
+        primary_version = None
+        for entry in (part.strip() for part in spec.split(",")):
+            if not entry:
+                continue
+            version, sep, secret = entry.partition("=")
+            if not sep or not version or not secret or VERSION_SEPARATOR in version:
+                # A bare key, possibly with base64 "=" padding
+                version, secret = "v1", entry
+            keys[version] = _fernet_key(version, secret)
+            primary_version = primary_version or version
+
+        if not keys:
+            raise ValueError("Empty encryption key specification")
+        return cls(keys, primary_version)
+
+    @classmethod
+    def from_env(cls):
+        """Load the keyring from ENCRYPTION_KEY
+
+        There is no fallback key: data encrypted under a key that is not
+        configured anywhere could never be read again.
+        """
+        spec = os.getenv("ENCRYPTION_KEY", "")
+        if not spec.strip():
+            raise MissingEncryptionKeyError(
+                "ENCRYPTION_KEY is not set. Configure it (see .env.example) before "
+                "starting the app; member PII cannot be stored without it."
+            )
+        return cls.from_spec(spec)
+
+    def to_spec(self) -> str:
+        """Serialize back to the ENCRYPTION_KEY format (primary first)"""
+        ordered = [self.primary_version] + [v for v in self.keys if v != self.primary_version]
+        return ",".join(f"{v}={self.keys[v].decode()}" for v in ordered)
+
+    def version_of(self, token: str):
+        version, sep, _ = token.partition(VERSION_SEPARATOR)
+        return version if sep else None
+
+    def encrypt(self, data: bytes) -> str:
+        token = self.primary.encrypt(data).decode()
+        return f"{self.primary_version}{VERSION_SEPARATOR}{token}"
+
+    def decrypt(self, token: str) -> bytes:
+        version, sep, fernet_token = token.partition(VERSION_SEPARATOR)
+        if sep:
+            cipher = self.ciphers.get(version)
+            if cipher is None:
+                raise InvalidToken(f"Unknown key version {version!r}")
+            return cipher.decrypt(fernet_token.encode())
+        return self.multi.decrypt(token.encode())
+
+    def needs_rotation(self, token: str) -> bool:
+        return self.version_of(token) != self.primary_version
+
+    def rotate(self, token: str) -> str:
+        """Re-encrypt a token under the primary key (no-op if already current)"""
+        if not self.needs_rotation(token):
+            return token
+        return self.encrypt(self.decrypt(token))
+
+_keyring = None
+_keyring_lock = threading.Lock()
+
+def get_keyring() -> Keyring:
+    """Process-wide keyring, loaded from the environment on first use"""
+    global _keyring
+    if _keyring is None:
+        with _keyring_lock:
+            if _keyring is None:
+                _keyring = Keyring.from_env()
+    return _keyring
+
+def set_keyring(keyring: Keyring):
+    """Replace the process-wide keyring (e.g. after adding a new key version)"""
+    global _keyring
+    with _keyring_lock:
+        _keyring = keyring
+
+def init_worker_keyring(key_spec: str):
+    """Process pool initializer giving a worker the parent's keyring
+
+    Pass get_keyring().to_spec() as initargs, so workers use the keys the
+    parent is running with rather than re-reading ENCRYPTION_KEY.
+    """
+    set_keyring(Keyring.from_spec(key_spec))
+
+class DecryptionCache:
+    """Decrypted values keyed by ciphertext, shared by the proxies of one request"""
+
+    def __init__(self, encryption):
+        self.encryption = encryption
+        self._values = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def decrypt(self, token: str) -> str:
+        value = self._values.get(token)
+        if value is None:
+            value = self._values[token] = self.encryption.decrypt(token)
+        return value
+
+    def clear(self):
+        """Forget every decrypted value; proxies decrypt again on next use"""
+        self._values.clear()
+
+class EncryptedValue:
+    """Lazy proxy for an encrypted field that decrypts on first real use
+
+    Truthiness only checks that a ciphertext exists, so filters and counts
+    never decrypt. Formatting, comparison, slicing and string methods
+    decrypt through the request's DecryptionCache.
+    """
+
+    __slots__ = ('token', '_cache')
+
+    def __init__(self, token: str, cache: DecryptionCache):
+        self.token = token
+        self._cache = cache
+
+    @property
+    def value(self) -> str:
+        return self._cache.decrypt(self.token)
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return "EncryptedValue(<encrypted>)"
+
+    def __format__(self, format_spec):
+        return format(self.value, format_spec)
+
+    def __bool__(self):
+        return bool(self.token)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, EncryptedValue):
+            other = other.value
+        return self.value == other
+
+    def __lt__(self, other):
+        if isinstance(other, EncryptedValue):
+            other = other.value
+        return self.value < other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __add__(self, other):
+        return self.value + str(other)
+
+    def __radd__(self, other):
+        return str(other) + self.value
+
+    def __getattr__(self, name):
+        # Delegate string methods (title, strip, lower, ...) to the plaintext
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
 class EncryptionService:
     """Service for encrypting and decrypting sensitive data"""
     
-    def __init__(self):
-        # Use a simple key for testing
-        self.key = Fernet.generate_key()
-        self.cipher = Fernet(self.key)
+    def __init__(self, keyring: Keyring = None):
+        # Share one keyring (and its ciphers) across every instance; it is
+        # loaded on first use, so a missing key is reported there and not
+        # when a page imports this module
+        self._keyring = keyring
+    
+    @property
+    def keyring(self) -> Keyring:
+        if self._keyring is None:
+            self._keyring = get_keyring()
+        return self._keyring
+    
+    @property
+    def cipher(self) -> Fernet:
+        return self.keyring.primary
     
     def encrypt(self, data: str) -> str:
         """Encrypt sensitive data"""
         if not data:
             return ""
+        keyring = self.keyring
         try:
-            encrypted = self.cipher.encrypt(data.encode())
-            return encrypted.decode()
+            return keyring.encrypt(data.encode())
         except:
             return data  # Return as-is if encryption fails
     
@@ -26,14 +261,24 @@ class EncryptionService:
         """Decrypt sensitive data"""
         if not encrypted_data:
             return ""
+        keyring = self.keyring
         try:
-            decrypted = self.cipher.decrypt(encrypted_data.encode())
-            return decrypted.decode()
+            return keyring.decrypt(encrypted_data).decode()
         except:
             return encrypted_data  # Return as-is if decryption fails
     
+    def lazy(self, encrypted_data: str, cache: DecryptionCache = None) -> EncryptedValue:
+        """Wrap ciphertext in a proxy that decrypts only when read"""
+        return EncryptedValue(encrypted_data, cache if cache is not None else DecryptionCache(self))
+    
+    def rotate(self, encrypted_data: str) -> str:
+        """Re-encrypt data under the current primary key version"""
+        if not encrypted_data:
+            return ""
+        return self.keyring.rotate(encrypted_data)
+    
     def hash_data(self, data: str) -> str:
-        """Create hash for searching"""
+        """Create an unkeyed hash (use BlindIndexService for searchable PII)"""
         return hashlib.sha256(data.encode()).hexdigest()
     
     def mask_id_number(self, id_number: str, is_super_admin: bool = False) -> str:
@@ -41,6 +286,7 @@ class EncryptionService:
         if not id_number:
             return ""
         
+        id_number = str(id_number)
         if is_super_admin or len(id_number) <= 4:
             return id_number
         
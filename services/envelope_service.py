@@ -0,0 +1,209 @@
+# services/envelope_service.py
+import hashlib
+import io
+import json
+import os
+import struct
+import threading
+import zlib
+from cryptography.fernet import InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from services.encryption_service import get_keyring
+
+MAGIC = b"AYE2"
+# Chunks not bound to their record and header, read only
+LEGACY_MAGIC = b"AYE1"
+SEGMENT_COUNT = 256
+CHUNK_SIZE = 64 * 1024
+
+# magic, segment id, chunk size
+_HEADER = struct.Struct(">4sHI")
+# ciphertext length (including the GCM tag)
+_CHUNK_LENGTH = struct.Struct(">I")
+# chunk index, final-chunk flag; follows the record binding in the AAD
+_CHUNK_AAD = struct.Struct(">IB")
+_NONCE_SIZE = 12
+
+class EnvelopeKeyError(RuntimeError):
+    """Raised when a segment key cannot be unwrapped with the master keyring"""
+
+class EnvelopeService:
+    """Chunked envelope encryption for record payloads at rest
+
+    Records are spread over a fixed number of segments. Each segment has
+    its own AES-256-GCM data key, stored wrapped (encrypted) by the master
+    keyring, so rotating the master key only re-wraps segment keys. Data
+    keys are unwrapped once per process and cached, so a bulk scan pays
+    only the AES-GCM cost per chunk.
+
+    Payloads are split into fixed-size chunks, each authenticated with its
+    index and a final-chunk flag so chunks cannot be reordered, dropped or
+    truncated without detection. Every chunk is also bound to a digest of
+    the envelope header and the record id, so a blob moved to another
+    record, or given another header, fails to decrypt.
+    """
+
+    def __init__(self, key_file="data/keys/segment_keys.json", chunk_size=CHUNK_SIZE):
+        self.key_file = key_file
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._wrapped = None
+        self._ciphers = {}
+
+    @staticmethod
+    def segment_for(record_id: str) -> int:
+        return zlib.crc32(str(record_id).encode()) % SEGMENT_COUNT
+
+    @staticmethod
+    def _binding(header: bytes, record_id: str) -> bytes:
+        """AAD prefix tying chunks to their header and record"""
+        return hashlib.sha256(header + b"\0" + str(record_id).encode()).digest()
+
+    # Segment keys
+
+    def _load_wrapped(self) -> dict:
+        if self._wrapped is None:
+            if not os.path.exists(self.key_file):
+                self._create_keys()
+            with open(self.key_file, 'r', encoding='utf-8') as f:
+                self._wrapped = json.load(f)
+        return self._wrapped
+
+    def _write_keys(self, wrapped, exclusive=False):
+        os.makedirs(os.path.dirname(self.key_file) or ".", exist_ok=True)
+        tmp_path = f"{self.key_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(wrapped, f, indent=2)
+        if not exclusive:
+            os.replace(tmp_path, self.key_file)
+            return
+        try:
+            # Hard-linking fails if the file exists, so concurrent processes
+            # can never replace keys that another one already used
+            os.link(tmp_path, self.key_file)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+
+    def _create_keys(self):
+        """Generate and wrap a data key for every segment up front"""
+        keyring = get_keyring()
+        self._write_keys({
+            str(segment): keyring.encrypt(AESGCM.generate_key(bit_length=256))
+            for segment in range(SEGMENT_COUNT)
+        }, exclusive=True)
+
+    def _cipher(self, segment: int) -> AESGCM:
+        cipher = self._ciphers.get(segment)
+        if cipher is not None:
+            return cipher
+
+        with self._lock:
+            if segment not in self._ciphers:
+                try:
+                    data_key = get_keyring().decrypt(self._load_wrapped()[str(segment)])
+                except InvalidToken as e:
+                    raise EnvelopeKeyError(
+                        f"Segment key {segment} in {self.key_file} cannot be unwrapped "
+                        "with the configured ENCRYPTION_KEY"
+                    ) from e
+                self._ciphers[segment] = AESGCM(data_key)
+            return self._ciphers[segment]
+
+    def rewrap_keys(self) -> int:
+        """Re-wrap every segment key under the primary master key, returns count"""
+        keyring = get_keyring()
+        with self._lock:
+            self._wrapped = None
+            wrapped = self._load_wrapped()
+            rewrapped = 0
+            for name, token in wrapped.items():
+                if keyring.needs_rotation(token):
+                    wrapped[name] = keyring.rotate(token)
+                    rewrapped += 1
+            if rewrapped:
+                self._write_keys(wrapped)
+        return rewrapped
+
+    # Payloads
+
+    def encrypt_stream(self, record_id: str, source, dest):
+        """Encrypt a readable binary stream into a writable one"""
+        segment = self.segment_for(record_id)
+        cipher = self._cipher(segment)
+        header = _HEADER.pack(MAGIC, segment, self.chunk_size)
+        binding = self._binding(header, record_id)
+        dest.write(header)
+
+        index = 0
+        chunk = source.read(self.chunk_size)
+        while True:
+            next_chunk = source.read(self.chunk_size)
+            final = not next_chunk
+            nonce = os.urandom(_NONCE_SIZE)
+            sealed = cipher.encrypt(nonce, chunk, binding + _CHUNK_AAD.pack(index, final))
+            dest.write(_CHUNK_LENGTH.pack(len(sealed)))
+            dest.write(nonce)
+            dest.write(sealed)
+            if final:
+                break
+            chunk = next_chunk
+            index += 1
+
+    def iter_decrypt(self, record_id: str, source):
+        """Yield plaintext chunks of record_id from an encrypted binary stream"""
+        header = source.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError("Truncated envelope header")
+        magic, segment, _ = _HEADER.unpack(header)
+        if magic == MAGIC:
+            binding = self._binding(header, record_id)
+        elif magic == LEGACY_MAGIC:
+            binding = b""
+        else:
+            raise ValueError("Not an encrypted record")
+        cipher = self._cipher(segment)
+
+        index = 0
+        length_bytes = source.read(_CHUNK_LENGTH.size)
+        while length_bytes:
+            (length,) = _CHUNK_LENGTH.unpack(length_bytes)
+            nonce = source.read(_NONCE_SIZE)
+            sealed = source.read(length)
+
+            # Peek ahead: the chunk is final when nothing follows it, and
+            # authentication fails if that disagrees with what was sealed
+            length_bytes = source.read(_CHUNK_LENGTH.size)
+            final = not length_bytes
+            yield cipher.decrypt(nonce, sealed, binding + _CHUNK_AAD.pack(index, final))
+            index += 1
+
+        if index == 0:
+            raise ValueError("Envelope has no chunks")
+
+    def encrypt(self, record_id: str, payload: bytes) -> bytes:
+        dest = io.BytesIO()
+        self.encrypt_stream(record_id, io.BytesIO(payload), dest)
+        return dest.getvalue()
+
+    def decrypt(self, record_id: str, blob: bytes) -> bytes:
+        return b"".join(self.iter_decrypt(record_id, io.BytesIO(blob)))
+
+    def write_file(self, record_id: str, filepath: str, payload: bytes):
+        """Encrypt a payload to a file atomically (temp file + rename)"""
+        tmp_path = f"{filepath}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                self.encrypt_stream(record_id, io.BytesIO(payload), f)
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def read_file(self, record_id: str, filepath: str) -> bytes:
+        with open(filepath, 'rb') as f:
+            return b"".join(self.iter_decrypt(record_id, f))
+
+# Shared instance so segment keys are unwrapped once per process
+envelope_service = EnvelopeService()
\ No newline at end of file
@@ -0,0 +1,226 @@
+# services/id_preprocessing.py
+import cv2
+import numpy as np
+
+# ID-1 cards are 85.6mm x 53.98mm; 85.6mm at 300 DPI is ~1011 pixels
+ID1_ASPECT = 85.6 / 53.98
+TARGET_CARD_WIDTH = 1011
+
+# Card detection runs on a copy no larger than this on its long side
+DETECT_MAX_SIDE = 800
+# A candidate outline must cover at least this share of the frame
+MIN_CARD_AREA = 0.08
+
+# Quality checks run on the card warped to this width, so thresholds do not
+# depend on the photo's resolution
+QUALITY_CARD_WIDTH = 506
+BLUR_MIN_VARIANCE = 100.0
+DARK_MAX_MEAN = 60
+GLARE_MAX_CLIPPED = 0.15
+# A frame this close to the ID-1 aspect may already be cropped to the card;
+# outlines smaller than CROPPED_MIN_AREA of it are then features on the card
+CROPPED_ASPECT_TOLERANCE = 0.15
+CROPPED_MIN_AREA = 0.5
+
+RETAKE_HINTS = {
+    "dark": "The photo is too dark. Move to better light and retake it.",
+    "glare": "There is glare on the card. Tilt it away from the light and retake it.",
+    "blurry": "The photo is blurry. Hold the phone steady, tap to focus and retake it.",
+    "no_card": "The card could not be found. Place the whole card on a plain surface and fill the frame."
+}
+
+# Field zones as (left, top, right, bottom) fractions of the deskewed card
+ID_FIELD_ZONES = {
+    "id_number": (0.30, 0.20, 1.00, 0.31),
+    "name": (0.30, 0.33, 1.00, 0.44),
+    "dob": (0.30, 0.46, 1.00, 0.57),
+    "gender": (0.30, 0.58, 1.00, 0.69)
+}
+
+def shrink(gray, factor):
+    """Downscale by about factor, rounded to a whole-number step
+
+    INTER_AREA is several times faster for integer steps, and the
+    remaining (under 2x) scaling is left to the caller's warp or resize.
+    """
+    step = int(1 / factor) if factor < 1 else 1
+    if step < 2:
+        return gray, 1.0
+    return cv2.resize(gray, None, fx=1 / step, fy=1 / step, interpolation=cv2.INTER_AREA), 1 / step
+
+def order_corners(points):
+    """Order four points as top-left, top-right, bottom-right, bottom-left"""
+    points = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    return np.array([
+        points[np.argmin(sums)],
+        points[np.argmin(diffs)],
+        points[np.argmax(sums)],
+        points[np.argmax(diffs)]
+    ], dtype=np.float32)
+
+class IDPreprocessor:
+    """Turns a phone photo of an ID into a small, deskewed card and field crops
+
+    The card outline is found on a downscaled copy of the frame, the frame
+    is resized so the card comes out at the target DPI, and a perspective
+    warp straightens it. Only the name/ID/DOB zones are then binarized and
+    sent to OCR, a small fraction of a 12MP photo's pixels.
+    """
+
+    def __init__(self, target_width=TARGET_CARD_WIDTH, zones=None):
+        self.target_width = target_width
+        self.target_height = int(round(target_width / ID1_ASPECT))
+        self.zones = zones or ID_FIELD_ZONES
+
+    @staticmethod
+    def to_gray(image):
+        image = np.asarray(image)
+        if image.ndim == 2:
+            return image
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY)
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+    def _detect(self, small):
+        """Card corners in small's coordinates and a 0-1 detection confidence
+
+        A frame that is itself the card gets its own corners and 0.6;
+        (None, 0.0) means no card was found.
+        """
+        frame_area = small.shape[0] * small.shape[1]
+        cropped = abs(small.shape[1] / small.shape[0] / ID1_ASPECT - 1) < CROPPED_ASPECT_TOLERANCE
+        min_area = (CROPPED_MIN_AREA if cropped else MIN_CARD_AREA) * frame_area
+
+        edges = cv2.Canny(cv2.GaussianBlur(small, (5, 5), 0), 50, 150)
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        candidates = sorted(contours, key=cv2.contourArea, reverse=True)[:5]
+        for contour in candidates:
+            if cv2.contourArea(contour) < min_area:
+                break
+            approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+            if len(approx) == 4 and cv2.isContourConvex(approx):
+                corners = order_corners(approx)
+                sides = sorted(cv2.minAreaRect(approx)[1])
+                aspect_ok = sides[0] and abs(sides[1] / sides[0] / ID1_ASPECT - 1) < 0.2
+                return corners, 1.0 if aspect_ok else 0.7
+
+        # Rounded or partly occluded corners: fall back to the rotated box
+        if candidates and cv2.contourArea(candidates[0]) >= min_area:
+            return order_corners(cv2.boxPoints(cv2.minAreaRect(candidates[0]))), 0.5
+        if cropped:
+            height, width = small.shape[:2]
+            return np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32), 0.6
+        return None, 0.0
+
+    def find_card(self, gray):
+        """Corners of the card in gray's coordinates (tl, tr, br, bl), or None"""
+        small, scale = shrink(gray, DETECT_MAX_SIDE / max(gray.shape[:2]))
+        corners, _ = self._detect(small)
+        return None if corners is None else corners / scale
+
+    def assess_quality(self, gray):
+        """Cheap pre-OCR checks on a grayscale photo, returns (report, corners)
+
+        Scores blur (Laplacian variance), brightness, glare (share of clipped
+        pixels) and card-detection confidence on a small copy of the photo,
+        in a few milliseconds. report["ok"] is False with a retake hint when
+        OCR would obviously fail; corners (full-resolution, or None) can be
+        passed to straighten() so detection is not repeated.
+        """
+        small, scale = shrink(gray, DETECT_MAX_SIDE / max(gray.shape[:2]))
+        corners, confidence = self._detect(small)
+
+        if corners is not None:
+            width = QUALITY_CARD_WIDTH
+            height = int(round(width / ID1_ASPECT))
+            target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+            region = cv2.warpPerspective(small, cv2.getPerspectiveTransform(corners, target), (width, height))
+        else:
+            region = cv2.resize(small, (QUALITY_CARD_WIDTH, int(QUALITY_CARD_WIDTH * small.shape[0] / small.shape[1])),
+                                interpolation=cv2.INTER_AREA)
+
+        report = {
+            "blur": float(cv2.Laplacian(region, cv2.CV_64F).var()),
+            "brightness": float(region.mean()),
+            "glare": float((region >= 250).mean()),
+            "card_confidence": confidence
+        }
+
+        # Most actionable problem first
+        issues = []
+        if report["brightness"] < DARK_MAX_MEAN:
+            issues.append("dark")
+        if report["glare"] > GLARE_MAX_CLIPPED:
+            issues.append("glare")
+        if report["blur"] < BLUR_MIN_VARIANCE:
+            issues.append("blurry")
+        if confidence == 0.0:
+            issues.append("no_card")
+
+        report["issues"] = issues
+        report["ok"] = not issues
+        report["hint"] = RETAKE_HINTS[issues[0]] if issues else None
+        return report, (None if corners is None else corners / scale)
+
+    def normalize(self, image):
+        """Deskewed grayscale card at the target size, and whether a card was found"""
+        gray = self.to_gray(image)
+        corners = self.find_card(gray)
+        return self.straighten(gray, corners), corners is not None
+
+    def straighten(self, gray, corners):
+        """Warp the card at corners to the target size (whole frame if None)"""
+        if corners is None:
+            # No outline: assume the photo is already cropped to the card
+            gray, _ = shrink(gray, self.target_width / gray.shape[1])
+            return cv2.resize(gray, (self.target_width, self.target_height), interpolation=cv2.INTER_AREA)
+
+        tl, tr, br, bl = corners
+        width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+        height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+        if height > width:
+            # Card photographed in portrait: rotate the corner order
+            corners = np.array([bl, tl, tr, br], dtype=np.float32)
+            width = height
+
+        # Downscale with area averaging first; the warp itself only
+        # interpolates, which would alias when shrinking a 12MP frame
+        gray, scale = shrink(gray, self.target_width / width)
+        corners = corners * scale
+
+        target = np.array([
+            [0, 0],
+            [self.target_width - 1, 0],
+            [self.target_width - 1, self.target_height - 1],
+            [0, self.target_height - 1]
+        ], dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(corners, target)
+        return cv2.warpPerspective(gray, matrix, (self.target_width, self.target_height),
+                                   flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+    def crop_zones(self, card, heavy=False):
+        """Binarized crop for each field zone of a normalized card
+
+        heavy=True denoises and thresholds adaptively, which copes better
+        with uneven light across a zone but costs more than global Otsu.
+        """
+        height, width = card.shape[:2]
+        crops = {}
+        for field, (left, top, right, bottom) in self.zones.items():
+            zone = card[int(top * height):int(bottom * height), int(left * width):int(right * width)]
+            if heavy:
+                crops[field] = cv2.adaptiveThreshold(cv2.GaussianBlur(zone, (3, 3), 0), 255,
+                                                     cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+            else:
+                crops[field] = cv2.threshold(zone, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+        return crops
+
+    def binarize(self, card):
+        return cv2.threshold(card, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+
+# Shared instance with the default ID layout
+id_preprocessor = IDPreprocessor()
\ No newline at end of file
@@ -0,0 +1,257 @@
+# services/key_rotation_service.py
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import argparse
+import json
+import os
+import threading
+import time
+from config.database import (
+    ENCRYPT_AT_REST, ENCRYPTED_RECORD_EXT, FAMILY_ENCRYPTED_FIELDS,
+    MEMBER_ENCRYPTED_FIELDS, SimpleDatabase, encrypt_member_record
+)
+from services.blind_index_service import blind_index_service
+from services.encryption_service import EncryptionService, get_keyring, init_worker_keyring
+from services.envelope_service import envelope_service
+
+def _rotate_fields(record, fields, keyring):
+    rotated = 0
+    for encrypted_field in fields.values():
+        token = record.get(encrypted_field)
+        if token and keyring.needs_rotation(token):
+            record[encrypted_field] = keyring.rotate(token)
+            rotated += 1
+    return rotated
+
+def _plaintext_count(record):
+    count = sum(1 for f in MEMBER_ENCRYPTED_FIELDS if record.get(f) not in (None, ""))
+    for fm in record.get('family_members') or []:
+        count += sum(1 for f in FAMILY_ENCRYPTED_FIELDS if fm.get(f) not in (None, ""))
+    return count
+
+def rotate_record(record, keyring):
+    """Re-encrypt one stored member record in place, returns fields changed
+
+    Plaintext PII left over from before field encryption is encrypted
+    under the primary key on the way through.
+    """
+    migrated = _plaintext_count(record)
+    if migrated:
+        encrypted = encrypt_member_record(record, EncryptionService(keyring))
+        record.clear()
+        record.update(encrypted)
+
+    rotated = _rotate_fields(record, MEMBER_ENCRYPTED_FIELDS, keyring)
+    for fm in record.get('family_members') or []:
+        rotated += _rotate_fields(fm, FAMILY_ENCRYPTED_FIELDS, keyring)
+    return migrated + rotated
+
+def _refresh_id_hash(record, keyring):
+    """Recompute the stored blind index token after a re-key, returns 1 if changed"""
+    token = record.get('id_number_encrypted')
+    if not token:
+        return 0
+    id_hash = blind_index_service.id_token(keyring.decrypt(token).decode())
+    if record.get('id_number_hash') == id_hash:
+        return 0
+    record['id_number_hash'] = id_hash
+    return 1
+
+def _rotate_batch(paths):
+    """Worker: rotate a batch of member files, returns (files, fields)
+
+    Plaintext .json member files are sealed into .enc envelopes on the way
+    through when encryption at rest is enabled.
+    """
+    keyring = get_keyring()
+    fields = 0
+    for path in paths:
+        record = SimpleDatabase.read_record(path)
+        rotated = rotate_record(record, keyring) + _refresh_id_hash(record, keyring)
+        seal = ENCRYPT_AT_REST and not path.endswith(ENCRYPTED_RECORD_EXT)
+        if seal:
+            SimpleDatabase.write_record(os.path.splitext(path)[0] + ENCRYPTED_RECORD_EXT, record)
+            os.remove(path)
+        elif rotated:
+            SimpleDatabase.write_record(path, record)
+        fields += rotated
+    return len(paths), fields
+
+class KeyRotationJob:
+    """Resumable, parallel re-encryption of member PII under the primary key
+
+    Segment data keys used for envelope encryption of member files are
+    re-wrapped first; the files themselves keep their data keys. Member
+    files are then streamed in sorted batches to a process pool; each
+    worker rewrites its files atomically. A checkpoint records the last
+    file of the longest fully-completed prefix, so an interrupted run
+    resumes without redoing finished batches.
+    """
+
+    def __init__(self, db, batch_size=500, workers=None,
+                 checkpoint_path="data/key_rotation_checkpoint.json"):
+        self.db = db
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_path = checkpoint_path
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {
+            "total_files": 0,
+            "processed_files": 0,
+            "rotated_fields": 0,
+            "rewrapped_keys": 0,
+            "reindexed_members": 0,
+            "started_at": None,
+            "finished_at": None,
+            "error": None
+        }
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        # A checkpoint from a rotation to a different primary key is stale
+        if checkpoint.get("primary_version") != get_keyring().primary_version:
+            return None
+        return checkpoint.get("last_completed")
+
+    def _save_checkpoint(self, last_completed):
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "primary_version": get_keyring().primary_version,
+                "last_completed": last_completed
+            }, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _batches(self, paths):
+        for i in range(0, len(paths), self.batch_size):
+            yield paths[i:i + self.batch_size]
+
+    def progress(self) -> dict:
+        """Snapshot of progress and throughput"""
+        with self._lock:
+            stats = dict(self._stats)
+        end = stats["finished_at"] or time.time()
+        elapsed = end - stats["started_at"] if stats["started_at"] else 0.0
+        stats["elapsed_seconds"] = elapsed
+        stats["files_per_second"] = stats["processed_files"] / elapsed if elapsed else 0.0
+        stats["fields_per_second"] = stats["rotated_fields"] / elapsed if elapsed else 0.0
+        stats["percent_complete"] = (
+            100.0 * stats["processed_files"] / stats["total_files"] if stats["total_files"] else 100.0
+        )
+        stats["done"] = stats["finished_at"] is not None
+        return stats
+
+    def run(self, progress_callback=None) -> dict:
+        """Rotate every member file, blocking until done"""
+        keyring = get_keyring()
+        paths = self.db.member_files()
+        last_completed = self._load_checkpoint()
+        if last_completed:
+            paths = [p for p in paths if os.path.basename(p) > last_completed]
+
+        with self._lock:
+            self._stats.update(total_files=len(paths), processed_files=0, rotated_fields=0,
+                               rewrapped_keys=0, reindexed_members=0, started_at=time.time(),
+                               finished_at=None, error=None)
+
+        rewrapped = envelope_service.rewrap_keys()
+        with self._lock:
+            self._stats["rewrapped_keys"] = rewrapped
+
+        # Move a blind index keyed from the old primary to the new one while
+        # both keys are present; workers then refresh the stored ID hashes
+        if blind_index_service.needs_rekey():
+            reindexed = blind_index_service.rekey(self.db.get_all_members(lazy=False))
+            with self._lock:
+                self._stats["reindexed_members"] = reindexed
+
+        batches = self._batches(paths)
+        pending = {}
+        completed = {}
+        next_to_checkpoint = 0
+        submitted = 0
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker_keyring,
+                                     initargs=(keyring.to_spec(),)) as pool:
+                while True:
+                    # Keep a bounded number of batches in flight
+                    while len(pending) < self.workers * 2:
+                        batch = next(batches, None)
+                        if batch is None:
+                            break
+                        pending[pool.submit(_rotate_batch, batch)] = (submitted, batch[-1])
+                        submitted += 1
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        seq, last_path = pending.pop(future)
+                        files, fields = future.result()
+                        completed[seq] = last_path
+                        with self._lock:
+                            self._stats["processed_files"] += files
+                            self._stats["rotated_fields"] += fields
+
+                    # Advance the checkpoint over the contiguous completed prefix
+                    checkpoint = None
+                    while next_to_checkpoint in completed:
+                        checkpoint = completed.pop(next_to_checkpoint)
+                        next_to_checkpoint += 1
+                    if checkpoint:
+                        self._save_checkpoint(os.path.basename(checkpoint))
+
+                    if progress_callback:
+                        progress_callback(self.progress())
+        except Exception as e:
+            with self._lock:
+                self._stats["error"] = str(e)
+            raise
+        finally:
+            with self._lock:
+                self._stats["finished_at"] = time.time()
+
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return self.progress()
+
+    def start(self):
+        """Run the job on a background thread; poll progress() for status"""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+
+        def target():
+            try:
+                self.run()
+            except Exception:
+                pass  # Recorded in progress()["error"]
+
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+        return self._thread
+
+if __name__ == "__main__":
+    from config.database import db
+
+    parser = argparse.ArgumentParser(description="Re-encrypt member PII under the primary key")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    job = KeyRotationJob(db, batch_size=args.batch_size, workers=args.workers)
+
+    def report(stats):
+        print(f"\r{stats['processed_files']:,}/{stats['total_files']:,} files "
+              f"({stats['percent_complete']:.1f}%), {stats['rotated_fields']:,} fields, "
+              f"{stats['fields_per_second']:,.0f} fields/s", end="", flush=True)
+
+    final = job.run(progress_callback=report)
+    print(f"\nDone in {final['elapsed_seconds']:.1f}s, "
+          f"{final['rewrapped_keys']:,} segment keys re-wrapped")
+    if final['reindexed_members']:
+        print(f"Blind index re-keyed ({final['reindexed_members']:,} members); "
+              "restart the app to pick it up")
\ No newline at end of file
@@ -0,0 +1,126 @@
+# services/member_data_service.py
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config.database import db
+from services.encryption_service import DecryptionCache
+
+# Text columns the dashboards read, filled with '' when missing
+MEMBER_TEXT_COLUMNS = ['public_id', 'name', 'id_number', 'phone_number', 'cover_type', 'status']
+# Low-cardinality text columns stored as categoricals, so comparisons and
+# counts work on integer codes
+MEMBER_CATEGORY_COLUMNS = ['cover_type', 'status']
+# Numeric columns, filled with 0 when missing
+MEMBER_NUMERIC_COLUMNS = ['balance_days', 'total_paid']
+
+def prepare_members_frame(members) -> pd.DataFrame:
+    """Typed member DataFrame from member records
+
+    registration_date is datetime64 (the record's registration_date,
+    falling back to saved_at, as registration_day in the registration
+    rollups does), agent_id is nullable Int64 and the
+    numeric columns are numbers. Encrypted PII stays as lazy proxies, so
+    building the frame decrypts nothing.
+    """
+    df = pd.DataFrame(list(members))
+    for name in MEMBER_TEXT_COLUMNS:
+        df[name] = df[name].fillna('') if name in df.columns else ''
+    for name in MEMBER_NUMERIC_COLUMNS:
+        df[name] = pd.to_numeric(df[name], errors='coerce').fillna(0) if name in df.columns else 0
+
+    registered = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    for name in ('registration_date', 'saved_at'):
+        if name in df.columns:
+            registered = registered.fillna(pd.to_datetime(df[name], errors='coerce', format='mixed'))
+    df['registration_date'] = registered
+
+    agent_ids = df['agent_id'] if 'agent_id' in df.columns else pd.Series(index=df.index, dtype=float)
+    df['agent_id'] = pd.to_numeric(agent_ids, errors='coerce').astype('Int64')
+    df['balance_days'] = df['balance_days'].astype(int)
+    for name in MEMBER_CATEGORY_COLUMNS:
+        # '' is always a category so fillna('') stays valid on filtered views
+        categories = sorted(set(df[name].astype(str).unique()) | {''})
+        df[name] = pd.Categorical(df[name].astype(str), categories=categories)
+    return df
+
+def member_metrics(frame: pd.DataFrame, now=None) -> dict:
+    """Dashboard headline metrics in one vectorized pass over a members frame
+
+    Reads four prepared columns as arrays: total_paid is summed;
+    registrations since midnight, negative balances and active members
+    (compared on category codes) are counted from boolean arrays. Members without a registration time
+    do not count as registered today.
+    """
+    now = now or datetime.now()
+    today_start = np.datetime64(now.replace(hour=0, minute=0, second=0, microsecond=0), 'ns')
+    registered = frame['registration_date'].to_numpy(dtype='datetime64[ns]')
+    return {
+        "total_members": len(frame),
+        "total_premium": float(frame['total_paid'].to_numpy().sum()),
+        "today_registrations": int(np.count_nonzero(registered >= today_start)),
+        "pending_count": int(np.count_nonzero(frame['balance_days'].to_numpy() < 0)),
+        "active_members": int(np.count_nonzero((frame['status'] == "Active").to_numpy()))
+    }
+
+class MemberFrameCache:
+    """Prepared members DataFrame shared by every session in the process
+
+    Rebuilt when save_member bumps the database's version, or after
+    ttl_seconds for changes made by other processes (batch jobs, CLIs).
+    Callers must treat the frame as read-only; filtering with boolean
+    masks returns new frames and leaves the cached one untouched.
+
+    The frame keeps PII as ciphertext. Its lazy proxies share one
+    decryption cache per build, so sessions reading the same frame
+    decrypt each value once. Decrypted values live no longer than the
+    frame: a rebuild starts a new cache and invalidate() empties it.
+    """
+
+    def __init__(self, db, ttl_seconds=300):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._frame = None
+        self._decrypted = None
+        self._version = None
+        self._loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _current(self):
+        """Cached frame, rebuilt if stale; call with the lock held"""
+        version = self.db.version
+        fresh = time.monotonic() - self._loaded_at <= self.ttl_seconds
+        if self._frame is not None and self._version == version and fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._decrypted = DecryptionCache(self.db.encryption)
+            self._frame = prepare_members_frame(self.db.get_all_members(cache=self._decrypted))
+            self._version = version
+            self._loaded_at = time.monotonic()
+        return self._frame
+
+    def frame(self) -> pd.DataFrame:
+        with self._lock:
+            return self._current()
+
+    def invalidate(self):
+        with self._lock:
+            self._frame = None
+            if self._decrypted is not None:
+                self._decrypted.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rows": 0 if self._frame is None else len(self._frame),
+                "age_seconds": time.monotonic() - self._loaded_at if self._frame is not None else None,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+# Shared across sessions in this process
+member_frame_cache = MemberFrameCache(db)
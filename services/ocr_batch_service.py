@@ -0,0 +1,152 @@
+# services/ocr_batch_service.py
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import argparse
+import csv
+import json
+import os
+import time
+from services.ocr_job_service import _init_worker, _run_job
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+RESULT_FIELDS = ["file", "name", "id_number", "dob", "gender", "extraction_confidence", "retake_hint", "error"]
+
+def _run_file(path, timeout):
+    """Worker: OCR one image file, returns a result row"""
+    row = {"file": path}
+    try:
+        with open(path, 'rb') as f:
+            details, _ = _run_job(f.read(), timeout)
+        row.update(details)
+        if row.get("dob") is not None:
+            row["dob"] = row["dob"].strftime('%Y-%m-%d')
+    except Exception as e:
+        row["error"] = str(e) or type(e).__name__
+    return row
+
+class OCRBatchJob:
+    """Extract ID details from a folder of photos across all cores
+
+    Results are streamed to CSV or JSONL (by the output extension) as they
+    finish, one row per image. Rerunning with the same output skips
+    images already read successfully, so an interrupted run resumes where
+    it stopped and images that failed are tried again.
+    """
+
+    def __init__(self, input_dir, output_path, workers=None, timeout=60):
+        self.input_dir = input_dir
+        self.output_path = output_path
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.format = "csv" if output_path.lower().endswith(".csv") else "jsonl"
+
+    def image_paths(self):
+        """Image files under input_dir, relative to it, in a stable order"""
+        paths = []
+        for root, _, files in os.walk(self.input_dir):
+            for filename in files:
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.relpath(os.path.join(root, filename), self.input_dir))
+        return sorted(paths)
+
+    def _truncate_partial_line(self):
+        """Drop a row cut off by an interruption mid-write"""
+        with open(self.output_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def completed_files(self):
+        """Images whose latest row in the output file has no error
+
+        Images that failed are retried on the next run, which appends a
+        new row for them; the last row for a file is the current one.
+        """
+        if not os.path.exists(self.output_path):
+            return set()
+        self._truncate_partial_line()
+        with open(self.output_path, 'r', encoding='utf-8', newline='') as f:
+            if self.format == "csv":
+                rows = csv.DictReader(f)
+            else:
+                rows = (json.loads(line) for line in f if line.strip())
+            latest_error = {row["file"]: row.get("error") for row in rows}
+        return {path for path, error in latest_error.items() if not error}
+
+    def run(self, progress_callback=None) -> dict:
+        """Process every image not yet in the output, blocking until done"""
+        done_files = self.completed_files()
+        pending_files = [p for p in self.image_paths() if p not in done_files]
+        stats = {
+            "total": len(pending_files),
+            "skipped": len(done_files),
+            "processed": 0,
+            "errors": 0,
+            "started_at": time.time()
+        }
+
+        new_file = not os.path.exists(self.output_path) or os.path.getsize(self.output_path) == 0
+        with open(self.output_path, 'a', encoding='utf-8', newline='') as out:
+            writer = None
+            if self.format == "csv":
+                writer = csv.DictWriter(out, fieldnames=RESULT_FIELDS, extrasaction='ignore')
+                if new_file:
+                    writer.writeheader()
+
+            paths = iter(pending_files)
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+                in_flight = set()
+                while True:
+                    # Keep a bounded number of images in flight
+                    while len(in_flight) < self.workers * 4:
+                        path = next(paths, None)
+                        if path is None:
+                            break
+                        in_flight.add(pool.submit(_run_file, os.path.join(self.input_dir, path), self.timeout))
+                    if not in_flight:
+                        break
+
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        row = future.result()
+                        row["file"] = os.path.relpath(row["file"], self.input_dir)
+                        if writer:
+                            # One record per line, so resume can trust line ends
+                            writer.writerow({k: " ".join(v.split()) if isinstance(v, str) else v
+                                             for k, v in row.items()})
+                        else:
+                            out.write(json.dumps({k: row.get(k) for k in RESULT_FIELDS}) + "\n")
+                        stats["processed"] += 1
+                        stats["errors"] += 1 if row.get("error") else 0
+                    out.flush()
+
+                    if progress_callback:
+                        progress_callback(self._progress(stats))
+
+        return self._progress(stats)
+
+    def _progress(self, stats):
+        progress = dict(stats)
+        elapsed = time.time() - stats["started_at"]
+        rate = stats["processed"] / elapsed if elapsed else 0.0
+        progress["elapsed_seconds"] = elapsed
+        progress["images_per_second"] = rate
+        progress["eta_seconds"] = (stats["total"] - stats["processed"]) / rate if rate else None
+        return progress
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract ID details from a folder of ID photos")
+    parser.add_argument("input_dir")
+    parser.add_argument("output", help="results file, .csv or .jsonl")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=int, default=60, help="seconds per image")
+    args = parser.parse_args()
+
+    job = OCRBatchJob(args.input_dir, args.output, workers=args.workers, timeout=args.timeout)
+
+    def report(stats):
+        eta = f"{stats['eta_seconds']:.0f}s" if stats['eta_seconds'] is not None else "-"
+        print(f"\r{stats['processed']:,}/{stats['total']:,} images, {stats['errors']:,} errors, "
+              f"{stats['images_per_second']:.1f}/s, ETA {eta}", end="", flush=True)
+
+    final = job.run(progress_callback=report)
+    print(f"\nDone in {final['elapsed_seconds']:.1f}s ({final['skipped']:,} already in {args.output})")
\ No newline at end of file
@@ -0,0 +1,221 @@
+# services/ocr_job_service.py
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from services.ocr_service import OCRService, image_bytes, is_timeout, ocr_result_cache
+
+# Per-process OCR service, created once by the pool initializer
+_worker_ocr = None
+
+def _init_worker():
+    global _worker_ocr
+    _worker_ocr = OCRService()
+    # Load the Tesseract engine up front rather than on the first job
+    _worker_ocr.engine
+
+def _run_job(data, timeout):
+    """Worker: OCR one image and parse it, returns (details, seconds)"""
+    started = time.perf_counter()
+    details = _worker_ocr.extract_from_image(_worker_ocr._load_image(data), timeout)
+    return details, time.perf_counter() - started
+
+class OCRQueueFullError(RuntimeError):
+    """Raised when too many OCR jobs are already waiting"""
+
+class OCRJobService:
+    """Runs ID OCR on a bounded process pool behind a job API
+
+    submit() returns a job ID straight away; status() polls and result()
+    waits. OCR runs in worker processes so a slow photo never blocks the
+    Streamlit script thread and throughput scales with cores. Each job has
+    a timeout: Tesseract is killed when it runs past it, a job still
+    waiting in the queue past its deadline is cancelled, and one still
+    running past it is reported as timed out whatever the worker returns.
+    """
+
+    def __init__(self, max_workers=None, max_pending=32, default_timeout=30, keep_finished=256):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.default_timeout = default_timeout
+        self.keep_finished = keep_finished
+        # Re-entrant: a future that is already done runs its callback inline
+        self._lock = threading.RLock()
+        self._pool = None
+        self._jobs = OrderedDict()
+        self._counts = {"completed": 0, "failed": 0, "timed_out": 0}
+        self._total_seconds = 0.0
+
+    def _executor(self):
+        if self._pool is None:
+            # Spawned workers do not inherit the server's threads or sockets
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._pool
+
+    def _pending(self):
+        return sum(1 for job in self._jobs.values() if not job["future"].done())
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["future"].done()]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def submit(self, image_file, timeout=None) -> str:
+        """Queue an ID photo for OCR, returns the job ID"""
+        timeout = timeout or self.default_timeout
+        data = image_bytes(image_file)
+        cache_key = ocr_result_cache.key(data)
+        cached = ocr_result_cache.get(cache_key)
+
+        with self._lock:
+            job_id = uuid.uuid4().hex
+            if cached is not None:
+                # Same photo seen before: complete the job without OCR
+                future = Future()
+                future.set_result((cached, 0.0))
+            else:
+                if self._pending() >= self.max_pending:
+                    raise OCRQueueFullError("OCR queue is full, please try again shortly")
+                try:
+                    future = self._executor().submit(_run_job, data, timeout)
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory); start a fresh pool
+                    self._pool = None
+                    future = self._executor().submit(_run_job, data, timeout)
+            self._jobs[job_id] = {
+                "future": future,
+                "submitted_at": time.time(),
+                "timeout": timeout,
+                "cache_key": cache_key,
+                "cached": cached is not None,
+                "status": None
+            }
+            future.add_done_callback(lambda f, job_id=job_id: self._finish(job_id, f))
+            self._prune()
+        return job_id
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"]:
+                return
+            if future.cancelled():
+                job["status"] = "timeout"
+                self._counts["timed_out"] += 1
+            elif future.exception() is not None:
+                timed_out = is_timeout(future.exception())
+                job["status"] = "timeout" if timed_out else "failed"
+                self._counts["timed_out" if timed_out else "failed"] += 1
+            elif job["cached"]:
+                job["status"] = "done"
+            else:
+                details, seconds = future.result()
+                job["status"] = "done"
+                self._counts["completed"] += 1
+                self._total_seconds += seconds
+                ocr_result_cache.put(job["cache_key"], details)
+
+    def _expire(self, job):
+        """Time out a job past its deadline: cancel it if still queued,
+        otherwise give up on the running worker's result"""
+        if time.time() - job["submitted_at"] <= job["timeout"]:
+            return
+        with self._lock:
+            if job["status"] or job["future"].cancel():
+                return
+            job["status"] = "timeout"
+            self._counts["timed_out"] += 1
+
+    def status(self, job_id) -> dict:
+        """Current state of a job: queued, running, done, failed or timeout"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return {"job_id": job_id, "status": "unknown"}
+
+        future = job["future"]
+        if not future.done():
+            self._expire(job)
+        elif not job["status"]:
+            # The done callback may not have run yet
+            self._finish(job_id, future)
+
+        info = {"job_id": job_id, "elapsed_seconds": time.time() - job["submitted_at"]}
+        if job["status"]:
+            info["status"] = job["status"]
+            if job["status"] == "done":
+                info["result"] = future.result()[0]
+            elif job["status"] == "failed":
+                info["error"] = str(future.exception())
+        else:
+            info["status"] = "running" if future.running() else "queued"
+        return info
+
+    def result(self, job_id, wait=None):
+        """Wait for a job's extracted details
+
+        Raises TimeoutError if the job timed out (or wait elapsed first),
+        KeyError for an unknown job and the worker's exception if OCR failed.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+
+        deadline = job["submitted_at"] + job["timeout"]
+        if wait is not None:
+            deadline = min(deadline, time.time() + wait)
+
+        future = job["future"]
+        try:
+            details, _ = future.result(timeout=max(0.0, deadline - time.time()))
+        except CancelledError:
+            raise TimeoutError(f"OCR job {job_id} timed out in the queue")
+        except TimeoutError:
+            self._expire(job)
+            raise TimeoutError(f"OCR job {job_id} did not finish in time")
+        except RuntimeError as e:
+            if is_timeout(e):
+                raise TimeoutError(f"OCR job {job_id} timed out") from e
+            raise
+        if job["status"] == "timeout":
+            raise TimeoutError(f"OCR job {job_id} timed out")
+        return details
+
+    def metrics(self) -> dict:
+        """Queue depth and throughput counters"""
+        with self._lock:
+            futures = [job["future"] for job in self._jobs.values()]
+            counts = dict(self._counts)
+            total_seconds = self._total_seconds
+
+        running = sum(1 for f in futures if f.running())
+        pending = sum(1 for f in futures if not f.done())
+        cache = ocr_result_cache.stats()
+        return {
+            "workers": self.max_workers,
+            "queued": pending - running,
+            "running": running,
+            "completed": counts["completed"],
+            "failed": counts["failed"],
+            "timed_out": counts["timed_out"],
+            "cache_hits": cache["hits"],
+            "cache_misses": cache["misses"],
+            "avg_ocr_seconds": total_seconds / counts["completed"] if counts["completed"] else 0.0
+        }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        # Outside the lock: done callbacks on the pool's thread need it
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+# Shared instance: one pool per server process, created on first submit
+ocr_job_service = OCRJobService()
\ No newline at end of file
@@ -1,11 +1,199 @@
 # services/ocr_service.py - WORKING VERSION
 from PIL import Image
+from collections import OrderedDict
+import hashlib
 import io
-import re
-from datetime import datetime
+import logging
+import os
+import time
+import threading
 import pytesseract
 import cv2
 import numpy as np
+from services.id_preprocessing import id_preprocessor
+from utils.id_parser import ID_NUMBER_PATTERN, id_text_parser
+from utils.validators import Validators
+
+# In-process Tesseract bindings (requirements.txt; built against the
+# libtesseract-dev and libleptonica-dev packages in packages.txt)
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Characters that appear on Kenyan IDs and licences
+ID_CHAR_WHITELIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789/-.:,"
+# Assume a single uniform block of text
+ID_PAGE_SEG_MODE = 6
+
+TIMEOUT_MESSAGE = 'Tesseract process timeout'
+
+# Tesseract word confidence (0-100) a field needs before OCR stops escalating
+FIELD_CONFIDENCE_THRESHOLD = 75
+
+def is_timeout(error):
+    """Whether an exception is Tesseract being stopped at its timeout"""
+    return isinstance(error, RuntimeError) and str(error) == TIMEOUT_MESSAGE
+
+def time_left(deadline):
+    """Timeout for the next engine call before a time.monotonic() deadline
+
+    None means no deadline (0, Tesseract's "no limit"); a deadline that has
+    already passed raises the same error as a Tesseract timeout.
+    """
+    if deadline is None:
+        return 0
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise RuntimeError(TIMEOUT_MESSAGE)
+    return remaining
+
+def image_bytes(image_file):
+    """Raw bytes of an upload, file-like object, path or bytes
+    
+    Uploads are read from the start whatever their current position, so
+    reruns that read the same UploadedFile again see the whole image.
+    """
+    if isinstance(image_file, (bytes, bytearray)):
+        return bytes(image_file)
+    if hasattr(image_file, 'getvalue'):
+        return image_file.getvalue()
+    if hasattr(image_file, 'read'):
+        if hasattr(image_file, 'seek'):
+            image_file.seek(0)
+        return image_file.read()
+    with open(image_file, 'rb') as f:
+        return f.read()
+
+class OCRResultCache:
+    """Parsed OCR details keyed by the SHA-256 of the image bytes (LRU + TTL)
+    
+    Shared by every session in the process, so extracting the same photo
+    again after a Streamlit rerun is a dictionary lookup.
+    """
+    
+    def __init__(self, max_entries=256, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+    
+    def put(self, key, details):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(details))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+# Shared across sessions in this process
+ocr_result_cache = OCRResultCache()
+
+class TesseractEngine:
+    """Long-lived Tesseract engine, loaded once with the ID whitelist and PSM
+
+    With tesserocr installed the language model stays loaded in this
+    process and each image is a library call. Otherwise it falls back to
+    pytesseract, which starts a tesseract process per image, using the
+    same whitelist and page segmentation.
+    """
+    
+    def __init__(self, lang='eng', psm=ID_PAGE_SEG_MODE, whitelist=ID_CHAR_WHITELIST):
+        self.whitelist = whitelist
+        self.lang = lang
+        self.psm = psm
+        self._api = None
+        self._lock = threading.Lock()
+        if TESSEROCR_AVAILABLE:
+            try:
+                self._api = tesserocr.PyTessBaseAPI(lang=lang, psm=psm)
+                self._api.SetVariable("tessedit_char_whitelist", whitelist)
+            except RuntimeError as e:
+                # e.g. tessdata not found; pytesseract may still work
+                logger.warning("tesserocr unavailable, using pytesseract: %s", e)
+                self._api = None
+    
+    @property
+    def persistent(self):
+        return self._api is not None
+    
+    def _config(self, psm, whitelist):
+        return f"--psm {psm or self.psm} -c tessedit_char_whitelist={whitelist or self.whitelist}"
+    
+    def _recognize(self, image, timeout, psm, whitelist):
+        """Run the persistent engine on an image; caller holds the lock"""
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        self._api.SetPageSegMode(psm or self.psm)
+        self._api.SetVariable("tessedit_char_whitelist", whitelist or self.whitelist)
+        self._api.SetImage(image)
+        # At least 1 ms: a timeout of 0 would mean no limit
+        if not self._api.Recognize(timeout=max(1, int(timeout * 1000)) if timeout else 0):
+            raise RuntimeError(TIMEOUT_MESSAGE)
+    
+    def image_to_string(self, image, timeout=0, psm=None, whitelist=None):
+        """OCR a PIL image or numpy array; raises RuntimeError on timeout
+        
+        psm and whitelist override the defaults for this call, e.g. psm 7
+        for a single line of text or a digits-only whitelist.
+        """
+        if self._api is None:
+            return pytesseract.image_to_string(image, lang=self.lang, config=self._config(psm, whitelist),
+                                               timeout=timeout)
+        
+        # One engine per process; Streamlit threads take turns
+        with self._lock:
+            self._recognize(image, timeout, psm, whitelist)
+            return self._api.GetUTF8Text()
+    
+    def read(self, image, timeout=0, psm=None, whitelist=None):
+        """OCR an image into (text, [(word, confidence 0-100), ...])"""
+        if self._api is None:
+            data = pytesseract.image_to_data(image, lang=self.lang, config=self._config(psm, whitelist),
+                                             timeout=timeout, output_type=pytesseract.Output.DICT)
+            lines = {}
+            words = []
+            for i, word in enumerate(data["text"]):
+                word = word.strip()
+                if not word or float(data["conf"][i]) < 0:
+                    continue
+                words.append((word, float(data["conf"][i])))
+                line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+                lines.setdefault(line, []).append(word)
+            return "\n".join(" ".join(line) for line in lines.values()), words
+        
+        with self._lock:
+            self._recognize(image, timeout, psm, whitelist)
+            words = [(word.strip(), float(conf)) for word, conf in self._api.MapWordConfidences() if word.strip()]
+            return self._api.GetUTF8Text(), words
 
 class OCRService:
     """Service for extracting data from ID photos"""
@@ -25,37 +213,33 @@ class OCRService:
                     break
         except:
             pass
+        self._engine = None
+    
+    @property
+    def engine(self):
+        # Created on first use so importing pages does not load Tesseract
+        if self._engine is None:
+            self._engine = TesseractEngine()
+        return self._engine
     
-    def extract_id_details(self, image_file):
+    def extract_id_details(self, image_file, timeout=0):
         """Extract details from ID/DL photo"""
         
         try:
-            # Read image
-            if hasattr(image_file, 'read'):
-                image = Image.open(io.BytesIO(image_file.read()))
-            else:
-                image = Image.open(image_file)
-            
-            # Convert to OpenCV format if available
-            try:
-                open_cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-                gray = cv2.cvtColor(open_cv_image, cv2.COLOR_BGR2GRAY)
-                gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
-                
-                # Extract text with OCR
-                text = pytesseract.image_to_string(gray)
-            except:
-                # Fallback: use PIL directly
-                text = pytesseract.image_to_string(image)
+            data = image_bytes(image_file)
+            cache_key = ocr_result_cache.key(data)
+            details = ocr_result_cache.get(cache_key)
+            if details is not None:
+                return details
             
-            # Parse extracted text
-            details = self._parse_id_text(text)
+            details = self.extract_from_image(self._load_image(data), timeout)
+            ocr_result_cache.put(cache_key, details)
             
             return details
             
         except Exception as e:
             # Return empty details if OCR fails
-            print(f"OCR Error: {e}")
+            logger.exception("OCR failed: %s", e)
             return {
                 "name": "",
                 "id_number": "",
@@ -64,85 +248,103 @@ class OCRService:
                 "extraction_confidence": 0.0
             }
     
-    def _parse_id_text(self, text):
-        """Parse OCR text to extract ID details"""
-        details = {
-            "name": "",
-            "id_number": "",
-            "dob": None,
-            "gender": "",
-            "extraction_confidence": 0.5
-        }
+    def _load_image(self, image_file):
+        """Open an upload, file path or raw bytes as a PIL image"""
+        return Image.open(io.BytesIO(image_bytes(image_file)))
+    
+    def extract_from_image(self, image, timeout=0):
+        """Quality-check, OCR and parse a PIL image
         
-        if not text:
-            return details
+        Photos that fail the quality gate are not sent to Tesseract; their
+        details come back empty with a retake_hint for the agent.
+        """
+        gray = id_preprocessor.to_gray(np.array(image.convert('RGB')))
+        quality, corners = id_preprocessor.assess_quality(gray)
+        if not quality["ok"]:
+            return {
+                "name": "",
+                "id_number": "",
+                "dob": None,
+                "gender": "",
+                "extraction_confidence": 0.0,
+                "quality": quality,
+                "retake_hint": quality["hint"]
+            }
         
-        # Patterns for Kenyan ID
-        id_pattern = r'\b\d{8,10}\b'
-        name_pattern = r'Name[:\s]+([A-Z][A-Z\s]+[A-Z])'
-        dob_pattern = r'(?:DOB|Date of Birth)[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{4})'
-        gender_pattern = r'(Male|Female|M|F)'
+        details = self._extract_tiered(id_preprocessor.straighten(gray, corners), timeout)
+        details["quality"] = quality
+        return details
+    
+    def _read_zones(self, card, fields, heavy, deadline):
+        """(text, confidence) for the given field zones of a straightened card"""
+        crops = id_preprocessor.crop_zones(card, heavy=heavy)
+        readings = {}
+        for field in fields:
+            # The cheap pass reads the ID number digits-only
+            whitelist = "0123456789" if field == "id_number" and not heavy else None
+            text, words = self.engine.read(crops[field], time_left(deadline), psm=7, whitelist=whitelist)
+            
+            if field == "id_number":
+                # Confidence of the number itself, not the label next to it
+                numbers = [(w, c) for w, c in words if ID_NUMBER_PATTERN.fullmatch(w)]
+                readings[field] = numbers[0] if numbers else ("", 0.0)
+            elif words:
+                readings[field] = (text.strip(), sum(c for _, c in words) / len(words))
+            else:
+                readings[field] = ("", 0.0)
+        return readings
+    
+    def _extract_tiered(self, card, timeout=0):
+        """Cheapest OCR first, escalating only fields below the confidence threshold
         
-        # Extract ID number
-        id_matches = re.findall(id_pattern, text)
-        if id_matches:
-            details["id_number"] = id_matches[0]
-            details["extraction_confidence"] = 0.7
+        Tier 1 reads the field zones of a half-resolution card, the ID
+        number digits-only. Tier 2 re-reads weak zones at full resolution
+        with adaptive thresholding. Tier 3 reads the whole card as a block
+        if the name or ID number is still weak. timeout bounds all the
+        engine calls together, each getting only the time still left.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        fields = list(id_preprocessor.zones)
+        small = cv2.resize(card, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+        readings = self._read_zones(small, fields, False, deadline)
+        tier = 1
         
-        # Extract name
-        name_match = re.search(name_pattern, text, re.IGNORECASE)
-        if name_match:
-            details["name"] = name_match.group(1).strip()
-        else:
-            # Try alternative patterns
-            name_patterns = [
-                r'Name\s*[:]?\s*([A-Z][a-z]+\s+[A-Z][a-z]+)',
-                r'([A-Z][A-Z\s]{3,}[A-Z])'  # All caps names
-            ]
-            
-            for pattern in name_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    details["name"] = match.group(1).strip()
-                    break
+        weak = [f for f in fields if readings[f][1] < FIELD_CONFIDENCE_THRESHOLD]
+        if weak:
+            tier = 2
+            for field, reading in self._read_zones(card, weak, True, deadline).items():
+                if reading[1] > readings[field][1]:
+                    readings[field] = reading
         
-        # Extract date of birth
-        dob_match = re.search(dob_pattern, text, re.IGNORECASE)
-        if dob_match:
-            dob_str = dob_match.group(1)
-            try:
-                details["dob"] = datetime.strptime(dob_str, "%d/%m/%Y")
-            except:
-                try:
-                    details["dob"] = datetime.strptime(dob_str, "%d-%m-%Y")
-                except:
-                    pass
+        details = self._parse_id_text("\n".join(text for text, _ in readings.values()))
+        confidence = {
+            field: readings[field][1] if details.get(field) else 0.0
+            for field in ("name", "id_number", "dob", "gender")
+        }
         
-        # Extract gender
-        gender_match = re.search(gender_pattern, text, re.IGNORECASE)
-        if gender_match:
-            gender = gender_match.group(1).upper()
-            if gender in ['MALE', 'M']:
-                details["gender"] = 'Male'
-            elif gender in ['FEMALE', 'F']:
-                details["gender"] = 'Female'
+        if min(confidence["name"], confidence["id_number"]) < FIELD_CONFIDENCE_THRESHOLD:
+            tier = 3
+            text, words = self.engine.read(id_preprocessor.binarize(card), time_left(deadline))
+            full = self._parse_id_text(text)
+            full_confidence = sum(c for _, c in words) / len(words) if words else 0.0
+            for field in confidence:
+                if full.get(field) and full_confidence > confidence[field]:
+                    details[field] = full[field]
+                    confidence[field] = full_confidence
         
+        main_fields = [confidence[f] for f in ("name", "id_number", "dob")]
+        details["extraction_confidence"] = round(sum(main_fields) / len(main_fields) / 100, 2)
+        details["field_confidence"] = {f: round(c / 100, 2) for f, c in confidence.items()}
+        details["ocr_tier"] = tier
         return details
     
+    def _parse_id_text(self, text):
+        """Parse OCR text to extract ID details"""
+        return id_text_parser.parse(text)
+    
     def validate_id_number(self, id_number):
         """Validate Kenyan ID number format"""
-        if not id_number or not isinstance(id_number, str):
-            return False
-        
-        id_number = id_number.strip()
-        
-        if not id_number.isdigit():
-            return False
-        
-        if len(id_number) not in [8, 9, 10]:
-            return False
-        
-        return True
+        return Validators.validate_kenyan_id(id_number)
 
 # For backward compatibility
 ocr_service = OCRService()
\ No newline at end of file
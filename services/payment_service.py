@@ -13,6 +13,7 @@ class PaymentService:
         self.db = db
         self.sms_service = SMSService()
         self.daily_rate = APP_CONFIG.DAILY_PREMIUM_RATE
+        self.encryption_service = None
     
     def calculate_balance(self, member_id: int) -> int:
         """Calculate day-based balance (+3 or -3 days)"""
@@ -144,9 +145,10 @@ class PaymentService:
     
     def _decrypt_name(self, encrypted_name):
         """Helper to decrypt names for SMS"""
-        from services.encryption_service import EncryptionService
-        enc_service = EncryptionService()
-        return enc_service.decrypt(encrypted_name)
+        if self.encryption_service is None:
+            from services.encryption_service import EncryptionService
+            self.encryption_service = EncryptionService()
+        return self.encryption_service.decrypt(encrypted_name)
     
     def process_daily_reminders(self):
         """Process all daily reminders (to be run at 13:00)"""
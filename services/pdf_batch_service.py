@@ -0,0 +1,210 @@
+# services/pdf_batch_service.py
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime
+import argparse
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from config.database import SimpleDatabase, decrypt_member_record
+from services.encryption_service import EncryptionService, get_keyring, init_worker_keyring
+from services.pdf_service import PDFService
+
+logger = logging.getLogger(__name__)
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+
+def registered_at(record):
+    """Registration time of a stored member record, or None"""
+    return _as_datetime(record.get('registration_date') or record.get('saved_at'))
+
+def matches_query(record, agent_id=None, start_date=None, end_date=None):
+    """Whether a stored record is in the agent's book and the date range
+
+    Only plaintext fields are read, so non-matching records are never
+    decrypted. Both dates are inclusive.
+    """
+    if agent_id is not None and str(record.get('agent_id')) != str(agent_id):
+        return False
+    if start_date or end_date:
+        registered = registered_at(record)
+        if registered is None:
+            return False
+        if start_date and registered.date() < start_date:
+            return False
+        if end_date and registered.date() > end_date:
+            return False
+    return True
+
+def document_member(record, encryption):
+    """Decrypted member with registration_date as a datetime, for documents"""
+    member = decrypt_member_record(record, encryption)
+    member['registration_date'] = registered_at(member) or member.get('registration_date')
+    return member
+
+def matching_members(db, agent_id=None, start_date=None, end_date=None):
+    """Decrypted members matching the query, read one file at a time
+
+    Files that cannot be read or decrypted are logged and skipped.
+    """
+    encryption = EncryptionService()
+    query = {"agent_id": agent_id, "start_date": start_date, "end_date": end_date}
+    for path in db.member_files():
+        try:
+            record = SimpleDatabase.read_record(path)
+            member = document_member(record, encryption) if matches_query(record, **query) else None
+        except Exception:
+            logger.exception("Skipping unreadable member file %s", os.path.basename(path))
+            continue
+        if member is not None:
+            yield member
+
+def _render_batch(paths, query):
+    """Worker: render the proposals of matching member files
+
+    Returns (files read, [(archive name, PDF bytes)], [failed member ids]).
+    A file that fails before its member id is known is reported by name.
+    """
+    encryption = EncryptionService()
+    pdf_service = PDFService()
+    documents = []
+    failed = []
+    for path in paths:
+        member_id = os.path.basename(path)
+        try:
+            record = SimpleDatabase.read_record(path)
+            member_id = record.get('public_id', member_id)
+            if not matches_query(record, **query):
+                continue
+            member = document_member(record, encryption)
+            content = pdf_service.render_proposal_form(member, member.get('family_members'))
+            documents.append((f"proposal_{member.get('public_id', 'unknown')}.pdf", content))
+        except Exception:
+            logger.exception("Proposal for member %s could not be rendered", member_id)
+            failed.append(member_id)
+    return len(paths), documents, failed
+
+class ProposalBatchJob:
+    """Reissue proposal PDFs for a member query across a process pool
+
+    Member files are handed to workers in batches; each worker filters,
+    decrypts and renders its batch, and finished documents are written
+    into the ZIP as they arrive, so only the batches in flight are held
+    in memory.
+    """
+
+    def __init__(self, db, agent_id=None, start_date=None, end_date=None,
+                 batch_size=50, workers=None):
+        self.db = db
+        self.query = {"agent_id": agent_id, "start_date": start_date, "end_date": end_date}
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._stats = {
+            "total_files": 0,
+            "processed_files": 0,
+            "documents": 0,
+            "errors": 0,
+            "failed": [],
+            "started_at": None,
+            "finished_at": None
+        }
+
+    def _batches(self, paths):
+        for i in range(0, len(paths), self.batch_size):
+            yield paths[i:i + self.batch_size]
+
+    def progress(self) -> dict:
+        """Snapshot of progress and throughput"""
+        with self._lock:
+            stats = dict(self._stats, failed=list(self._stats["failed"]))
+        end = stats["finished_at"] or time.time()
+        elapsed = end - stats["started_at"] if stats["started_at"] else 0.0
+        stats["elapsed_seconds"] = elapsed
+        stats["documents_per_second"] = stats["documents"] / elapsed if elapsed else 0.0
+        stats["percent_complete"] = (
+            100.0 * stats["processed_files"] / stats["total_files"] if stats["total_files"] else 100.0
+        )
+        stats["done"] = stats["finished_at"] is not None
+        return stats
+
+    def run(self, dest, progress_callback=None) -> dict:
+        """Write a ZIP of the matching proposals to dest (path or binary file)"""
+        paths = self.db.member_files()
+        with self._lock:
+            self._stats.update(total_files=len(paths), processed_files=0, documents=0,
+                               errors=0, failed=[], started_at=time.time(), finished_at=None)
+
+        batches = self._batches(paths)
+        try:
+            # PDF page streams are already deflated, so the archive just stores them
+            with zipfile.ZipFile(dest, 'w', compression=zipfile.ZIP_STORED) as archive, \
+                    ProcessPoolExecutor(max_workers=self.workers,
+                                        mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=init_worker_keyring,
+                                        initargs=(get_keyring().to_spec(),)) as pool:
+                in_flight = set()
+                while True:
+                    # Keep a bounded number of batches in flight
+                    while len(in_flight) < self.workers * 2:
+                        batch = next(batches, None)
+                        if batch is None:
+                            break
+                        in_flight.add(pool.submit(_render_batch, batch, self.query))
+                    if not in_flight:
+                        break
+
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        files, documents, failed = future.result()
+                        for name, content in documents:
+                            archive.writestr(name, content)
+                        with self._lock:
+                            self._stats["processed_files"] += files
+                            self._stats["documents"] += len(documents)
+                            self._stats["errors"] += len(failed)
+                            self._stats["failed"].extend(failed)
+
+                    if progress_callback:
+                        progress_callback(self.progress())
+        finally:
+            with self._lock:
+                self._stats["finished_at"] = time.time()
+
+        return self.progress()
+
+if __name__ == "__main__":
+    from config.database import db
+
+    parser = argparse.ArgumentParser(description="Reissue proposal PDFs into a ZIP archive")
+    parser.add_argument("output", help="ZIP file to write")
+    parser.add_argument("--agent-id", default=None)
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, default=None,
+                        help="first registration date, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, default=None,
+                        help="last registration date, YYYY-MM-DD")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    job = ProposalBatchJob(db, agent_id=args.agent_id, start_date=args.start_date,
+                           end_date=args.end_date, batch_size=args.batch_size, workers=args.workers)
+
+    def report(stats):
+        print(f"\r{stats['processed_files']:,}/{stats['total_files']:,} members scanned, "
+              f"{stats['documents']:,} proposals, {stats['documents_per_second']:,.1f} docs/s",
+              end="", flush=True)
+
+    final = job.run(args.output, progress_callback=report)
+    print(f"\nDone in {final['elapsed_seconds']:.1f}s, "
+          f"{final['documents']:,} of {final['documents'] + final['errors']:,} rendered")
+    if final['failed']:
+        print("Failed: " + ", ".join(map(str, final['failed'])))
@@ -1,109 +1,340 @@
 # services/pdf_service.py - WORKING VERSION
 from fpdf import FPDF
+from collections import OrderedDict
 from datetime import datetime
+import hashlib
+import json
 import os
+import re
+import threading
+from cryptography.exceptions import InvalidTag
+from services.envelope_service import EnvelopeKeyError, envelope_service
+
+PROPOSAL_TERMS = [
+    "1. This is a daily premium medical cover policy.",
+    "2. Coverage is active only when premium payments are up to date.",
+    "3. Premium rates vary by cover type (KES 150-500 per day).",
+    "4. Grace period: 7 days of non-payment allowed before suspension.",
+    "5. Hospital access requires active policy status.",
+    "6. Claims must be submitted within 30 days of treatment.",
+    "7. Policy can be cancelled with 30 days written notice."
+]
+
+# Member fields of section 1 as (label, record key)
+PROPOSAL_MEMBER_FIELDS = [
+    ('Full Name:', 'name'),
+    ('Member ID:', 'public_id'),
+    ('Phone Number:', 'phone_number'),
+    ('Cover Type:', 'cover_type')
+]
+
+# Bump when the proposal layout changes so cached documents are not reused
+PROPOSAL_LAYOUT_VERSION = 2
+
+# Disk budget for cached proposal PDFs
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+def _format_date(value):
+    return value.strftime('%d/%m/%Y') if hasattr(value, 'strftime') else str(value)
+
+class ProposalLayout:
+    """The proposal form with its static sections prepared once
+
+    Fonts, the wrapped terms and the position of every fixed string are
+    measured at compile time, so a render only writes text at known
+    coordinates. Member and family values start at fixed column offsets.
+    Cell layout (alignment, width checks, line breaking) was most of the
+    cost of each document.
+    """
+
+    # Core font styles; Helvetica is what 'Arial' was substituted with
+    TITLE_FONT = ('helvetica', 'B', 16)
+    HEADING_FONT = ('helvetica', 'B', 14)
+    BODY_FONT = ('helvetica', '', 12)
+    TERMS_FONT = ('helvetica', '', 10)
+    FOOTER_FONT = ('helvetica', 'I', 10)
+
+    LABEL_WIDTH = 50
+    FAMILY_COLUMNS = (20, 70)
 
-class PDFService:
-    """Service for generating insurance documents"""
-    
     def __init__(self):
-        self.template_dir = "static/templates"
-        
-    def generate_proposal_form(self, member_data, family_members=None):
-        """Generate formal insurance proposal form PDF"""
-        
         pdf = FPDF()
         pdf.add_page()
-        
+        self.top = pdf.t_margin
+        self.bottom = pdf.page_break_trigger
+        self.text_x = pdf.l_margin + pdf.c_margin
+        self.value_x = self.text_x + self.LABEL_WIDTH
+        self.dob_x, self.gender_x = (self.text_x + offset for offset in self.FAMILY_COLUMNS)
+
+        pdf.set_font(*self.TERMS_FONT)
+        self.terms_lines = [
+            line
+            for term in PROPOSAL_TERMS
+            for line in pdf.multi_cell(0, 8, term, dry_run=True, output="LINES")
+        ]
+
+        pdf.set_font(*self.TITLE_FONT)
+        self.title_x = self._centered_x(pdf, 'AYTIN AFRICA INSURANCE AGENCY')
+        pdf.set_font(*self.BODY_FONT)
+        self.subtitle_x = self._centered_x(pdf, 'Insurance Proposal Form - Medical Cover')
+        pdf.set_font(*self.FOOTER_FONT)
+        # Digits share one width in Helvetica, so any timestamp centres the same
+        self.generated_x = self._centered_x(pdf, self._generated_on(datetime(2000, 1, 1)))
+        self.url_x = self._centered_x(pdf, 'AYTIN AFRICA Insurance - https://aytinafrica.co.ke')
+
+    @staticmethod
+    def _centered_x(pdf, text):
+        return pdf.l_margin + (pdf.epw - pdf.get_string_width(text)) / 2
+
+    @staticmethod
+    def _generated_on(when):
+        return f'Generated on: {when.strftime("%d/%m/%Y %H:%M:%S")}'
+
+    def render(self, member_data, family_members=None) -> bytes:
+        pdf = FPDF()
+        pdf.add_page()
+        y = self.top
+
+        def row(h):
+            """Baseline of the next line of height h, breaking the page if it does not fit"""
+            nonlocal y
+            if y + h > self.bottom:
+                pdf.add_page()
+                y = self.top
+            baseline = y + h / 2 + 0.3 * pdf.font_size
+            y += h
+            return baseline
+
         # Header
-        pdf.set_font('Arial', 'B', 16)
-        pdf.cell(0, 10, 'AYTIN AFRICA INSURANCE AGENCY', 0, 1, 'C')
-        pdf.set_font('Arial', '', 12)
-        pdf.cell(0, 10, 'Insurance Proposal Form - Medical Cover', 0, 1, 'C')
-        pdf.ln(5)
-        
+        pdf.set_font(*self.TITLE_FONT)
+        pdf.text(self.title_x, row(10), 'AYTIN AFRICA INSURANCE AGENCY')
+        pdf.set_font(*self.BODY_FONT)
+        pdf.text(self.subtitle_x, row(10), 'Insurance Proposal Form - Medical Cover')
+        y += 5
+
         # Member Information
-        pdf.set_font('Arial', 'B', 14)
-        pdf.cell(0, 10, '1. Member Information', 0, 1)
-        pdf.set_font('Arial', '', 12)
-        
-        pdf.cell(50, 10, 'Full Name:', 0, 0)
-        pdf.cell(0, 10, member_data.get('name', 'N/A'), 0, 1)
-        
-        pdf.cell(50, 10, 'Member ID:', 0, 0)
-        pdf.cell(0, 10, member_data.get('public_id', 'N/A'), 0, 1)
-        
-        pdf.cell(50, 10, 'Phone Number:', 0, 0)
-        pdf.cell(0, 10, member_data.get('phone_number', 'N/A'), 0, 1)
-        
-        pdf.cell(50, 10, 'Cover Type:', 0, 0)
-        pdf.cell(0, 10, member_data.get('cover_type', 'N/A'), 0, 1)
-        
-        pdf.cell(50, 10, 'Registration Date:', 0, 0)
-        reg_date = member_data.get('registration_date', datetime.now())
-        if hasattr(reg_date, 'strftime'):
-            pdf.cell(0, 10, reg_date.strftime('%d/%m/%Y'), 0, 1)
-        else:
-            pdf.cell(0, 10, str(reg_date), 0, 1)
-        
-        pdf.ln(5)
-        
+        pdf.set_font(*self.HEADING_FONT)
+        pdf.text(self.text_x, row(10), '1. Member Information')
+        pdf.set_font(*self.BODY_FONT)
+        for label, key in PROPOSAL_MEMBER_FIELDS:
+            baseline = row(10)
+            pdf.text(self.text_x, baseline, label)
+            pdf.text(self.value_x, baseline, str(member_data.get(key, 'N/A')))
+        baseline = row(10)
+        pdf.text(self.text_x, baseline, 'Registration Date:')
+        pdf.text(self.value_x, baseline, _format_date(member_data.get('registration_date', datetime.now())))
+        y += 5
+
         # Family Information
-        if family_members and len(family_members) > 0:
-            pdf.set_font('Arial', 'B', 14)
-            pdf.cell(0, 10, '2. Family Members Covered', 0, 1)
-            pdf.set_font('Arial', '', 12)
-            
+        if family_members:
+            pdf.set_font(*self.HEADING_FONT)
+            pdf.text(self.text_x, row(10), '2. Family Members Covered')
+            pdf.set_font(*self.BODY_FONT)
             for i, member in enumerate(family_members, 1):
-                pdf.cell(0, 10, f'{i}. {member.get("relationship", "").title()}: {member.get("name", "N/A")}', 0, 1)
-                pdf.cell(20, 10, '', 0, 0)
-                
-                dob = member.get('dob')
-                if hasattr(dob, 'strftime'):
-                    dob_str = dob.strftime('%d/%m/%Y')
-                else:
-                    dob_str = str(dob)
-                
-                pdf.cell(50, 10, f'DOB: {dob_str}', 0, 0)
-                pdf.cell(50, 10, f'Gender: {member.get("gender", "N/A")}', 0, 1)
-                pdf.ln(2)
-        
+                pdf.text(self.text_x, row(10), f'{i}. {member.get("relationship", "").title()}: {member.get("name", "N/A")}')
+                baseline = row(10)
+                pdf.text(self.dob_x, baseline, f'DOB: {_format_date(member.get("dob"))}')
+                pdf.text(self.gender_x, baseline, f'Gender: {member.get("gender", "N/A")}')
+                y += 2
+
         # Terms and Conditions
-        pdf.ln(10)
-        pdf.set_font('Arial', 'B', 14)
-        pdf.cell(0, 10, '3. Terms & Conditions', 0, 1)
-        pdf.set_font('Arial', '', 10)
-        
-        terms = [
-            "1. This is a daily premium medical cover policy.",
-            "2. Coverage is active only when premium payments are up to date.",
-            "3. Premium rates vary by cover type (KES 150-500 per day).",
-            "4. Grace period: 7 days of non-payment allowed before suspension.",
-            "5. Hospital access requires active policy status.",
-            "6. Claims must be submitted within 30 days of treatment.",
-            "7. Policy can be cancelled with 30 days written notice."
-        ]
-        
-        for term in terms:
-            pdf.multi_cell(0, 8, term)
-        
+        y += 10
+        pdf.set_font(*self.HEADING_FONT)
+        pdf.text(self.text_x, row(10), '3. Terms & Conditions')
+        pdf.set_font(*self.TERMS_FONT)
+        for line in self.terms_lines:
+            pdf.text(self.text_x, row(8), line)
+
         # Footer
-        pdf.ln(20)
-        pdf.set_font('Arial', 'I', 10)
-        pdf.cell(0, 10, f'Generated on: {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}', 0, 1, 'C')
-        pdf.cell(0, 10, 'AYTIN AFRICA Insurance - https://aytinafrica.co.ke', 0, 1, 'C')
-        
-        # Save PDF
-        os.makedirs('generated_pdfs', exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        member_id = member_data.get('public_id', 'unknown')
-        filename = f'generated_pdfs/proposal_{member_id}_{timestamp}.pdf'
+        y += 20
+        pdf.set_font(*self.FOOTER_FONT)
+        pdf.text(self.generated_x, row(10), self._generated_on(datetime.now()))
+        pdf.text(self.url_x, row(10), 'AYTIN AFRICA Insurance - https://aytinafrica.co.ke')
+
+        return bytes(pdf.output())
+
+_proposal_layout = None
+_proposal_layout_lock = threading.Lock()
+
+def get_proposal_layout() -> ProposalLayout:
+    """Process-wide compiled proposal layout, built on first use"""
+    global _proposal_layout
+    if _proposal_layout is None:
+        with _proposal_layout_lock:
+            if _proposal_layout is None:
+                _proposal_layout = ProposalLayout()
+    return _proposal_layout
+
+class PDFCache:
+    """Rendered proposals on disk, keyed by a hash of the data they show
+    
+    Files are named proposal_<sha256>.pdf.enc, so the same member and
+    family details always map to one file however often they are
+    downloaded. Proposals carry member PII, so files are sealed with the
+    envelope service like member records. The least recently used files
+    are evicted once the cache exceeds max_bytes; other files in
+    cache_dir are left alone, except plaintext proposal_<sha256>.pdf
+    entries from before encryption, which are deleted.
+    """
+    
+    FILE_PATTERN = re.compile(r'^proposal_([0-9a-f]{64})\.pdf\.enc$')
+    PLAINTEXT_PATTERN = re.compile(r'^proposal_[0-9a-f]{64}\.pdf$')
+    
+    def __init__(self, cache_dir="generated_pdfs", max_bytes=PDF_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries = None  # key -> size, least recently used first
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def key(member_data, family_members=None) -> str:
+        """Hash of exactly the fields the proposal layout prints"""
+        member_keys = [key for _, key in PROPOSAL_MEMBER_FIELDS] + ['registration_date']
+        shown = {
+            "layout": PROPOSAL_LAYOUT_VERSION,
+            "member": {k: member_data.get(k) for k in member_keys},
+            "family": [
+                {k: fm.get(k) for k in ("relationship", "name", "dob", "gender")}
+                for fm in family_members or []
+            ]
+        }
+        payload = json.dumps(shown, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"proposal_{key}.pdf.enc")
+    
+    def _load_index(self):
+        """Index existing cache files, oldest access first"""
+        if self._entries is not None:
+            return
+        self._entries = OrderedDict()
+        self._size = 0
+        if not os.path.isdir(self.cache_dir):
+            return
+        found = []
+        for entry in os.scandir(self.cache_dir):
+            match = self.FILE_PATTERN.match(entry.name)
+            if match and entry.is_file():
+                stat = entry.stat()
+                found.append((stat.st_mtime, match.group(1), stat.st_size))
+            elif self.PLAINTEXT_PATTERN.match(entry.name) and entry.is_file():
+                os.remove(entry.path)
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size += size
+    
+    def get(self, key):
+        """Cached PDF bytes, or None"""
+        with self._lock:
+            self._load_index()
+            try:
+                content = envelope_service.read_file(key, self.path(key))
+            except (OSError, ValueError, InvalidTag, EnvelopeKeyError) as e:
+                if not isinstance(e, OSError):
+                    # Unreadable under the current keys; re-rendered on demand
+                    os.remove(self.path(key))
+                self._size -= self._entries.pop(key, 0)
+                self.misses += 1
+                return None
+            # mtime records recency so LRU order survives restarts
+            os.utime(self.path(key))
+            if key not in self._entries:
+                self._entries[key] = os.path.getsize(self.path(key))
+                self._size += self._entries[key]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+    
+    def put(self, key, content: bytes):
+        """Encrypt and store PDF bytes atomically, evicting old files over budget"""
+        with self._lock:
+            self._load_index()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.path(key)
+            envelope_service.write_file(key, path, content)
+            size = os.path.getsize(path)
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                try:
+                    os.remove(self.path(old_key))
+                except OSError:
+                    pass
+                self._size -= old_size
+                self.evictions += 1
+            return path
+    
+    def clear(self):
+        with self._lock:
+            self._load_index()
+            for key in list(self._entries):
+                try:
+                    os.remove(self.path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._size = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+# Shared by every PDFService writing to generated_pdfs/ in this process
+pdf_cache = PDFCache()
+
+class PDFService:
+    """Service for generating insurance documents
+    
+    Documents are rendered in memory and returned as bytes; the only copy
+    on disk is the envelope-encrypted PDF cache in output_dir, which
+    get_proposal_form serves repeat requests for the same details from.
+    """
+    
+    def __init__(self, output_dir="generated_pdfs", cache=None):
+        self.template_dir = "static/templates"
+        self.output_dir = output_dir
+        if cache is None:
+            cache = pdf_cache if output_dir == pdf_cache.cache_dir else PDFCache(output_dir)
+        self.cache = cache
+    
+    def render_proposal_form(self, member_data, family_members=None) -> bytes:
+        """Render the insurance proposal form PDF to bytes"""
+        return get_proposal_layout().render(member_data, family_members)
+    
+    def _cached_proposal(self, member_data, family_members):
+        """(cache key, PDF bytes), rendering and caching on a miss"""
+        key = self.cache.key(member_data, family_members)
+        content = self.cache.get(key)
+        if content is None:
+            content = self.render_proposal_form(member_data, family_members)
+            self.cache.put(key, content)
+        return key, content
+    
+    def get_proposal_form(self, member_data, family_members=None) -> bytes:
+        """Proposal PDF bytes, from the cache when these details were rendered before"""
+        return self._cached_proposal(member_data, family_members)[1]
+    
+    def generate_proposal_form(self, member_data, family_members=None) -> bytes:
+        """Proposal PDF bytes; kept for older callers, same as get_proposal_form
         
-        try:
-            pdf.output(filename)
-            return filename
-        except Exception as e:
-            # Fallback to simpler filename
-            filename = f'generated_pdfs/proposal_{timestamp}.pdf'
-            pdf.output(filename)
-            return filename
\ No newline at end of file
+        Nothing is written outside the encrypted PDF cache: this used to
+        save a plaintext copy under output_dir and return its path.
+        """
+        return self.get_proposal_form(member_data, family_members)
\ No newline at end of file
@@ -0,0 +1,134 @@
+# services/registration_rollup_service.py
+from datetime import date, datetime, timedelta
+import json
+import os
+import threading
+from utils.file_lock import file_lock
+
+def registration_day(member):
+    """Day a member registered, from registration_date or saved_at, or None"""
+    for field in ('registration_date', 'saved_at'):
+        value = member.get(field)
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        if value:
+            try:
+                return date.fromisoformat(str(value)[:10])
+            except ValueError:
+                continue
+    return None
+
+class RegistrationRollupService:
+    """Registrations per day x agent x cover, maintained as members register
+
+    save_member adds each new member to its (day, agent, cover) row, so a
+    trend chart over any window is a sum over at most days x agents x
+    covers pre-aggregated rows rather than a scan of every member. The
+    table is small (one row per combination seen). Updates re-read it and
+    rewrite it atomically under a file lock, so registrations in several
+    app processes all count; readers reload it when the file changes.
+    """
+
+    def __init__(self, snapshot_dir="data/snapshots"):
+        self.snapshot_dir = snapshot_dir
+        self._lock = threading.Lock()
+        self._counts = None
+        self._version = None
+
+    def _rollup_file(self) -> str:
+        return os.path.join(self.snapshot_dir, "registration_rollups.json")
+
+    def exists(self) -> bool:
+        return self._counts is not None or os.path.exists(self._rollup_file())
+
+    def _file_version(self):
+        """Identity of the file on disk; os.replace gives every write a new inode"""
+        try:
+            stat = os.stat(self._rollup_file())
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _load(self) -> dict:
+        """Counts, re-read if another process rewrote the file; call with the lock held"""
+        version = self._file_version()
+        if self._counts is None or (version is not None and version != self._version):
+            self._counts = {}
+            if version is not None:
+                with open(self._rollup_file(), 'r', encoding='utf-8') as f:
+                    for day, agent, cover, count in json.load(f)["rows"]:
+                        self._counts[(date.fromisoformat(day), agent, cover)] = count
+            self._version = version
+        return self._counts
+
+    def _save(self):
+        rows = [[day.isoformat(), agent, cover, count]
+                for (day, agent, cover), count in sorted(self._counts.items(), key=lambda item: item[0][0])]
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        tmp_path = f"{self._rollup_file()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"rows": rows}, f)
+        os.replace(tmp_path, self._rollup_file())
+        self._version = self._file_version()
+
+    @staticmethod
+    def _key(member):
+        agent_id = member.get('agent_id')
+        return (
+            registration_day(member),
+            str(agent_id) if agent_id not in (None, "") else "",
+            str(member.get('cover_type') or "")
+        )
+
+    def record(self, member):
+        """Count one new registration"""
+        key = self._key(member)
+        if key[0] is None:
+            return
+        with self._lock, file_lock(f"{self._rollup_file()}.lock"):
+            # Always from disk: another process may have written just now
+            self._counts = None
+            counts = self._load()
+            counts[key] = counts.get(key, 0) + 1
+            self._save()
+
+    def rebuild(self, members) -> int:
+        """Recompute the table from all member records, returns members counted"""
+        counts = {}
+        counted = 0
+        for member in members:
+            key = self._key(member)
+            if key[0] is not None:
+                counts[key] = counts.get(key, 0) + 1
+                counted += 1
+        with self._lock, file_lock(f"{self._rollup_file()}.lock"):
+            self._counts = counts
+            self._save()
+        return counted
+
+    def daily_counts(self, days=30, end: date = None, agent_id=None, cover_type=None):
+        """[(date, registrations)] for each of the last `days` days, oldest first
+
+        agent_id and cover_type narrow the rows summed; None means all.
+        """
+        end = end or date.today()
+        start = end - timedelta(days=days - 1)
+        agent = None if agent_id is None else str(agent_id)
+        cover = None if cover_type is None else cover_type.lower()
+
+        totals = {}
+        with self._lock:
+            for (day, row_agent, row_cover), count in self._load().items():
+                if day < start or day > end:
+                    continue
+                if agent is not None and row_agent != agent:
+                    continue
+                if cover is not None and row_cover.lower() != cover:
+                    continue
+                totals[day] = totals.get(day, 0) + count
+        return [(start + timedelta(days=i), totals.get(start + timedelta(days=i), 0)) for i in range(days)]
+
+# Shared instance over data/snapshots
+registration_rollups = RegistrationRollupService()
@@ -0,0 +1,71 @@
+# conftest.py
+# AYTIN AFRICA Insurance Platform
+import base64
+import hashlib
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def fernet_key(label):
+    """Fixed Fernet key for a label, so test keys are reproducible"""
+    return base64.urlsafe_b64encode(hashlib.sha256(label.encode()).digest()).decode()
+
+# Fixed test keys, set before any service loads the keyring
+TEST_ENCRYPTION_KEY = f"v1={fernet_key('test-encryption-key')}"
+ROTATED_KEY = f"v2={fernet_key('rotated-key')}"
+os.environ["ENCRYPTION_KEY"] = TEST_ENCRYPTION_KEY
+os.environ["BLIND_INDEX_KEY"] = "test-blind-index-key"
+
+def reset_services(key_spec=None):
+    """Drop process-wide state cached by the shared service instances
+
+    With key_spec this is what a restart with that ENCRYPTION_KEY does;
+    files on disk are left alone.
+    """
+    from config.database import db
+    from services.blind_index_service import blind_index_service
+    from services.encryption_service import Keyring, set_keyring
+    from services.envelope_service import envelope_service
+    from services.registration_rollup_service import registration_rollups
+
+    set_keyring(Keyring.from_spec(key_spec or os.environ["ENCRYPTION_KEY"]))
+    envelope_service._wrapped = None
+    envelope_service._ciphers = {}
+    if blind_index_service._db is not None:
+        blind_index_service._db.close()
+    blind_index_service._db = None
+    blind_index_service._generation = None
+    blind_index_service._key = None
+    registration_rollups._counts = None
+    db._encryption = None
+    db._blind_index = None
+    db._rollups = None
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Run in an empty working directory with fresh shared services"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    reset_services()
+    yield tmp_path / "data"
+    reset_services()
+
+@pytest.fixture
+def db(data_dir):
+    from config.database import db
+    return db
+
+def make_member(public_id, id_number, phone, **extra):
+    member = {
+        "public_id": public_id,
+        "name": f"Member {public_id}",
+        "id_number": id_number,
+        "phone_number": phone,
+        "cover_type": "basic",
+        "status": "Active",
+        "registration_date": "2026-01-15T09:30:00"
+    }
+    member.update(extra)
+    return member
@@ -0,0 +1,86 @@
+# test_activity.py
+# AYTIN AFRICA Insurance Platform
+import multiprocessing
+from datetime import date, timedelta
+from services.activity_service import ActivityService
+from services.eligibility_service import EligibilityService
+
+class _Database:
+    def __init__(self, members, payments):
+        self.members = members
+        self.payments = payments
+
+    def get_all_members(self):
+        return self.members
+
+    def get_all_payments(self):
+        return self.payments
+
+def _assign(snapshot_dir, prefix, count):
+    ActivityService(snapshot_dir).ordinals_for(f"{prefix}{i}" for i in range(count))
+
+def test_ordinals_are_stable(tmp_path):
+    service = ActivityService(str(tmp_path))
+
+    assert service.ordinals_for(["A", "B"]).tolist() == [0, 1]
+    assert service.ordinals_for(["B", "C", "A"]).tolist() == [1, 2, 0]
+    assert ActivityService(str(tmp_path)).ordinals_for(["C"]).tolist() == [2]
+
+def test_stale_instance_reloads_before_assigning(tmp_path):
+    first = ActivityService(str(tmp_path))
+    second = ActivityService(str(tmp_path))
+    second.ordinals_for([])  # loads the (empty) file
+
+    first.ordinals_for(["A", "B"])
+
+    assert second.ordinals_for(["C"]).tolist() == [2]
+    assert second.ordinals_for(["A"]).tolist() == [0]
+
+def test_concurrent_processes_never_share_ordinals(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_assign, args=(str(tmp_path), prefix, 50))
+        for prefix in ("P", "Q", "R", "S")
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    ordinals = ActivityService(str(tmp_path))._read_ordinals()
+    assert len(ordinals) == 200
+    assert sorted(ordinals.values()) == list(range(200))
+
+def test_bitmap_metrics(tmp_path):
+    service = ActivityService(str(tmp_path))
+    day = date(2026, 3, 10)
+    service.write_day(day - timedelta(days=5), ["A"])
+    service.write_day(day - timedelta(days=1), ["B", "C"])
+    assert service.write_day(day, ["A", "B", "D"]) == 3
+
+    reloaded = ActivityService(str(tmp_path))
+    assert reloaded.bitmap(day).bit_count() == 3
+    assert reloaded.daily_active_counts(2, end=day) == [(day - timedelta(days=1), 2), (day, 3)]
+    assert reloaded.retention(day - timedelta(days=1), day)["retained"] == 1
+    assert reloaded.reactivations(day, lookback_days=10) == {"reactivated": 1, "new": 1, "lapsed": 1}
+
+def test_backfill_matches_daily_status_job(tmp_path):
+    today = date(2026, 3, 20)
+    db = _Database(
+        [{"public_id": "M1"}, {"public_id": "M2"}, {"public_id": "M3"}],
+        [
+            {"member_id": "M1", "transaction_date": "2026-03-15", "days_paid": 30},
+            {"member_id": "M2", "transaction_date": "2026-03-01", "days_paid": 7},
+            # Payments for a member that is not registered count nowhere
+            {"member_id": "M9", "transaction_date": "2026-03-15", "days_paid": 30}
+        ]
+    )
+
+    daily = EligibilityService(snapshot_dir=str(tmp_path / "daily"))
+    daily.run_daily_status_job(db, today)
+    backfilled = ActivityService(str(tmp_path / "backfill"))
+    backfilled.backfill(db, days=1, end=today)
+
+    assert daily.activity.bitmap(today).bit_count() == 1
+    assert backfilled.bitmap(today).bit_count() == 1
@@ -0,0 +1,45 @@
+# test_admin_dashboard.py
+# AYTIN AFRICA Insurance Platform
+import os
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from services.encryption_service import Keyring, set_keyring
+from services.envelope_service import envelope_service
+from services.member_data_service import member_frame_cache
+from tests.conftest import fernet_key, make_member
+
+ADMIN_PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "pages", "03_👑_Admin_Dashboard.py")
+
+@pytest.fixture(autouse=True)
+def no_rerun(monkeypatch):
+    """AppTest 1.28 stops waiting at the first st.rerun; rerun explicitly instead"""
+    monkeypatch.setattr(st, "rerun", lambda: None)
+
+def _open_dashboard():
+    member_frame_cache.invalidate()
+    at = AppTest.from_file(ADMIN_PAGE, default_timeout=60)
+    at.session_state.admin_authenticated = True
+    at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    return at
+
+def test_stored_members_are_shown(db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+
+    at = _open_dashboard()
+
+    assert not at.error
+    assert next(m.value for m in at.metric if m.label == "Total Members") == "1"
+
+def test_unreadable_members_are_an_error_not_demo_data(db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+    set_keyring(Keyring.from_spec(fernet_key("some-other-key")))
+    envelope_service._wrapped = None
+    envelope_service._ciphers = {}
+
+    at = _open_dashboard()
+
+    assert "could not be read" in at.error[0].value
+    assert not at.metric
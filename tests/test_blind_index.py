@@ -0,0 +1,128 @@
+# test_blind_index.py
+# AYTIN AFRICA Insurance Platform
+import pytest
+from services.blind_index_service import BlindIndexService, DuplicateMemberError, blind_index_service
+from services.encryption_service import Keyring, set_keyring
+from services.key_rotation_service import KeyRotationJob
+from tests.conftest import ROTATED_KEY, TEST_ENCRYPTION_KEY, make_member, reset_services
+
+ROTATED_SPEC = f"{ROTATED_KEY},{TEST_ENCRYPTION_KEY}"
+
+@pytest.fixture
+def derived_key(monkeypatch):
+    """Key the blind index from the encryption keyring"""
+    monkeypatch.delenv("BLIND_INDEX_KEY")
+    reset_services()
+    yield
+    reset_services()
+
+def test_lookups_normalize_values(tmp_path):
+    index = BlindIndexService(str(tmp_path / "blind_index"), key=b"k")
+    index.add_member("M1", "1234 5678", "0712 345 678")
+
+    assert index.lookup_id("12345678") == "M1"
+    assert index.lookup_phone("+254712345678") == "M1"
+    assert index.lookup_phone("712345678") == "M1"
+    assert index.lookup_id("87654321") is None
+    assert index.lookup_id("") is None
+
+def test_duplicate_id_is_rejected_for_another_member(tmp_path):
+    index = BlindIndexService(str(tmp_path / "blind_index"), key=b"k")
+    index.add_member("M1", "12345678")
+
+    index.check_duplicate("12345678", "M1")
+    with pytest.raises(DuplicateMemberError) as raised:
+        index.check_duplicate("12345678", "M2")
+    assert raised.value.member_id == "M1"
+
+def test_claimed_ids_are_exclusive_until_released(tmp_path):
+    index = BlindIndexService(str(tmp_path / "blind_index"), key=b"k")
+
+    assert index.claim_id("12345678", "M1")
+    assert not index.claim_id("12345678", "M1")
+    with pytest.raises(DuplicateMemberError):
+        index.claim_id("12345678", "M2")
+    index.release_id("12345678", "M2")
+    assert index.lookup_id("12345678") == "M1"
+
+    index.release_id("12345678", "M1")
+    assert index.claim_id("12345678", "M2")
+
+def test_index_exists_once_built(tmp_path):
+    index = BlindIndexService(str(tmp_path / "blind_index"), key=b"k")
+
+    assert not index.exists()
+    index.add_member("M1", "12345678")
+    assert not index.exists()
+    assert index.rebuild([]) == 0
+    assert index.exists()
+
+def test_tokens_depend_on_the_key(tmp_path):
+    one = BlindIndexService(str(tmp_path / "a"), key=b"one")
+    two = BlindIndexService(str(tmp_path / "b"), key=b"two")
+
+    assert one.id_token("12345678") != two.id_token("12345678")
+    assert one.id_token("12345678") != one.phone_token("12345678")
+
+def test_database_lookups_and_duplicates(db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+
+    assert db.find_member_by_id_number("11111111")["public_id"] == "M1"
+    assert db.find_member_by_phone("+254711000001")["public_id"] == "M1"
+    with pytest.raises(DuplicateMemberError):
+        db.save_member(make_member("M2", "11111111", "0711000002"))
+
+def test_new_primary_key_keeps_the_pinned_index_key(derived_key, db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+
+    reset_services(ROTATED_SPEC)
+
+    assert db.find_member_by_id_number("11111111")["public_id"] == "M1"
+    assert blind_index_service.needs_rekey()
+    with pytest.raises(DuplicateMemberError):
+        db.save_member(make_member("M2", "11111111", "0711000002"))
+
+def test_index_survives_rotation_and_retiring_the_old_key(derived_key, db, data_dir):
+    for i in range(4):
+        db.save_member(make_member(f"M{i}", f"1000000{i}", f"071100000{i}"))
+    reset_services(ROTATED_SPEC)
+
+    result = KeyRotationJob(db, batch_size=2, workers=1,
+                            checkpoint_path=str(data_dir / "checkpoint.json")).run()
+
+    assert result["reindexed_members"] == 4
+    assert not blind_index_service.needs_rekey()
+
+    reset_services(ROTATED_KEY)
+    for i in range(4):
+        assert db.find_member_by_id_number(f"1000000{i}")["public_id"] == f"M{i}"
+        assert db.find_member_by_phone(f"071100000{i}")["public_id"] == f"M{i}"
+        stored = db.read_record(db.member_path(f"M{i}"))
+        assert stored["id_number_hash"] == blind_index_service.id_token(f"1000000{i}")
+    with pytest.raises(DuplicateMemberError):
+        db.save_member(make_member("M9", "10000002", "0711000009"))
+
+def test_missing_pinned_key_version_is_a_clear_error(derived_key, db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+
+    reset_services(ROTATED_KEY)
+
+    with pytest.raises(ValueError, match="key version 'v1'"):
+        db.find_member_by_id_number("11111111")
+
+def test_other_processes_follow_a_rekey(derived_key, tmp_path):
+    path = str(tmp_path / "blind_index")
+    member = {"public_id": "M1", "id_number": "11111111"}
+    writer, other = BlindIndexService(path), BlindIndexService(path)
+    writer.rebuild([member])
+    assert other.lookup_id("11111111") == "M1"
+
+    set_keyring(Keyring.from_spec(ROTATED_SPEC))
+    writer.rekey([member])
+
+    # The other handle sees the new generation and re-derives its key
+    assert other.lookup_id("11111111") == "M1"
+    other.add_member("M2", "22222222")
+    assert writer.lookup_id("22222222") == "M2"
+    set_keyring(Keyring.from_spec(ROTATED_KEY))
+    assert BlindIndexService(path).lookup_id("22222222") == "M2"
@@ -0,0 +1,95 @@
+# test_coverage.py
+# AYTIN AFRICA Insurance Platform
+from datetime import date, datetime
+from services.coverage_service import CoverageIndex
+
+def _payment(member_id, day, days_paid):
+    return {"member_id": member_id, "transaction_date": day, "days_paid": days_paid}
+
+def test_payment_covers_half_open_range():
+    index = CoverageIndex.build([_payment("M1", date(2026, 3, 1), 7)])
+
+    assert not index.is_covered("M1", date(2026, 2, 28))
+    assert index.is_covered("M1", date(2026, 3, 1))
+    assert index.is_covered("M1", date(2026, 3, 7))
+    assert not index.is_covered("M1", date(2026, 3, 8))
+    assert index.coverage_interval("M1", date(2026, 3, 4)) == (date(2026, 3, 1), date(2026, 3, 8))
+
+def test_payment_while_covered_extends_from_the_end():
+    index = CoverageIndex.build([
+        _payment("M1", date(2026, 3, 1), 7),
+        _payment("M1", date(2026, 3, 3), 7)
+    ])
+
+    assert index.intervals("M1") == [(date(2026, 3, 1), date(2026, 3, 15))]
+
+def test_payment_after_lapse_clears_capped_arrears_first():
+    index = CoverageIndex.build([
+        _payment("M1", date(2026, 3, 1), 1),
+        _payment("M1", date(2026, 3, 5), 7),   # 3 days of arrears
+        _payment("M1", date(2026, 5, 1), 10)   # arrears capped at 7 days
+    ], grace_period_days=7)
+
+    assert index.intervals("M1") == [
+        (date(2026, 3, 1), date(2026, 3, 2)),
+        (date(2026, 3, 5), date(2026, 3, 9)),
+        (date(2026, 5, 1), date(2026, 5, 4))
+    ]
+
+def test_days_paid_derived_from_amount():
+    index = CoverageIndex.build([
+        {"member_id": "M1", "transaction_date": "2026-03-01T10:00:00", "amount": 600}
+    ])
+
+    assert index.intervals("M1") == [(date(2026, 3, 1), date(2026, 3, 4))]
+
+def test_members_without_payments_are_not_covered():
+    index = CoverageIndex.build([_payment("M1", date(2026, 3, 1), 0)])
+
+    assert "M1" not in index
+    assert not index.is_covered("M2", date(2026, 3, 1))
+    assert index.latest_interval("M2", date(2026, 3, 1)) is None
+
+def test_balance_days_counts_down_then_into_capped_arrears():
+    index = CoverageIndex.build([_payment("M1", date(2026, 3, 1), 7)], grace_period_days=7)
+
+    assert index.balance_days("M1", date(2026, 3, 1)) == 6
+    assert index.balance_days("M1", date(2026, 3, 7)) == 0
+    assert index.balance_days("M1", date(2026, 3, 8)) == -1
+    assert index.balance_days("M1", date(2026, 6, 1)) == -7
+    assert index.balance_days("M2", date(2026, 3, 1)) == -1
+
+def test_bulk_lookup_matches_point_lookups():
+    payments = [
+        _payment("M1", date(2026, 3, 1), 7),
+        _payment("M2", date(2026, 3, 5), 1),
+        _payment("M2", date(2026, 3, 20), 30),
+        _payment("M3", datetime(2026, 2, 1, 8, 0), 30)
+    ]
+    index = CoverageIndex.build(payments)
+    member_ids = ["M1", "M2", "M3", "M4"] * 3
+    days = [date(2026, 3, d) for d in (1, 6, 2, 1, 8, 21, 3, 1, 31, 20, 25, 1)]
+
+    expected = [index.is_covered(m, d) for m, d in zip(member_ids, days)]
+    assert index.bulk_is_covered(member_ids, days).tolist() == expected
+    assert index.bulk_is_covered(["M1", "M2", "M4"], date(2026, 3, 5)).tolist() == [True, True, False]
+
+def test_members_covered_on():
+    index = CoverageIndex.build([
+        _payment("M1", date(2026, 3, 1), 7),
+        _payment("M2", date(2026, 3, 5), 7),
+        _payment("M3", date(2026, 4, 1), 7)
+    ])
+
+    assert sorted(index.members_covered_on(date(2026, 3, 6))) == ["M1", "M2"]
+    assert index.members_covered_on(date(2026, 1, 1)) == []
+
+def test_simulated_payments_grant_no_cover():
+    index = CoverageIndex.build([
+        _payment("M1", date(2026, 3, 1), 7),
+        dict(_payment("M2", date(2026, 3, 1), 7), simulated=True),
+        dict(_payment("M1", date(2026, 3, 2), 30), simulated=True)
+    ])
+
+    assert "M2" not in index
+    assert index.intervals("M1") == [(date(2026, 3, 1), date(2026, 3, 8))]
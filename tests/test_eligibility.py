@@ -0,0 +1,162 @@
+# test_eligibility.py
+# AYTIN AFRICA Insurance Platform
+import http.client
+import json
+import threading
+from datetime import date
+import pytest
+from services.blind_index_service import BlindIndexService
+from services.eligibility_service import (
+    MAX_BATCH_SIZE, MAX_REQUEST_BYTES, EligibilityService, make_server
+)
+
+AS_OF = date(2026, 3, 20)
+
+class _Database:
+    def __init__(self, members, payments):
+        self.members = members
+        self.payments = payments
+
+    def get_all_members(self):
+        return self.members
+
+    def get_all_payments(self):
+        return self.payments
+
+def _service(tmp_path):
+    db = _Database(
+        [
+            {"public_id": "M1", "phone_number": "0711000001", "status": "Active", "cover_type": "basic"},
+            {"public_id": "M2", "phone_number": "0711000002", "status": "Active"},
+            {"public_id": "M3", "phone_number": "0711000003", "status": "Active"},
+            {"public_id": "M4", "phone_number": "0711000004", "status": "Active",
+             "family_members": [{"name": "A"}, {"name": "B"}]}
+        ],
+        [
+            {"member_id": "M1", "transaction_date": "2026-03-15", "days_paid": 30},
+            {"member_id": "M2", "transaction_date": "2026-03-10", "days_paid": 7},
+            {"member_id": "M3", "transaction_date": "2026-01-01", "days_paid": 7}
+        ]
+    )
+    service = EligibilityService(snapshot_dir=str(tmp_path), blind_index=_blind_index(tmp_path))
+    service.run_daily_status_job(db, AS_OF)
+    return service
+
+def _blind_index(tmp_path):
+    return BlindIndexService(str(tmp_path / "blind_index"), key=b"eligibility-test-key")
+
+def test_paid_member_is_covered(tmp_path):
+    result = _service(tmp_path).verify("M1")
+
+    assert result["found"] and result["covered"]
+    assert result["status"] == "Active"
+    assert result["covered_until"] == "2026-04-13"
+    assert result["as_of"] == AS_OF.isoformat()
+
+def test_lapsed_members_are_inactive_then_suspended(tmp_path):
+    service = _service(tmp_path)
+
+    within_grace = service.verify("M2")
+    assert not within_grace["covered"]
+    assert within_grace["status"] == "Inactive"
+    assert within_grace["covered_until"] == "2026-03-16"
+
+    beyond_grace = service.verify("M3")
+    assert not beyond_grace["covered"]
+    assert beyond_grace["status"] == "Suspended"
+
+def test_member_who_never_paid_is_not_covered(tmp_path):
+    result = _service(tmp_path).verify("M4")
+
+    assert result["found"]
+    assert not result["covered"]
+    assert result["status"] == "Inactive"
+    assert result["covered_until"] is None
+    assert result["family_count"] == 2
+
+def test_verify_by_phone_and_unknown(tmp_path):
+    results = _service(tmp_path).verify_batch(["+254 711 000 001", "M9", "  "])
+
+    assert [r["found"] for r in results] == [True, False]
+    assert results[0]["member_id"] == "M1"
+    assert results[1]["status"] == "Not Found"
+
+def test_snapshot_reloaded_from_disk(tmp_path):
+    _service(tmp_path)
+
+    fresh = EligibilityService(snapshot_dir=str(tmp_path), blind_index=_blind_index(tmp_path))
+    assert fresh.verify("M1")["covered"]
+    assert fresh.verify("0711000001")["member_id"] == "M1"
+
+def test_snapshot_holds_no_phone_numbers(tmp_path):
+    service = _service(tmp_path)
+    path = service._latest_snapshot_path()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    assert "711000001" not in text
+    assert service.blind_index.phone_token("0711000001") in json.loads(text)["phone_tokens"]
+
+def test_snapshot_phones_do_not_match_under_another_key(tmp_path):
+    _service(tmp_path)
+
+    other_key = BlindIndexService(str(tmp_path / "other_index"), key=b"another-key")
+    result = EligibilityService(snapshot_dir=str(tmp_path), blind_index=other_key).verify("0711000001")
+    assert not result["found"]
+
+def test_daily_job_records_only_covered_members(tmp_path):
+    service = _service(tmp_path)
+
+    assert service.activity.bitmap(AS_OF).bit_count() == 1
+
+def test_no_snapshot_is_unavailable(tmp_path):
+    result = EligibilityService(snapshot_dir=str(tmp_path)).verify("M1")
+
+    assert result["status"] == "Unavailable"
+    assert not result["covered"]
+
+class _EndpointClient:
+    def __init__(self, server):
+        self.server = server
+        self.port = server.server_address[1]
+
+    def post(self, body, token="secret", path="/verify", headers=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        sent = {"Content-Type": "application/json"}
+        if token:
+            sent["Authorization"] = f"Bearer {token}"
+        sent.update(headers or {})
+        conn.request("POST", path, body=data, headers=sent)
+        response = conn.getresponse()
+        result = response.status, json.loads(response.read())
+        conn.close()
+        return result
+
+@pytest.fixture
+def endpoint(tmp_path):
+    server = make_server("127.0.0.1", 0, token="secret", service=_service(tmp_path))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield _EndpointClient(server)
+    server.shutdown()
+    server.server_close()
+
+def test_endpoint_requires_token(endpoint):
+    assert endpoint.post({"ids": ["M1"]}, token=None)[0] == 401
+    assert endpoint.post({"ids": ["M1"]}, token="wrong")[0] == 401
+
+    status, body = endpoint.post({"ids": ["M1", "M9"]})
+    assert status == 200
+    assert [r["found"] for r in body["results"]] == [True, False]
+
+def test_endpoint_limits_body_and_batch(endpoint):
+    assert endpoint.post({"ids": ["M1"] * (MAX_BATCH_SIZE + 1)})[0] == 413
+    assert endpoint.post(b"{}", headers={"Content-Length": str(MAX_REQUEST_BYTES + 1)})[0] == 413
+    assert endpoint.post({"ids": "M1"})[0] == 400
+    assert endpoint.post({"ids": ["M1"]}, path="/other")[0] == 404
+
+def test_server_refuses_to_start_without_token(monkeypatch):
+    monkeypatch.delenv("ELIGIBILITY_API_TOKEN", raising=False)
+    with pytest.raises(ValueError):
+        make_server("127.0.0.1", 0)
@@ -1,3 +1,98 @@
 # test_encryption.py
 # AYTIN AFRICA Insurance Platform
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+from config import database
+from services.encryption_service import (DecryptionCache, EncryptionService, InvalidEncryptionKeyError, Keyring,
+                                         MissingEncryptionKeyError, set_keyring)
+from tests.conftest import TEST_ENCRYPTION_KEY, fernet_key, make_member
 
+OLD, NEW = fernet_key("old-secret"), fernet_key("new-secret")
+
+def test_spec_parsing_keeps_primary_first():
+    keyring = Keyring.from_spec(f"v2={NEW}, v1={OLD}")
+
+    assert keyring.primary_version == "v2"
+    assert set(keyring.keys) == {"v1", "v2"}
+    assert Keyring.from_spec(keyring.to_spec()).keys == keyring.keys
+
+def test_bare_fernet_key_with_padding_is_v1():
+    key = Fernet.generate_key().decode()
+    keyring = Keyring.from_spec(key)
+
+    assert keyring.primary_version == "v1"
+    assert keyring.keys["v1"] == key.encode()
+
+def test_tokens_carry_their_key_version():
+    old = Keyring.from_spec(f"v1={OLD}")
+    rotated = Keyring.from_spec(f"v2={NEW},v1={OLD}")
+
+    token = old.encrypt(b"12345678")
+    assert token.startswith("v1:")
+    assert rotated.decrypt(token) == b"12345678"
+    assert rotated.needs_rotation(token)
+
+    new_token = rotated.rotate(token)
+    assert new_token.startswith("v2:")
+    assert rotated.rotate(new_token) == new_token
+    with pytest.raises(InvalidToken):
+        old.decrypt(new_token)
+
+def test_unversioned_legacy_tokens_still_decrypt():
+    key = Fernet.generate_key()
+    legacy = Fernet(key).encrypt(b"Jane").decode()
+
+    keyring = Keyring.from_spec(f"v2={NEW},v1={key.decode()}")
+    assert keyring.decrypt(legacy) == b"Jane"
+    assert keyring.rotate(legacy).startswith("v2:")
+
+def test_unknown_version_and_empty_spec_are_rejected():
+    with pytest.raises(InvalidToken):
+        Keyring.from_spec(f"v1={OLD}").decrypt("v9:abc")
+    with pytest.raises(ValueError):
+        Keyring.from_spec(" , ")
+
+def test_passphrases_and_placeholders_are_not_keys():
+    for spec in ("your-32-byte-encryption-key-here", "v1=secret", f"v2=,v1={OLD}", f"v2={NEW},v1=old-secret"):
+        with pytest.raises(InvalidEncryptionKeyError, match="not a Fernet key"):
+            Keyring.from_spec(spec)
+
+def test_mask_id_number():
+    service = EncryptionService(Keyring.from_spec(OLD))
+
+    assert service.mask_id_number("12345678") == "123****8"
+    assert service.mask_id_number("12345678", is_super_admin=True) == "12345678"
+
+def test_lazy_values_decrypt_once_per_cache():
+    service = EncryptionService(Keyring.from_spec(OLD))
+    token = service.encrypt("Jane Doe")
+    cache = DecryptionCache(service)
+
+    value = service.lazy(token, cache)
+    assert bool(value) and len(cache) == 0
+    assert value == "Jane Doe"
+    assert value.title() == "Jane Doe" and f"{value:>9}" == " Jane Doe"
+    assert len(cache) == 1
+    assert "Jane" not in repr(value)
+
+def test_missing_key_is_an_error_not_a_temporary_key(monkeypatch):
+    monkeypatch.delenv("ENCRYPTION_KEY")
+
+    with pytest.raises(MissingEncryptionKeyError, match="ENCRYPTION_KEY is not set"):
+        Keyring.from_env()
+
+def test_missing_key_fails_on_first_use_not_at_import(monkeypatch, data_dir):
+    monkeypatch.delenv("ENCRYPTION_KEY")
+    set_keyring(None)
+    try:
+        store = database.SimpleDatabase()
+        service = EncryptionService()
+
+        with pytest.raises(MissingEncryptionKeyError):
+            service.encrypt("12345678")
+        with pytest.raises(MissingEncryptionKeyError):
+            store.save_member(make_member("M1", "11111111", "0711000001"))
+        assert store.member_files() == []
+        assert store.blind_index.lookup_id("11111111") is None
+    finally:
+        monkeypatch.setenv("ENCRYPTION_KEY", TEST_ENCRYPTION_KEY)
@@ -0,0 +1,121 @@
+# test_envelope.py
+# AYTIN AFRICA Insurance Platform
+import json
+import os
+import struct
+import subprocess
+import sys
+import pytest
+from cryptography.exceptions import InvalidTag
+from services.encryption_service import Keyring, set_keyring
+from services.envelope_service import EnvelopeKeyError, EnvelopeService, envelope_service
+from tests.conftest import fernet_key, make_member
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_round_trip_over_many_chunks(data_dir):
+    service = EnvelopeService(chunk_size=16)
+    payload = os.urandom(16 * 5 + 3)
+
+    blob = service.encrypt("M1", payload)
+
+    assert service.decrypt("M1", blob) == payload
+    assert payload not in blob
+    assert service.decrypt("M1", service.encrypt("M1", b"")) == b""
+
+def test_tampered_reordered_or_truncated_chunks_fail(data_dir):
+    service = EnvelopeService(chunk_size=16)
+    blob = bytearray(service.encrypt("M1", os.urandom(64)))
+
+    tampered = bytearray(blob)
+    tampered[-1] ^= 1
+    with pytest.raises(InvalidTag):
+        service.decrypt("M1", bytes(tampered))
+
+    # header (10) + one chunk (4 + 12 + 16 + 16): drop the last chunk
+    chunk = 4 + 12 + 16 + 16
+    with pytest.raises(InvalidTag):
+        service.decrypt("M1", bytes(blob[:10 + 3 * chunk]))
+
+    with pytest.raises(ValueError):
+        service.decrypt("M1", b"not an envelope")
+
+def test_blob_moved_to_another_record_or_header_fails(data_dir):
+    service = EnvelopeService(chunk_size=16)
+    # Two records in the same segment share a data key
+    other = next(f"M{i}" for i in range(2, 10000)
+                 if service.segment_for(f"M{i}") == service.segment_for("M1"))
+    blob = service.encrypt("M1", b'{"name": "Jane"}')
+
+    with pytest.raises(InvalidTag):
+        service.decrypt(other, blob)
+
+    # Same segment, different chunk size field in the header
+    header = bytearray(blob[:10])
+    header[-1] ^= 1
+    with pytest.raises(InvalidTag):
+        service.decrypt("M1", bytes(header) + blob[10:])
+
+def test_member_file_copied_over_another_does_not_read(db, data_dir):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+    db.save_member(make_member("M2", "22222222", "0711000002"))
+    (data_dir / "member_M2.enc").write_bytes((data_dir / "member_M1.enc").read_bytes())
+
+    with pytest.raises(InvalidTag):
+        db.read_record(db.member_path("M2"))
+
+def test_legacy_unbound_envelopes_still_decrypt(data_dir):
+    service = EnvelopeService()
+    segment = service.segment_for("M1")
+    nonce = os.urandom(12)
+    sealed = service._cipher(segment).encrypt(nonce, b"{}", struct.pack(">IB", 0, True))
+    blob = struct.pack(">4sHI", b"AYE1", segment, 65536) + struct.pack(">I", len(sealed)) + nonce + sealed
+
+    assert service.decrypt("M1", blob) == b"{}"
+
+def test_file_written_in_one_process_reads_in_another(data_dir):
+    path = str(data_dir / "member_M1.enc")
+    envelope_service.write_file("M1", path, b'{"name": "Jane"}')
+
+    child = subprocess.run(
+        [sys.executable, "-c",
+         "from services.envelope_service import envelope_service; "
+         "print(envelope_service.read_file('M1', 'data/member_M1.enc').decode())"],
+        cwd=str(data_dir.parent),
+        env={**os.environ, "PYTHONPATH": REPO_DIR},
+        capture_output=True, text=True, timeout=60
+    )
+
+    assert child.returncode == 0, child.stderr
+    assert json.loads(child.stdout) == {"name": "Jane"}
+
+def test_failed_write_leaves_no_temp_file(data_dir, monkeypatch):
+    path = str(data_dir / "member_M1.enc")
+
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(envelope_service, "encrypt_stream", fail)
+
+    with pytest.raises(OSError):
+        envelope_service.write_file("M1", path, b"{}")
+    assert os.listdir(data_dir) == []
+
+def test_corrupt_record_is_skipped_and_logged(db, data_dir, caplog):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+    db.save_member(make_member("M2", "22222222", "0711000002"))
+    (data_dir / "member_M2.enc").write_bytes(b"garbage")
+
+    members = db.get_all_members()
+
+    assert [m["public_id"] for m in members] == ["M1"]
+    assert "member_M2.enc" in caplog.text
+
+def test_wrong_master_key_raises_instead_of_hiding_members(db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+
+    set_keyring(Keyring.from_spec(f"v1={fernet_key('some-other-key')}"))
+    envelope_service._wrapped = None
+    envelope_service._ciphers = {}
+
+    with pytest.raises(EnvelopeKeyError):
+        db.get_all_members()
@@ -0,0 +1,36 @@
+# test_formatters.py
+# AYTIN AFRICA Insurance Platform
+from datetime import datetime
+import pandas as pd
+from services.encryption_service import EncryptionService, Keyring
+from utils import formatters
+from tests.conftest import fernet_key
+
+def test_id_masking_matches_the_row_version():
+    service = EncryptionService(Keyring.from_spec(fernet_key("secret")))
+    ids = pd.Series(["12345678", "1234", "123", "", None, "1234567890"])
+
+    masked = formatters.mask_id_numbers(ids)
+
+    assert masked.tolist() == [service.mask_id_number(v) for v in ids.fillna('')]
+    assert formatters.mask_id_numbers(ids, is_super_admin=True).tolist()[0] == "12345678"
+
+def test_phone_masking_keeps_prefix_and_last_digits():
+    masked = formatters.mask_phone_numbers(["+254712345678", "0712", None])
+
+    assert masked.tolist() == ["+2547*****678", "0712", ""]
+
+def test_kes_amounts_with_zero_label_and_missing_values():
+    amounts = pd.Series([1234.5, 0, None, 1234.5], index=[10, 11, 12, 13])
+
+    formatted = formatters.format_kes(amounts, zero_label="Paid")
+
+    assert formatted.tolist() == ["KES 1,234.50", "Paid", "", "KES 1,234.50"]
+    assert formatted.index.tolist() == [10, 11, 12, 13]
+    assert formatters.format_kes([999], decimals=0).tolist() == ["KES 999"]
+
+def test_dates_from_mixed_inputs():
+    values = [datetime(2026, 1, 15, 9, 30), "2026-01-15T18:00:00", "not a date", None]
+
+    assert formatters.format_dates(values).tolist() == ["2026-01-15", "2026-01-15", "", ""]
+    assert formatters.format_dates(values[:1], "%Y-%m-%d %H:%M").tolist() == ["2026-01-15 09:30"]
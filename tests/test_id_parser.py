@@ -0,0 +1,42 @@
+# test_id_parser.py
+# AYTIN AFRICA Insurance Platform
+from datetime import date
+from benchmarks.ocr_text_corpus import text_corpus
+from utils.id_parser import id_text_parser, parse_date
+
+def test_corpus_fields_are_all_read():
+    for expected, text, layout in text_corpus(300):
+        parsed = id_text_parser.parse(text)
+        assert parsed["id_number"] == expected["id_number"], text
+        assert parsed["name"] == expected["name"], text
+        assert parsed["dob"].date() == expected["dob"], text
+        assert parsed["gender"] == expected["gender"], text
+        assert parsed["document_type"] == ("driving_licence" if layout == "licence" else "national_id")
+
+def test_serial_number_is_not_the_id_number():
+    parsed = id_text_parser.parse("SERIAL NUMBER: 123456789\nID NUMBER: 23456789\nFULL NAMES\nJANE DOE")
+
+    assert parsed["id_number"] == "23456789"
+    assert parsed["name"] == "JANE DOE"
+    assert parsed["gender"] == ""
+
+def test_label_at_the_very_start_and_unlabelled_fallbacks():
+    assert id_text_parser.parse("Name: JANE DOE")["name"] == "JANE DOE"
+    parsed = id_text_parser.parse("REPUBLIC OF KENYA\nJOHN KAMAU\n23456789 born 01-02-1990 Male")
+    assert (parsed["name"], parsed["id_number"], parsed["gender"]) == ("JOHN KAMAU", "23456789", "Male")
+    assert parsed["dob"].date() == date(1990, 2, 1)
+
+def test_licence_number_is_not_read_as_an_id():
+    text = "DRIVING LICENCE\n1. DOE\n2. JANE\n3. 01.02.1990\n5. DL12345678"
+    parsed = id_text_parser.parse(text)
+
+    assert parsed["id_number"] == ""
+    assert parsed["licence_number"] == "DL12345678"
+    assert parsed["name"] == "JANE DOE"
+
+def test_parse_date_separators_and_invalid_dates():
+    assert parse_date("15.06.1966").date() == date(1966, 6, 15)
+    assert parse_date("15/06/1966") == parse_date("15-06-1966")
+    assert parse_date("31.02.1990") is None
+    assert parse_date(None) is None
+    assert id_text_parser.parse("")["dob"] is None
@@ -0,0 +1,81 @@
+# test_key_rotation.py
+# AYTIN AFRICA Insurance Platform
+import json
+import os
+from services.encryption_service import get_keyring
+from services.envelope_service import envelope_service
+from services.key_rotation_service import KeyRotationJob
+from tests.conftest import ROTATED_KEY, TEST_ENCRYPTION_KEY, make_member, reset_services
+
+ROTATED_SPEC = f"{ROTATED_KEY},{TEST_ENCRYPTION_KEY}"
+
+def _stored_tokens(db):
+    tokens = []
+    for path in db.member_files():
+        record = db.read_record(path)
+        tokens += [v for k, v in record.items() if k.endswith('_encrypted')]
+        for fm in record.get('family_members') or []:
+            tokens += [v for k, v in fm.items() if k.endswith('_encrypted')]
+    return tokens
+
+def _populate(db, data_dir, count=5):
+    for i in range(count):
+        db.save_member(make_member(f"M{i}", f"1000000{i}", f"071100000{i}",
+                                   family_members=[{"name": f"Child {i}", "dob": "2015-01-01"}]))
+    # A plaintext record from before field and at-rest encryption
+    with open(data_dir / "member_L1.json", 'w', encoding='utf-8') as f:
+        json.dump({"public_id": "L1", "name": "Legacy Person", "id_number": "99999999"}, f)
+
+def test_rotation_reencrypts_fields_and_rewraps_segment_keys(db, data_dir):
+    _populate(db, data_dir)
+    reset_services(ROTATED_SPEC)
+
+    result = KeyRotationJob(db, batch_size=2, workers=1,
+                            checkpoint_path=str(data_dir / "checkpoint.json")).run()
+
+    assert result["error"] is None
+    assert result["processed_files"] == 6
+    assert result["rewrapped_keys"] == 256
+    assert not os.path.exists(data_dir / "checkpoint.json")
+    # The legacy plaintext file was sealed into an envelope
+    assert not os.path.exists(data_dir / "member_L1.json")
+    assert all(path.endswith(".enc") for path in db.member_files())
+    assert all(token.startswith("v2:") for token in _stored_tokens(db))
+    with open(envelope_service.key_file, 'r', encoding='utf-8') as f:
+        assert all(token.startswith("v2:") for token in json.load(f).values())
+
+    # Everything reads back with the old key removed
+    reset_services(ROTATED_KEY)
+    members = {m["public_id"]: m for m in db.get_all_members(lazy=False)}
+    assert len(members) == 6
+    assert members["M3"]["name"] == "Member M3"
+    assert members["M3"]["family_members"][0]["name"] == "Child 3"
+    assert members["L1"]["id_number"] == "99999999"
+
+def test_rotation_resumes_after_checkpoint(db, data_dir):
+    _populate(db, data_dir)
+    reset_services(ROTATED_SPEC)
+    files = db.member_files()
+    checkpoint = data_dir / "checkpoint.json"
+    with open(checkpoint, 'w', encoding='utf-8') as f:
+        json.dump({"primary_version": "v2", "last_completed": os.path.basename(files[2])}, f)
+
+    result = KeyRotationJob(db, batch_size=2, workers=1, checkpoint_path=str(checkpoint)).run()
+
+    assert result["total_files"] == len(files) - 3
+    tokens = {path: [v for k, v in db.read_record(path).items() if k.endswith('_encrypted')]
+              for path in db.member_files()}
+    assert all(t.startswith("v1:") for p in files[:3] for t in tokens[p])
+    assert all(t.startswith("v2:") for p in files[3:] for t in tokens[p.replace(".json", ".enc")])
+
+def test_checkpoint_for_another_primary_key_is_ignored(db, data_dir):
+    _populate(db, data_dir, count=2)
+    reset_services(ROTATED_SPEC)
+    checkpoint = data_dir / "checkpoint.json"
+    with open(checkpoint, 'w', encoding='utf-8') as f:
+        json.dump({"primary_version": "v1", "last_completed": "member_M1.enc"}, f)
+
+    result = KeyRotationJob(db, workers=1, checkpoint_path=str(checkpoint)).run()
+
+    assert result["total_files"] == 3
+    assert get_keyring().primary_version == "v2"
@@ -0,0 +1,74 @@
+# test_member_data.py
+# AYTIN AFRICA Insurance Platform
+from datetime import datetime
+from services.encryption_service import DecryptionCache
+from services.member_data_service import MemberFrameCache, member_metrics, prepare_members_frame
+from services.registration_rollup_service import registration_day
+from tests.conftest import make_member
+
+def test_frame_is_reused_until_a_member_is_saved(db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+    cache = MemberFrameCache(db)
+
+    first = cache.frame()
+    assert cache.frame() is first
+    db.save_member(make_member("M2", "22222222", "0711000002"))
+    rebuilt = cache.frame()
+
+    assert rebuilt is not first and len(rebuilt) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_sessions_share_decryptions_until_the_frame_is_rebuilt(db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+    cache = MemberFrameCache(db)
+
+    frame = cache.frame()
+    assert str(frame.loc[0, 'name']) == "Member M1"
+    decrypted = cache._decrypted
+    assert len(decrypted) == 1
+
+    # Another session reading the same frame does not empty the cache
+    assert str(cache.frame().loc[0, 'name']) == "Member M1"
+    assert len(decrypted) == 1 and str(frame.loc[0, 'name']) == "Member M1"
+
+    db.save_member(make_member("M2", "22222222", "0711000002"))
+    cache.frame()
+    assert cache._decrypted is not decrypted and len(cache._decrypted) == 0
+
+    cache.invalidate()
+    assert len(cache._decrypted) == 0
+
+def test_get_all_members_uses_the_given_cache(db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+    shared = DecryptionCache(db.encryption)
+
+    (member,) = db.get_all_members(cache=shared)
+    assert str(member['id_number']) == "11111111"
+    assert len(shared) == 1
+    assert db.get_all_members(lazy=False, cache=shared)[0]['name'] == "Member M1"
+
+def test_member_metrics_counts_from_the_prepared_columns():
+    now = datetime(2026, 3, 10, 15, 0)
+    frame = prepare_members_frame([
+        {"status": "Active", "registration_date": "2026-03-10T08:00:00", "balance_days": 3, "total_paid": 1400},
+        {"status": "Inactive", "registration_date": "2026-03-09T23:59:00", "balance_days": -2, "total_paid": 200},
+        {"status": "Active", "balance_days": "5", "total_paid": None},
+    ])
+
+    assert member_metrics(frame, now=now) == {
+        "total_members": 3,
+        "total_premium": 1600.0,
+        "today_registrations": 1,
+        "pending_count": 1,
+        "active_members": 2
+    }
+
+def test_frame_and_rollups_agree_on_the_registration_day():
+    records = [
+        {"registration_date": "2026-01-15T09:30:00", "saved_at": "2026-03-01T10:00:00"},
+        {"saved_at": "2026-03-01T10:00:00"},
+    ]
+    frame = prepare_members_frame(records)
+
+    assert [d.date() for d in frame['registration_date']] == [registration_day(r) for r in records]
+    assert frame.loc[0, 'registration_date'].day == 15
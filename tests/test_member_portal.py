@@ -0,0 +1,74 @@
+# test_member_portal.py
+# AYTIN AFRICA Insurance Platform
+import os
+from datetime import datetime, timedelta
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from services.coverage_service import CoverageIndex
+from tests.conftest import make_member
+
+PORTAL_PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "pages", "05_💳_Member_Portal.py")
+
+@pytest.fixture(autouse=True)
+def no_rerun(monkeypatch):
+    """AppTest 1.28 stops waiting at the first st.rerun; rerun explicitly instead"""
+    monkeypatch.setattr(st, "rerun", lambda: None)
+
+def _login(method, credential):
+    at = AppTest.from_file(PORTAL_PAGE, default_timeout=60)
+    at.run()
+    if at.radio[0].value != method:
+        at.radio[0].set_value(method).run()
+    next(w for w in at.text_input if w.label == method).input(credential)
+    next(w for w in at.button if w.label == "Login").click().run()
+    at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    return at
+
+def _metric(at, label):
+    return next(m.value for m in at.metric if m.label == label)
+
+def test_phone_login_of_registered_member(db):
+    db.save_member(make_member("M1", "11111111", "0711000001",
+                               family_members=[{"name": "Child One", "relationship": "child",
+                                                "dob": "2015-01-01"}]))
+    db.save_payment({"member_id": "M1", "amount": 1400, "days_paid": 7,
+                     "transaction_date": (datetime.now() - timedelta(days=2)).isoformat()})
+
+    at = _login("Phone Number", "+254711000001")
+
+    assert at.session_state.member_id == "M1"
+    assert "Member M1" in at.subheader[0].value
+    assert _metric(at, "Balance Days").endswith(" 4")
+    assert _metric(at, "Total Paid") == "KES 1,400"
+    assert _metric(at, "Family Covered") == "1"
+
+def test_id_login_of_member_who_never_paid(db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+
+    at = _login("ID Number", "11111111")
+
+    assert at.session_state.member_id == "M1"
+    assert _metric(at, "Balance Days").endswith(" -1")
+    assert "INACTIVE" in at.error[0].value
+
+def test_payment_from_portal_is_simulated_and_grants_no_cover(db):
+    db.save_member(make_member("M1", "11111111", "0711000001"))
+    at = _login("Member ID", "M1")
+
+    next(w for w in at.button if w.label == "💳 Process Payment").click().run()
+
+    assert not at.exception
+    payments = db.get_all_payments()
+    assert [(p["member_id"], p["days_paid"], p["simulated"]) for p in payments] == [("M1", 7, True)]
+    assert "M1" not in CoverageIndex.from_database(db)
+    at.run()
+    assert _metric(at, "Balance Days").endswith(" -1")
+
+def test_demo_account_still_works(db):
+    at = _login("Member ID", "M001")
+
+    assert at.session_state.member_id == "M001"
+    assert not db.get_all_payments()
@@ -0,0 +1,128 @@
+# test_ocr_batch.py
+# AYTIN AFRICA Insurance Platform
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import json
+from datetime import date
+import pytest
+from services import ocr_batch_service
+from services.ocr_batch_service import RESULT_FIELDS, OCRBatchJob
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """Run the batch in threads with an OCR stand-in
+
+    An image's bytes are the name read from it, or b"unreadable" to fail.
+    Returns the list of names OCR was run on.
+    """
+    seen = []
+
+    def run_job(data, timeout):
+        seen.append(data.decode())
+        if data == b"unreadable":
+            raise ValueError("cannot identify image")
+        return {"name": data.decode(), "dob": date(1990, 1, 1), "extraction_confidence": 0.9}, 0.01
+
+    monkeypatch.setattr(ocr_batch_service, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(ocr_batch_service, "_init_worker", lambda: None)
+    monkeypatch.setattr(ocr_batch_service, "_run_job", run_job)
+    return seen
+
+def _images(folder, **contents):
+    folder.mkdir(exist_ok=True)
+    for filename, content in contents.items():
+        (folder / f"{filename}.jpg").write_bytes(content)
+    return str(folder)
+
+def _read_csv(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+def _write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_only_successful_rows_count_as_completed(tmp_path):
+    output = tmp_path / "results.csv"
+    _write_csv(output, [
+        {"file": "a.jpg", "name": "JANE DOE"},
+        {"file": "b.jpg", "error": "OCR timeout"},
+        {"file": "c.jpg", "error": "cannot identify image"},
+        {"file": "c.jpg", "name": "JOHN DOE"}
+    ])
+
+    assert OCRBatchJob(str(tmp_path), str(output)).completed_files() == {"a.jpg", "c.jpg"}
+
+def test_latest_jsonl_row_wins_and_partial_line_is_dropped(tmp_path):
+    output = tmp_path / "results.jsonl"
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({"file": "a.jpg", "name": "JANE DOE", "error": None}) + "\n")
+        f.write(json.dumps({"file": "a.jpg", "name": None, "error": "OCR timeout"}) + "\n")
+        f.write(json.dumps({"file": "b.jpg", "name": "JOHN DOE", "error": None}) + "\n")
+        f.write('{"file": "c.jpg", "na')
+
+    assert OCRBatchJob(str(tmp_path), str(output)).completed_files() == {"b.jpg"}
+    assert output.read_text(encoding='utf-8').endswith("}\n")
+
+def test_no_output_yet(tmp_path):
+    assert OCRBatchJob(str(tmp_path), str(tmp_path / "results.csv")).completed_files() == set()
+
+def test_run_resumes_after_an_interrupted_csv(tmp_path, fake_ocr):
+    images = _images(tmp_path / "ids", a=b"JANE DOE", b=b"JOHN DOE", c=b"MARY AKINYI")
+    output = tmp_path / "results.csv"
+    _write_csv(output, [{"file": "a.jpg", "name": "JANE DOE"}])
+    with open(output, 'a', encoding='utf-8', newline='') as f:
+        f.write("b.jpg,JOHN")
+
+    stats = OCRBatchJob(images, str(output), workers=2).run()
+
+    assert (stats["skipped"], stats["total"], stats["processed"], stats["errors"]) == (1, 2, 2, 0)
+    assert sorted(fake_ocr) == ["JOHN DOE", "MARY AKINYI"]
+    rows = _read_csv(output)
+    assert rows[0]["file"] == "a.jpg"
+    assert sorted((row["file"], row["name"], row["dob"]) for row in rows[1:]) == [
+        ("b.jpg", "JOHN DOE", "1990-01-01"),
+        ("c.jpg", "MARY AKINYI", "1990-01-01")
+    ]
+
+def test_run_resumes_after_an_interrupted_jsonl(tmp_path, fake_ocr):
+    images = _images(tmp_path / "ids", a=b"JANE DOE", b=b"JOHN DOE")
+    output = tmp_path / "results.jsonl"
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({"file": "a.jpg", "name": "JANE DOE", "error": None}) + "\n")
+        f.write('{"file": "b.jpg", "na')
+
+    OCRBatchJob(images, str(output), workers=1).run()
+
+    assert fake_ocr == ["JOHN DOE"]
+    with open(output, 'r', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert [(row["file"], row["name"]) for row in rows] == [("a.jpg", "JANE DOE"), ("b.jpg", "JOHN DOE")]
+    assert set(rows[1]) == set(RESULT_FIELDS)
+
+def test_failed_image_is_retried_and_latest_row_wins(tmp_path, fake_ocr):
+    folder = tmp_path / "ids"
+    images = _images(folder, a=b"JANE DOE", b=b"unreadable")
+    output = tmp_path / "results.csv"
+    job = OCRBatchJob(images, str(output), workers=1)
+
+    first = job.run()
+    assert (first["processed"], first["errors"]) == (2, 1)
+    assert job.completed_files() == {"a.jpg"}
+
+    # The photo is retaken; only the failed image is read again
+    _images(folder, b=b"JOHN DOE")
+    fake_ocr.clear()
+    second = job.run()
+
+    assert (second["skipped"], second["processed"], second["errors"]) == (1, 1, 0)
+    assert fake_ocr == ["JOHN DOE"]
+    assert job.completed_files() == {"a.jpg", "b.jpg"}
+    rows = [row for row in _read_csv(output) if row["file"] == "b.jpg"]
+    assert [(row["name"], row["error"]) for row in rows] == [("", "cannot identify image"), ("JOHN DOE", "")]
+
+    # A third run has nothing left to do
+    fake_ocr.clear()
+    assert job.run()["total"] == 0 and fake_ocr == []
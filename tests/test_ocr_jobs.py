@@ -0,0 +1,86 @@
+# test_ocr_jobs.py
+# AYTIN AFRICA Insurance Platform
+from concurrent.futures import Future
+import pytest
+from services.ocr_job_service import OCRJobService
+from services.ocr_service import TIMEOUT_MESSAGE, ocr_result_cache
+
+class _FakePool:
+    """Stands in for the process pool; tests drive the futures by hand"""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+@pytest.fixture
+def jobs(monkeypatch):
+    service = OCRJobService(max_pending=2, default_timeout=30)
+    pool = _FakePool()
+    monkeypatch.setattr(service, "_executor", lambda: pool)
+    monkeypatch.setattr(ocr_result_cache, "get", lambda key: None)
+    monkeypatch.setattr(ocr_result_cache, "put", lambda key, details: None)
+    service.pool = pool
+    return service
+
+def _age(service, job_id, seconds):
+    service._jobs[job_id]["submitted_at"] -= seconds
+
+def test_finished_job_reports_its_result(jobs):
+    job_id = jobs.submit(b"photo")
+    assert jobs.status(job_id)["status"] == "queued"
+
+    jobs.pool.futures[0].set_running_or_notify_cancel()
+    assert jobs.status(job_id)["status"] == "running"
+
+    jobs.pool.futures[0].set_result(({"name": "JANE DOE"}, 1.5))
+    assert jobs.status(job_id)["result"] == {"name": "JANE DOE"}
+    assert jobs.result(job_id) == {"name": "JANE DOE"}
+    assert jobs.metrics()["completed"] == 1
+
+def test_queued_job_past_its_deadline_is_cancelled(jobs):
+    job_id = jobs.submit(b"photo")
+    _age(jobs, job_id, 31)
+
+    assert jobs.status(job_id)["status"] == "timeout"
+    assert jobs.pool.futures[0].cancelled()
+    with pytest.raises(TimeoutError):
+        jobs.result(job_id)
+
+def test_running_job_past_its_deadline_times_out(jobs):
+    job_id = jobs.submit(b"photo")
+    jobs.pool.futures[0].set_running_or_notify_cancel()
+    _age(jobs, job_id, 31)
+
+    assert jobs.status(job_id)["status"] == "timeout"
+    with pytest.raises(TimeoutError):
+        jobs.result(job_id)
+
+    # A late result from the worker does not revive the job
+    jobs.pool.futures[0].set_result(({"name": "JANE DOE"}, 40.0))
+    assert jobs.status(job_id)["status"] == "timeout"
+    assert jobs.metrics()["timed_out"] == 1
+    assert jobs.metrics()["completed"] == 0
+
+def test_result_waits_at_most_the_given_time(jobs):
+    job_id = jobs.submit(b"photo")
+
+    with pytest.raises(TimeoutError):
+        jobs.result(job_id, wait=0.05)
+    assert jobs.status(job_id)["status"] == "queued"
+
+def test_worker_errors_are_failures_or_timeouts(jobs):
+    failed, stopped = jobs.submit(b"one"), jobs.submit(b"two")
+    jobs.pool.futures[0].set_exception(ValueError("bad image"))
+    jobs.pool.futures[1].set_exception(RuntimeError(TIMEOUT_MESSAGE))
+
+    status = jobs.status(failed)
+    assert (status["status"], status["error"]) == ("failed", "bad image")
+    assert jobs.status(stopped)["status"] == "timeout"
+    with pytest.raises(ValueError):
+        jobs.result(failed)
+    with pytest.raises(TimeoutError):
+        jobs.result(stopped)
@@ -0,0 +1,91 @@
+# test_ocr_service.py
+# AYTIN AFRICA Insurance Platform
+import time
+import numpy as np
+import pytest
+from services.ocr_service import TIMEOUT_MESSAGE, OCRService, is_timeout
+
+CARD = np.full((400, 640), 255, dtype=np.uint8)
+
+GOOD_ZONES = {
+    "id_number": ("ID NUMBER 12345678", [("ID", 60.0), ("NUMBER", 60.0), ("12345678", 95.0)]),
+    "name": ("FULL NAMES JANE WANJIKU DOE", [("JANE", 90.0), ("WANJIKU", 88.0), ("DOE", 92.0)]),
+    "dob": ("DATE OF BIRTH 15.01.1990", [("15.01.1990", 91.0)]),
+    "gender": ("SEX FEMALE", [("FEMALE", 93.0)])
+}
+FIELDS = list(GOOD_ZONES)
+
+class _FakeEngine:
+    """Answers engine.read from a list of readings and records the timeouts"""
+
+    def __init__(self, readings, delay=0.0):
+        self.readings = list(readings)
+        self.delay = delay
+        self.timeouts = []
+
+    def read(self, image, timeout=0, psm=None, whitelist=None):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        return self.readings.pop(0) if self.readings else ("", [])
+
+def _service(engine):
+    service = OCRService()
+    service._engine = engine
+    return service
+
+def test_confident_first_tier_stops_there():
+    engine = _FakeEngine(GOOD_ZONES[f] for f in FIELDS)
+
+    details = _service(engine)._extract_tiered(CARD)
+
+    assert details["ocr_tier"] == 1
+    assert len(engine.timeouts) == 4
+    assert (details["name"], details["id_number"]) == ("JANE WANJIKU DOE", "12345678")
+    assert details["field_confidence"]["id_number"] == 0.95
+
+def test_weak_zones_are_reread_at_full_resolution():
+    engine = _FakeEngine([("", [])] * 4 + [GOOD_ZONES[f] for f in FIELDS])
+
+    details = _service(engine)._extract_tiered(CARD)
+
+    assert details["ocr_tier"] == 2
+    assert len(engine.timeouts) == 8
+    assert details["name"] == "JANE WANJIKU DOE"
+
+def test_whole_card_read_when_name_and_id_stay_weak():
+    engine = _FakeEngine([("", [])] * 8 + [(
+        "FULL NAMES JANE WANJIKU DOE\nID NUMBER 12345678\nDATE OF BIRTH 15.01.1990",
+        [("JANE", 80.0), ("12345678", 80.0)]
+    )])
+
+    details = _service(engine)._extract_tiered(CARD)
+
+    assert details["ocr_tier"] == 3
+    assert details["id_number"] == "12345678"
+    assert details["field_confidence"]["name"] == 0.8
+
+def test_engine_calls_share_one_deadline():
+    engine = _FakeEngine([], delay=0.01)
+
+    _service(engine)._extract_tiered(CARD, timeout=10)
+
+    assert len(engine.timeouts) == 9
+    assert all(0 < t <= 10 for t in engine.timeouts)
+    assert engine.timeouts == sorted(engine.timeouts, reverse=True)
+    assert engine.timeouts[0] - engine.timeouts[-1] >= 0.08
+
+def test_spent_budget_stops_before_the_next_call():
+    engine = _FakeEngine([], delay=0.05)
+
+    with pytest.raises(RuntimeError) as raised:
+        _service(engine)._extract_tiered(CARD, timeout=0.12)
+
+    assert is_timeout(raised.value) and str(raised.value) == TIMEOUT_MESSAGE
+    assert 2 <= len(engine.timeouts) <= 3
+
+def test_no_timeout_means_no_limit_per_call():
+    engine = _FakeEngine([])
+
+    _service(engine)._extract_tiered(CARD)
+
+    assert engine.timeouts == [0] * 9
@@ -1,3 +1,43 @@
 # test_payments.py
 # AYTIN AFRICA Insurance Platform
+import os
+from datetime import date
+from streamlit.testing.v1 import AppTest
+from services.coverage_service import CoverageIndex
+from tests.conftest import make_member
 
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+
+def test_save_payment_appends_to_log(db):
+    db.save_payment({"member_id": "M1", "amount": 1400, "days_paid": 7})
+    db.save_payment({"member_id": "M2", "amount": 200, "days_paid": 1,
+                     "transaction_date": "2026-03-01T08:00:00"})
+
+    payments = db.get_all_payments()
+    assert [p["member_id"] for p in payments] == ["M1", "M2"]
+    assert payments[0]["transaction_date"]
+    assert payments[1]["transaction_date"] == "2026-03-01T08:00:00"
+
+def test_saved_payments_drive_coverage(db):
+    db.save_payment({"member_id": "M1", "amount": 1400, "days_paid": 7,
+                     "transaction_date": "2026-03-01T08:00:00"})
+
+    index = CoverageIndex.from_database(db)
+    assert index.is_covered("M1", date(2026, 3, 7))
+    assert not index.is_covered("M1", date(2026, 3, 8))
+
+def test_ussd_payment_is_recorded_for_registered_phone(db):
+    db.save_member(make_member("M1", "12345678", "0712345678"))
+
+    at = AppTest.from_file(os.path.join(PAGES_DIR, "04_📱_USSD_Interface.py"), default_timeout=60)
+    at.run()
+    next(w for w in at.slider if w.label == "Number of days").set_value(3)
+    next(w for w in at.text_input if w.label == "M-Pesa Number").input("0712 345 678")
+    next(w for w in at.button if w.label == "Simulate Payment").click().run()
+    assert not at.exception
+
+    payments = db.get_all_payments()
+    assert len(payments) == 1
+    assert payments[0]["member_id"] == "M1"
+    assert payments[0]["days_paid"] == 3
+    assert payments[0]["amount"] == 600
@@ -0,0 +1,39 @@
+# test_pdf_batch.py
+# AYTIN AFRICA Insurance Platform
+from datetime import date
+import zipfile
+from services.pdf_batch_service import ProposalBatchJob, matches_query
+from tests.conftest import make_member
+
+def test_query_reads_only_plaintext_fields():
+    record = {"agent_id": 2, "registration_date": "2026-01-15T09:30:00", "name_encrypted": "v1:..."}
+
+    assert matches_query(record, agent_id="2", start_date=date(2026, 1, 15), end_date=date(2026, 1, 15))
+    assert not matches_query(record, agent_id=3)
+    assert not matches_query(record, start_date=date(2026, 1, 16))
+    assert not matches_query({"agent_id": 2}, end_date=date(2026, 1, 15))
+
+def test_batch_job_zips_the_agents_proposals(db, data_dir):
+    for i, agent_id in enumerate([1, 2, 1]):
+        db.save_member(make_member(f"M{i}", f"1000000{i}", f"071100000{i}", agent_id=agent_id))
+    archive_path = data_dir / "proposals.zip"
+
+    stats = ProposalBatchJob(db, agent_id=1, batch_size=2, workers=1).run(str(archive_path))
+
+    assert (stats["total_files"], stats["documents"], stats["errors"]) == (3, 2, 0)
+    assert stats["done"] and stats["percent_complete"] == 100.0
+    with zipfile.ZipFile(archive_path) as archive:
+        assert sorted(archive.namelist()) == ["proposal_M0.pdf", "proposal_M2.pdf"]
+        assert archive.read("proposal_M0.pdf").startswith(b"%PDF")
+
+def test_failed_members_are_logged_and_reported(db, data_dir):
+    db.save_member(make_member("M0", "10000000", "0711000000"))
+    # Core PDF fonts are Latin-1 only, so this member cannot be rendered
+    db.save_member(make_member("M1", "10000001", "0711000001", name="Wanjiru 王"))
+    archive_path = data_dir / "proposals.zip"
+
+    stats = ProposalBatchJob(db, batch_size=1, workers=1).run(str(archive_path))
+
+    assert (stats["documents"], stats["errors"], stats["failed"]) == (1, 1, ["M1"])
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.namelist() == ["proposal_M0.pdf"]
@@ -0,0 +1,75 @@
+# test_pdf_cache.py
+# AYTIN AFRICA Insurance Platform
+import os
+from services.pdf_service import PDFCache, PDFService
+from tests.conftest import make_member
+
+def _key(n):
+    return f"{n:064x}"
+
+def test_entries_are_encrypted_on_disk(data_dir, tmp_path):
+    cache = PDFCache(str(tmp_path / "pdfs"))
+    cache.put(_key(1), b"%PDF-1.4 Jane Doe 12345678")
+
+    (name,) = os.listdir(tmp_path / "pdfs")
+    assert name == f"proposal_{_key(1)}.pdf.enc"
+    with open(tmp_path / "pdfs" / name, 'rb') as f:
+        stored = f.read()
+    assert b"%PDF" not in stored and b"Jane" not in stored
+    assert cache.get(_key(1)) == b"%PDF-1.4 Jane Doe 12345678"
+    assert cache.get(_key(2)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_least_recently_used_entries_are_evicted(data_dir, tmp_path):
+    cache = PDFCache(str(tmp_path / "pdfs"), max_bytes=10)
+    cache.put(_key(1), b"a" * 100)
+    size = cache.stats()["bytes"]
+    cache.max_bytes = size * 2
+
+    cache.put(_key(2), b"b" * 100)
+    cache.get(_key(1))
+    cache.put(_key(3), b"c" * 100)
+
+    assert cache.get(_key(2)) is None
+    assert cache.get(_key(1)) == b"a" * 100
+    assert cache.stats()["evictions"] == 1
+
+def test_restart_reindexes_and_drops_plaintext_entries(data_dir, tmp_path):
+    cache_dir = tmp_path / "pdfs"
+    PDFCache(str(cache_dir)).put(_key(1), b"%PDF sealed")
+    (cache_dir / f"proposal_{_key(2)}.pdf").write_bytes(b"%PDF plaintext from before")
+    (cache_dir / "notes.txt").write_text("kept")
+    (cache_dir / f"proposal_{_key(3)}.pdf.enc").write_bytes(b"not an envelope")
+
+    cache = PDFCache(str(cache_dir))
+
+    assert cache.stats()["entries"] == 2
+    assert sorted(os.listdir(cache_dir)) == ["notes.txt", f"proposal_{_key(1)}.pdf.enc",
+                                             f"proposal_{_key(3)}.pdf.enc"]
+    assert cache.get(_key(1)) == b"%PDF sealed"
+    assert cache.get(_key(3)) is None
+    assert cache.stats()["entries"] == 1
+    assert not (cache_dir / f"proposal_{_key(3)}.pdf.enc").exists()
+
+def test_service_renders_once_per_set_of_details(data_dir, tmp_path):
+    service = PDFService(output_dir=str(tmp_path / "pdfs"))
+    member = make_member("M1", "11111111", "0711000001")
+    family = [{"relationship": "Child", "name": "Child One", "dob": "2015-01-01", "gender": "F"}]
+
+    first = service.get_proposal_form(member, family)
+    again = service.get_proposal_form(dict(member), list(family))
+    other = service.get_proposal_form(dict(member, name="Someone Else"), family)
+
+    assert first.startswith(b"%PDF") and again == first and other != first
+    assert (service.cache.hits, service.cache.misses) == (1, 2)
+
+def test_generate_proposal_form_writes_no_plaintext_copy(data_dir, tmp_path):
+    service = PDFService(output_dir=str(tmp_path / "pdfs"))
+    member = make_member("M1", "11111111", "0711000001")
+
+    content = service.generate_proposal_form(member)
+
+    assert content == service.get_proposal_form(member)
+    assert all(name.endswith(".pdf.enc") for name in os.listdir(tmp_path / "pdfs"))
+    assert not any(b"Member M1" in (tmp_path / "pdfs" / name).read_bytes()
+                   for name in os.listdir(tmp_path / "pdfs"))
@@ -0,0 +1,44 @@
+# test_registration_rollups.py
+# AYTIN AFRICA Insurance Platform
+import multiprocessing
+import os
+from datetime import date, datetime
+from streamlit.testing.v1 import AppTest
+from services.registration_rollup_service import RegistrationRollupService
+from tests.conftest import make_member
+
+AGENT_PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "pages", "02_👤_Agent_View.py")
+
+def _register(snapshot_dir, count):
+    rollups = RegistrationRollupService(snapshot_dir)
+    for i in range(count):
+        rollups.record({"registration_date": "2026-03-10T09:00:00", "agent_id": 1, "cover_type": "basic"})
+
+def test_concurrent_processes_lose_no_registrations(tmp_path):
+    snapshot_dir = str(tmp_path / "snapshots")
+    reader = RegistrationRollupService(snapshot_dir)
+    reader.rebuild([])
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_register, args=(snapshot_dir, 25)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+
+    # The reader picks up the other processes' writes
+    assert reader.daily_counts(days=1, end=date(2026, 3, 10)) == [(date(2026, 3, 10), 100)]
+    assert not [name for name in os.listdir(snapshot_dir) if name.endswith(".tmp")]
+
+def test_agent_view_counts_by_registration_day(db):
+    now = datetime.now()
+    db.save_member(make_member("M1", "11111111", "0711000001", agent_id=1, registration_date=now.isoformat()))
+    # Re-saved today, registered earlier
+    db.save_member(make_member("M2", "22222222", "0711000002", agent_id=1,
+                               registration_date="2025-06-01T10:00:00"))
+
+    at = AppTest.from_file(AGENT_PAGE, default_timeout=60)
+    at.run()
+
+    assert not at.exception, [e.value for e in at.exception]
+    assert next(m.value for m in at.metric if m.label == "Today's Registrations") == "1"
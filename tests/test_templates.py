@@ -0,0 +1,52 @@
+# test_templates.py
+# AYTIN AFRICA Insurance Platform
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from config.settings import APP_CONFIG
+from services.pdf_batch_service import matching_members
+from utils.templates import TemplateRenderer, proposal_html, welcome_email_html, write_welcome_emails_zip
+from tests.conftest import make_member
+
+def test_templates_compile_once_until_the_file_changes(tmp_path):
+    template = tmp_path / "note.html"
+    template.write_text("Hello {{ name }}")
+    renderer = TemplateRenderer(str(tmp_path))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pages = list(pool.map(lambda i: renderer.render("note.html", {"name": f"<M{i}>"}), range(40)))
+    assert pages[3] == "Hello &lt;M3&gt;"
+    assert renderer.stats() == {"compiled": 1, "renders": 40}
+
+    template.write_text("Hi {{ name }}")
+    stat = os.stat(template)
+    os.utime(template, (stat.st_atime, stat.st_mtime + 5))
+    assert list(renderer.render_many("note.html", [{"name": "A"}, {"name": "B"}])) == ["Hi A", "Hi B"]
+    assert renderer.stats() == {"compiled": 2, "renders": 42}
+
+def test_single_member_documents():
+    member = make_member("M1", "11111111", "0711000001", registration_date=datetime(2026, 1, 15, 9, 30),
+                         family_members=[{"name": "Child One", "relationship": "child",
+                                          "dob": date(2015, 1, 1)}])
+
+    email = welcome_email_html(member, APP_CONFIG.COVER_OPTIONS)
+    proposal = proposal_html(member, APP_CONFIG.COVER_OPTIONS)
+
+    assert "Dear Member M1" in email and "15/01/2026" in email
+    assert "Child: Child One" in proposal and "01/01/2015" in proposal
+
+def test_welcome_emails_for_a_query_are_zipped(db):
+    db.save_member(make_member("M1", "11111111", "0711000001", agent_id=1))
+    db.save_member(make_member("M2", "22222222", "0711000002", agent_id=2))
+    db.save_member(make_member("M3", "33333333", "0711000003", agent_id=1,
+                               registration_date="2025-06-01T10:00:00"))
+    buffer = io.BytesIO()
+
+    members = matching_members(db, agent_id=1, start_date=date(2026, 1, 1), end_date=date(2026, 1, 31))
+    assert write_welcome_emails_zip(members, buffer, APP_CONFIG.COVER_OPTIONS) == 1
+
+    with zipfile.ZipFile(buffer) as archive:
+        assert archive.namelist() == ["welcome_M1.html"]
+        assert "Dear Member M1" in archive.read("welcome_M1.html").decode()
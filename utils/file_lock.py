@@ -0,0 +1,21 @@
+# utils/file_lock.py
+from contextlib import contextmanager
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # No cross-process locking (Windows); run one writer at a time
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path across processes"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'a') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,128 @@
+# utils/id_parser.py
+import re
+from datetime import datetime
+
+# Kenyan national ID numbers; shared with Validators and the OCR service
+ID_NUMBER_PATTERN = re.compile(r'\d{8,10}')
+
+_DATE = r'\d{1,2}[./-]\d{1,2}[./-]\d{4}'
+_DATE_PARTS = re.compile(r'(\d{1,2})[./-](\d{1,2})[./-](\d{4})')
+
+# One alternation scanned once over the text; earlier branches win at a
+# given position. Labels may be followed by their value on the same line
+# or the next one. Every match starts by consuming the non-word character
+# in front of a word (parse() puts a newline before the text), so the
+# regex engine jumps between word starts in C instead of trying the
+# branches at every character; line-start branches check that it was a
+# newline. Branches are grouped by their first character so a word start
+# is rejected after a couple of checks.
+_FIELDS = re.compile(rf"""
+    \W
+    (?:
+      (?=[DSIFNGM])
+      (?:
+        (?P<licence_marker>DRIVING\s+LICEN[CS]E)
+      | (?P<serial>SERIAL\s*(?:NO|NUMBER)?[\s:;.]*\d{{6,10}})
+      | (?:ID\s*(?:NO|NUMBER)\b|I\.D\.)[\s:;.]*(?P<labelled_id>(?<!\d)\d{{8,10}}(?!\d))
+      | (?:FULL\s+NAMES?|NAMES?)\b[\s:;.]*(?P<name>(?-i:[A-Z][A-Z' -]*[A-Z]))
+      | (?:DOB|D\.O\.B\.?|DATE\s+OF\s+BIRTH)\b[\s:;.]*(?P<dob>{_DATE})
+      | (?:SEX|GENDER)\b[\s:;.]*(?P<sex>MALE|FEMALE|M|F)\b
+      | (?P<gender_word>MALE|FEMALE)\b
+      )
+    | (?<=\n)[ \t]*(?P<dl_field>1|2|3|5)\.[ \t]*(?P<dl_value>[^\n]+)
+    | (?=\d)
+      (?:
+        (?P<id>\d{{8,10}})(?!\d)
+      | (?P<date>{_DATE})
+      )
+    | (?<=\n)[ \t]*(?P<caps>(?-i:[A-Z][A-Z' ]{{3,}}[A-Z]))[ \t]*$
+    )
+""", re.IGNORECASE | re.MULTILINE | re.VERBOSE)
+
+# All-caps lines printed on every card, never a holder's name
+_HEADER_WORDS = frozenset([
+    "REPUBLIC", "KENYA", "JAMHURI", "YA", "OF", "NATIONAL", "IDENTITY", "CARD",
+    "DRIVING", "LICENCE", "LICENSE", "SERIAL", "NUMBER", "DATE", "BIRTH", "SEX",
+    "DISTRICT", "PLACE", "ISSUE", "HOLDER", "SIGNATURE", "NAMES", "FULL", "SURNAME",
+    "OTHER", "MALE", "FEMALE"
+])
+
+def parse_date(text):
+    """Parse a d/m/Y date (any of / . - separators), or None"""
+    match = _DATE_PARTS.search(text or "")
+    if not match:
+        return None
+    day, month, year = map(int, match.groups())
+    try:
+        return datetime(year, month, day)
+    except ValueError:
+        return None
+
+class IDTextParser:
+    """Single-pass field extraction from OCR text of Kenyan IDs and licences
+
+    National IDs are read from their labels (ID NUMBER, FULL NAMES, DATE
+    OF BIRTH, SEX), falling back to the first unlabelled 8-10 digit number
+    and all-caps line. Driving licences use their numbered fields: 1
+    surname, 2 other names, 3 date of birth, 5 licence number.
+    """
+
+    def parse(self, text):
+        details = {
+            "name": "",
+            "id_number": "",
+            "dob": None,
+            "gender": "",
+            "extraction_confidence": 0.5
+        }
+        if not text:
+            return details
+
+        found = {}
+        licence = {}
+        is_licence = False
+        for match in _FIELDS.finditer("\n" + text):
+            kind = match.lastgroup
+            if kind == "licence_marker":
+                is_licence = True
+            elif kind == "dl_value":
+                licence.setdefault(match.group("dl_field"), match.group("dl_value").strip())
+            elif kind == "caps":
+                # Skip printed headings such as REPUBLIC OF KENYA
+                if "caps" not in found and not set(match.group("caps").split()) <= _HEADER_WORDS:
+                    found["caps"] = match.group("caps")
+            elif kind != "serial":
+                found.setdefault(kind, match.group(kind))
+
+        id_number = found.get("labelled_id") or found.get("id")
+        if id_number:
+            details["id_number"] = id_number
+            details["extraction_confidence"] = 0.7
+
+        if is_licence and licence:
+            details["document_type"] = "driving_licence"
+            details["name"] = " ".join(
+                part for part in (licence.get("2"), licence.get("1")) if part
+            ).upper()
+            details["dob"] = parse_date(licence.get("3"))
+            if licence.get("5"):
+                details["licence_number"] = licence["5"].split()[0]
+        else:
+            details["document_type"] = "national_id"
+
+        if not details["name"]:
+            name = found.get("name") or found.get("caps") or ""
+            details["name"] = " ".join(name.split())
+        if details["dob"] is None:
+            details["dob"] = parse_date(found.get("dob") or found.get("date"))
+
+        gender = (found.get("sex") or found.get("gender_word") or "").upper()
+        if gender in ("MALE", "M"):
+            details["gender"] = "Male"
+        elif gender in ("FEMALE", "F"):
+            details["gender"] = "Female"
+
+        return details
+
+# Shared instance; patterns are compiled once at import
+id_text_parser = IDTextParser()
\ No newline at end of file
@@ -1,3 +1,150 @@
-# templates.py
+# utils/templates.py
 # AYTIN AFRICA Insurance Platform
+import itertools
+import os
+import threading
+import zipfile
+from datetime import datetime
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "static", "templates")
+
+def format_date(value, fmt='%d/%m/%Y'):
+    """Template filter: dates as dd/mm/YYYY, anything else as text"""
+    if value is None or value == "":
+        return ""
+    return value.strftime(fmt) if hasattr(value, 'strftime') else str(value)
+
+def format_kes(value):
+    """Template filter: KES amount with thousands separators"""
+    try:
+        return f"KES {float(value):,.2f}"
+    except (TypeError, ValueError):
+        return str(value)
+
+class _CountingLoader(FileSystemLoader):
+    """FileSystemLoader that counts how often a template source is (re)read"""
+
+    def __init__(self, searchpath):
+        super().__init__(searchpath)
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get_source(self, environment, template):
+        with self._lock:
+            self.loads += 1
+        return super().get_source(environment, template)
+
+class TemplateRenderer:
+    """HTML templates from static/templates, compiled once and cached
+
+    Compiled templates are kept in memory and recompiled only when the
+    file's mtime changes. render_many fetches the template once and
+    renders every context against it, for bulk emails and proposals.
+    """
+
+    def __init__(self, template_dir=TEMPLATE_DIR, cache_size=64):
+        self.template_dir = template_dir
+        self._loader = _CountingLoader(template_dir)
+        self.env = Environment(
+            loader=self._loader,
+            autoescape=select_autoescape(['html']),
+            auto_reload=True,
+            cache_size=cache_size,
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+        self.env.filters['date'] = format_date
+        self.env.filters['kes'] = format_kes
+        self._lock = threading.Lock()
+        self._compile_lock = threading.Lock()
+        self.renders = 0
+
+    def get(self, name):
+        """Compiled template, reloaded if its file changed
+
+        Lookups are serialized so concurrent first renders compile once.
+        """
+        with self._compile_lock:
+            return self.env.get_template(name)
+
+    def render(self, name, context) -> str:
+        html = self.get(name).render(context)
+        with self._lock:
+            self.renders += 1
+        return html
+
+    def render_many(self, name, contexts, shared=None):
+        """Render one template for each context, yielding HTML strings
+
+        shared holds values common to every document (dates, terms, agency
+        details); each context overrides it.
+        """
+        template = self.get(name)
+        shared = shared or {}
+        count = 0
+        try:
+            for context in contexts:
+                yield template.render({**shared, **context})
+                count += 1
+        finally:
+            with self._lock:
+                self.renders += count
+
+    def stats(self) -> dict:
+        with self._lock, self._loader._lock:
+            return {"compiled": self._loader.loads, "renders": self.renders}
+
+# Shared renderer for the app's templates
+template_renderer = TemplateRenderer()
+
+def member_context(member, cover_options=None):
+    """Template variables for one member record"""
+    cover_type = member.get('cover_type', '')
+    cover = (cover_options or {}).get(cover_type, {})
+    return {
+        "member": member,
+        "name": member.get('name', ''),
+        "member_id": member.get('public_id', ''),
+        "cover_name": cover.get('name', str(cover_type).title()),
+        "daily_premium": cover.get('daily'),
+        "family_members": member.get('family_members') or []
+    }
+
+def _render_members(name, members, cover_options, shared):
+    # Streamed: only the member being rendered is held
+    contexts, paired = itertools.tee(member_context(m, cover_options) for m in members)
+    html = template_renderer.render_many(name, contexts, shared)
+    return ((c["member_id"], h) for h, c in zip(html, paired))
+
+def render_welcome_emails(members, cover_options=None):
+    """Welcome email HTML for each member, as (member_id, html) pairs"""
+    return _render_members("email_template.html", members, cover_options,
+                           {"sent_on": datetime.now()})
+
+def render_proposals_html(members, cover_options=None):
+    """HTML proposal form for each member, as (member_id, html) pairs"""
+    from services.pdf_service import PROPOSAL_TERMS
+    return _render_members("proposal_template.html", members, cover_options,
+                           {"generated_on": datetime.now(), "terms": PROPOSAL_TERMS})
+
+def welcome_email_html(member, cover_options=None) -> str:
+    """Welcome email HTML for one member"""
+    return next(render_welcome_emails([member], cover_options))[1]
+
+def proposal_html(member, cover_options=None) -> str:
+    """HTML proposal form for one member"""
+    return next(render_proposals_html([member], cover_options))[1]
+
+def write_welcome_emails_zip(members, dest, cover_options=None) -> int:
+    """ZIP of welcome_<member_id>.html per member to dest (path or binary file)
+
+    Returns the number of emails written.
+    """
+    count = 0
+    with zipfile.ZipFile(dest, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for member_id, html in render_welcome_emails(members, cover_options):
+            archive.writestr(f"welcome_{member_id}.html", html)
+            count += 1
+    return count
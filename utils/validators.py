@@ -2,6 +2,7 @@
 import re
 from datetime import datetime
 import phonenumbers
+from utils.id_parser import ID_NUMBER_PATTERN
 
 class Validators:
     """Validation utilities for the insurance platform"""
@@ -15,7 +16,7 @@ class Validators:
         id_number = id_number.strip()
         
         # Basic format validation
-        if not re.match(r'^\d{8,10}$', id_number):
+        if not ID_NUMBER_PATTERN.fullmatch(id_number):
             return False
         
         # Additional validation logic can be added here
@@ -32,6 +33,20 @@ class Validators:
         except:
             return False
     
+    @staticmethod
+    def normalize_phone_number(phone: str, country_code='254') -> str:
+        """Normalize a Kenyan phone number to +254XXXXXXXXX for lookups"""
+        if not phone:
+            return ""
+        digits = re.sub(r'\D', '', str(phone))
+        if digits.startswith(country_code):
+            return f"+{digits}"
+        if digits.startswith('0'):
+            return f"+{country_code}{digits[1:]}"
+        if len(digits) == 9:
+            return f"+{country_code}{digits}"
+        return f"+{digits}" if digits else ""
+
     @staticmethod
     def validate_date_of_birth(dob: datetime) -> bool:
         """Validate date of birth is reasonable"""